@@ -1,10 +1,20 @@
 # app.py
 
-from flask import Flask
+from flask import Flask, Response, request
 from flask_cors import CORS
 from config import Config
 from routes import register_routes
 from utils.response import create_response
+from utils.circuit_breaker import circuit_states
+from utils.gemini_gateway import gemini_gateway
+from utils.password_hasher import password_hasher
+from utils.session_sweeper import session_sweeper
+from utils.get_user_id_from_uuid import session_cache_stats
+from utils.action_recorder import action_recorder
+from utils.achievements import achievement_engine
+from utils.request_metrics import request_metrics, init_request_metrics
+from utils.request_profiler import request_profiler, init_request_profiler, TOKEN_HEADER
+import db_config  # register_routes가 ../db 경로를 추가한 뒤에 import
 
 def create_app():
     app = Flask(__name__)
@@ -16,6 +26,77 @@ def create_app():
     # Register all routes
     register_routes(app)
 
+    # 라우트별 요청 시간과 구간(DB 대기, SQL, 외부 API, Gemini 등)별 시간 수집
+    init_request_metrics(app, getattr(db_config, 'pool', None))
+
+    # 관리자 헤더(X-Profile-Token) 또는 표본 비율(PROFILE_SAMPLE_RATE)로 선택된 요청의 스택 프로파일링
+    init_request_profiler(app)
+
+    # 만료된 세션(logins) 백그라운드 정리 시작
+    session_sweeper.start()
+
+    # 외부 서비스(OpenWeatherMap, Gemini) 회로 차단기 상태 조회
+    @app.route('/health/circuits', methods=['GET'])
+    def circuits():
+        return create_response(200, "Circuit breaker states", circuit_states())
+
+    # Gemini 게이트웨이 상태 조회 (실행 중/대기 중 요청 수, 대기 시간, 거절 횟수)
+    @app.route('/health/gemini', methods=['GET'])
+    def gemini():
+        return create_response(200, "Gemini gateway stats", gemini_gateway.stats())
+
+    # 비밀번호 해싱 워커 풀 상태 조회 (대기 중 작업 수, 대기/처리 시간)
+    @app.route('/health/hasher', methods=['GET'])
+    def hasher():
+        return create_response(200, "Password hasher stats", password_hasher.stats())
+
+    # 세션 캐시와 만료 세션 정리 상태 조회
+    @app.route('/health/sessions', methods=['GET'])
+    def sessions():
+        return create_response(200, "Session stats", {"cache": session_cache_stats(), "sweeper": session_sweeper.stats()})
+
+    # Prometheus 형식 지표 (라우트/구간별 히스토그램과 각 컴포넌트의 상태 값)
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        gauges = {
+            "circuits": circuit_states(),
+            "gemini": gemini_gateway.stats(),
+            "hasher": password_hasher.stats(),
+            "session_cache": session_cache_stats(),
+            "session_sweeper": session_sweeper.stats(),
+            "action_recorder": action_recorder.stats(),
+            "achievements": achievement_engine.stats(),
+        }
+        if hasattr(db_config, 'pool_stats'):
+            gauges["db_pool"] = db_config.pool_stats()
+        return Response(request_metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+    # 프로파일 조회 (관리자 토큰 필요, collapsed 형식은 flamegraph.pl/speedscope로 바로 볼 수 있음)
+    @app.route('/profiles', methods=['GET'])
+    def profiles():
+        if not request_profiler.is_admin(request.headers.get(TOKEN_HEADER)):
+            return create_response(403, "Invalid profile token")
+        return create_response(200, "Recent profiles", {"stats": request_profiler.stats(), "profiles": request_profiler.recent()})
+
+    @app.route('/profiles/<profile_id>', methods=['GET'])
+    def profile(profile_id):
+        if not request_profiler.is_admin(request.headers.get(TOKEN_HEADER)):
+            return create_response(403, "Invalid profile token")
+        stacks = request_profiler.load(profile_id)
+        if stacks is None:
+            return create_response(404, "Profile not found")
+        return Response(stacks, mimetype='text/plain')
+
+    # 라우트별로 합산한 프로파일 (예: /profiles/route?route=/chat)
+    @app.route('/profiles/route', methods=['GET'])
+    def route_profile():
+        if not request_profiler.is_admin(request.headers.get(TOKEN_HEADER)):
+            return create_response(403, "Invalid profile token")
+        stacks = request_profiler.route_stacks(request.args.get('route', ''))
+        if stacks is None:
+            return create_response(404, "No profiles for route")
+        return Response(stacks, mimetype='text/plain')
+
     # Global error handler
     @app.errorhandler(404)
     def not_found(error):
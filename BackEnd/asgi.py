@@ -0,0 +1,54 @@
+# asgi.py
+# 비동기(ASGI) 실행 모드
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+# Gemini/OpenWeatherMap을 기다리는 chat, weather 엔드포인트는 비동기 핸들러가 처리하고,
+# 나머지 엔드포인트(auth, challenge, action, chat/list 등)는 기존 Flask 앱이 그대로 처리한다.
+# 동기 모드(python app.py)는 이 파일과 무관하게 계속 사용할 수 있다.
+
+import contextlib
+
+from asgiref.wsgi import WsgiToAsgi
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount, Route
+
+from app import create_app
+from async_pool import init_async_pool, close_async_pool, async_pool_stats
+from routes import chat_async, weather_async
+from utils.async_response import create_async_response
+
+async def async_stats(request):
+    return create_async_response(200, "Async mode stats", {
+        "db_pool": async_pool_stats(),
+        "openweathermap": weather_async.weather_client.stats(),
+        "single_flight": [weather_async.weather_flight.stats(), weather_async.gensentence_flight.stats()],
+    })
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    await init_async_pool()
+    try:
+        yield
+    finally:
+        await weather_async.weather_client.aclose()
+        await close_async_pool()
+
+def create_asgi_app():
+    flask_app = create_app()
+    routes = [
+        Route('/chat', chat_async.chat_route, methods=['GET', 'POST']),
+        Route('/chat/stream', chat_async.chat_stream_route, methods=['GET', 'POST']),
+        Route('/weather', weather_async.register_weather_action, methods=['POST']),
+        Route('/weather/air', weather_async.register_air_pollution_action, methods=['POST']),
+        Route('/weather/3hourly', weather_async.register_hourly_weather_action, methods=['POST']),
+        Route('/weather/gensentence', weather_async.gensentence_route, methods=['POST']),
+        Route('/health/async', async_stats, methods=['GET']),
+        # 나머지는 Flask 앱으로 전달 (요청마다 스레드 풀에서 실행)
+        Mount('/', app=WsgiToAsgi(flask_app)),
+    ]
+    # Flask 쪽은 flask_cors가 처리하므로, 비동기 핸들러에도 같은 CORS 정책 적용
+    middleware = [Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+    return Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+app = create_asgi_app()
@@ -0,0 +1,2 @@
+# bench
+# 대체 서비스(SQLite, 가짜 Gemini/OpenWeatherMap)를 사용하는 오프라인 부하 테스트 (python -m bench.run)
@@ -0,0 +1,77 @@
+# bench/fake_gemini.py
+# 벤치마크용 Gemini 대체 모델
+#
+# install()을 호출하면 genai.GenerativeModel이 FakeGenerativeModel로 바뀐다.
+# 응답 시간 = 첫 토큰 지연(first_token_latency) + 토큰 수 / 초당 토큰 수(tokens_per_second)
+# 스트리밍 요청은 같은 속도로 토큰을 나눠 보낸다.
+
+import json
+import threading
+import time
+
+import google.generativeai as genai
+
+# /weather/gensentence가 파싱하는 형식의 추천 문구
+WEATHER_REPLY = json.dumps({"weather_message": "맑은 날씨입니다.", "recommendation": "가벼운 산책을 추천해요."}, ensure_ascii=False)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChatSession:
+    def __init__(self, model, history):
+        self._model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, generation_config=None, stream=False, **kwargs):
+        return self._model._reply(stream)
+
+
+class FakeGenerativeModel:
+    """GenerativeModel과 같은 방식으로 쓰는 가짜 모델 (설정은 클래스 속성으로 공유)"""
+
+    first_token_latency = 0.3
+    tokens_per_second = 50.0
+    reply_tokens = 40
+
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, model_name=None, system_instruction=None, **kwargs):
+        self.model_name = model_name
+        # 시스템 프롬프트에 JSON 형식 요청이 있으면 (날씨 추천 프롬프트) JSON으로 응답
+        self._json_reply = bool(system_instruction) and "json" in system_instruction.lower()
+
+    def _reply(self, stream):
+        with FakeGenerativeModel._lock:
+            FakeGenerativeModel.calls += 1
+        if self._json_reply:
+            tokens = [WEATHER_REPLY]
+        else:
+            tokens = [f"토큰{i} " for i in range(self.reply_tokens)]
+        if stream:
+            return self._stream(tokens)
+        time.sleep(self.first_token_latency + len(tokens) / self.tokens_per_second)
+        return FakeResponse("".join(tokens))
+
+    def _stream(self, tokens):
+        time.sleep(self.first_token_latency)
+        for token in tokens:
+            time.sleep(1 / self.tokens_per_second)
+            yield FakeResponse(token)
+
+    def start_chat(self, history=None):
+        return FakeChatSession(self, history)
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        return self._reply(False)
+
+
+def install(first_token_latency=0.3, tokens_per_second=50.0, reply_tokens=40):
+    FakeGenerativeModel.first_token_latency = first_token_latency
+    FakeGenerativeModel.tokens_per_second = tokens_per_second
+    FakeGenerativeModel.reply_tokens = reply_tokens
+    genai.GenerativeModel = FakeGenerativeModel
+    return FakeGenerativeModel
@@ -0,0 +1,261 @@
+# bench/fake_mysql.py
+# 벤치마크용 db_config 대체 모듈 (SQLite 메모리 DB)
+#
+# install()을 앱 import 전에 호출하면 routes/utils의 'from db_config import get_connection'이
+# 이 모듈을 가져가므로, MySQL 없이 create_app()을 그대로 실행할 수 있다.
+# 앱이 사용하는 MySQL 전용 문법(NOW(), INTERVAL, ON DUPLICATE KEY 등)만 SQLite 문법으로 바꿔 실행한다.
+
+import re
+import sqlite3
+import sys
+import threading
+import time
+import types
+from datetime import date, datetime
+from functools import lru_cache
+
+import pymysql
+
+# db.sql과 같은 테이블/유니크 키 (SQLite 문법)
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE logins (
+    login_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    uuid TEXT NOT NULL,
+    login_time TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    expires_at TIMESTAMP NULL
+);
+CREATE UNIQUE INDEX uq_logins_uuid ON logins (uuid);
+CREATE INDEX idx_logins_expires_at ON logins (expires_at);
+CREATE TABLE chats (
+    chat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    chat_uuid TEXT NOT NULL,
+    chat_history TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    last_message_at TIMESTAMP NULL,
+    summary TEXT NULL,
+    summary_seq INT NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX uq_chats_chat_uuid ON chats (chat_uuid);
+CREATE INDEX idx_chats_user_last_message ON chats (user_id, last_message_at);
+CREATE TABLE chat_messages (
+    message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INT NOT NULL,
+    seq INT NOT NULL,
+    role TEXT NOT NULL,
+    parts TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX uq_chat_messages_chat_seq ON chat_messages (chat_id, seq);
+CREATE TABLE ChallengeList (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    challenge_id INT NOT NULL,
+    user_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX uq_challenge_list_user_challenge ON ChallengeList (user_id, challenge_id);
+CREATE INDEX idx_challenge_list_user_created ON ChallengeList (user_id, created_at);
+CREATE TABLE UserActions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    action_id INT NOT NULL,
+    doing_action TEXT NOT NULL,
+    time TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX idx_user_actions_user_time ON UserActions (user_id, time);
+CREATE TABLE achievement_counters (
+    user_id INT NOT NULL,
+    counter_key TEXT NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    streak INT NOT NULL DEFAULT 0,
+    first_day DATE NOT NULL,
+    last_day DATE NOT NULL,
+    PRIMARY KEY (user_id, counter_key)
+);
+"""
+
+# SQLite 유니크 제약 위반 메시지의 컬럼 → MySQL 키 이름 (중복 키 재시도 로직이 키 이름을 확인함)
+UNIQUE_KEYS = {
+    "logins.uuid": "uq_logins_uuid",
+    "chats.chat_uuid": "uq_chats_chat_uuid",
+    "chat_messages.chat_id, chat_messages.seq": "uq_chat_messages_chat_seq",
+    "ChallengeList.user_id, ChallengeList.challenge_id": "uq_challenge_list_user_challenge",
+    "users.username": "username",
+    "achievement_counters.user_id, achievement_counters.counter_key": "PRIMARY",
+}
+
+NOW_SQL = "datetime('now', 'localtime')"
+
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """MySQL 쿼리를 같은 의미의 SQLite 쿼리로 변환"""
+    query = query.replace(" FOR UPDATE", "")
+    query = re.sub(r"ON DUPLICATE KEY UPDATE (\w+) = \1$", "ON CONFLICT DO NOTHING", query)
+    query = query.replace("NOW() + INTERVAL %s SECOND", f"datetime('now', 'localtime', '+' || %s || ' seconds')")
+    query = query.replace(
+        "TIMESTAMPDIFF(SECOND, NOW(), expires_at)",
+        f"CAST((julianday(expires_at) - julianday({NOW_SQL})) * 86400 AS INTEGER)"
+    )
+    # SQLite는 DELETE ... ORDER BY ... LIMIT을 지원하지 않으므로 rowid 하위 쿼리로 변환
+    match = re.match(r"DELETE FROM (\w+) WHERE (.*) ORDER BY (\w+) LIMIT %s$", query)
+    if match:
+        table, where, order = match.groups()
+        query = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} ORDER BY {order} LIMIT %s)"
+    return query.replace("NOW()", NOW_SQL).replace("%s", "?")
+
+
+def to_sqlite(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class FakeDatabase:
+    """
+    프로세스 공용 SQLite 메모리 DB.
+    SQLite 커넥션 하나를 잠금으로 보호하므로 쿼리는 한 번에 하나씩 실행되고, 각 쿼리는 바로 반영(autocommit)된다.
+    query_latency 초를 지정하면 쿼리마다 (잠금 밖에서) 그만큼 기다려 MySQL 왕복 시간을 흉내 낸다.
+    """
+
+    def __init__(self, query_latency=0.0):
+        self.query_latency = query_latency
+        self._db = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        self.queries = 0
+        self.connections = 0
+
+    def execute(self, query, params, many=False):
+        if self.query_latency:
+            time.sleep(self.query_latency)
+        sql = translate(query)
+        try:
+            with self._lock:
+                self.queries += 1
+                cursor = self._db.cursor()
+                if many:
+                    cursor.executemany(sql, [tuple(to_sqlite(value) for value in row) for row in params])
+                    return cursor, []
+                cursor.execute(sql, tuple(to_sqlite(value) for value in params or ()))
+                # 결과는 잠금 안에서 모두 읽어 둠 (다른 스레드의 쿼리와 섞이지 않도록)
+                columns = [column[0] for column in cursor.description] if cursor.description else []
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                return cursor, rows
+        except sqlite3.IntegrityError as e:
+            message = str(e)
+            columns = message.split(": ", 1)[-1]
+            if message.startswith("UNIQUE constraint failed") and columns in UNIQUE_KEYS:
+                raise pymysql.err.IntegrityError(1062, f"Duplicate entry for key '{UNIQUE_KEYS[columns]}'")
+            raise pymysql.err.IntegrityError(1452, message)
+
+    def executescript(self, script):
+        with self._lock:
+            self._db.executescript(script)
+
+
+class FakeCursor:
+    """pymysql DictCursor와 같은 방식으로 쓰는 커서"""
+
+    def __init__(self, database):
+        self._database = database
+        self._rows = []
+        self._position = 0
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, query, params=None):
+        cursor, self._rows = self._database.execute(query, params)
+        self._position = 0
+        self.rowcount = len(self._rows) if cursor.description else cursor.rowcount
+        self.lastrowid = cursor.lastrowid
+        return self.rowcount
+
+    def executemany(self, query, rows):
+        cursor, self._rows = self._database.execute(query, rows, many=True)
+        self.rowcount = cursor.rowcount
+        return self.rowcount
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FakeConnection:
+    """풀에서 빌린 pymysql 커넥션처럼 동작 (commit/rollback은 autocommit이라 아무 일도 하지 않음)"""
+
+    def __init__(self, database):
+        self._database = database
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self._database)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def install(query_latency=0.0):
+    """db_config 모듈을 FakeDatabase를 쓰는 모듈로 바꾸고, 그 FakeDatabase를 반환합니다."""
+    database = FakeDatabase(query_latency)
+
+    def get_connection():
+        database.connections += 1
+        return FakeConnection(database)
+
+    def pool_stats():
+        return {"backend": "sqlite", "queries": database.queries, "connections": database.connections}
+
+    module = types.ModuleType('db_config')
+    module.get_connection = get_connection
+    module.pool_stats = pool_stats
+    sys.modules['db_config'] = module
+    return database
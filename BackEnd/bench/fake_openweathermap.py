@@ -0,0 +1,105 @@
+# bench/fake_openweathermap.py
+# 벤치마크용 OpenWeatherMap 대체 HTTP 서버
+#
+# /weather, /air_pollution, /forecast 요청에 실제 API와 같은 모양의 JSON을 latency 초 뒤에 돌려준다.
+# 앱은 OPENWEATHERMAP_BASE_URL 환경 변수를 이 서버 주소로 설정해 사용한다.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def current_weather(lat, lon):
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+        "main": {"temp": 291.5, "feels_like": 290.9, "temp_min": 290.1, "temp_max": 292.4, "pressure": 1018, "humidity": 55},
+        "wind": {"speed": 2.1, "deg": 250},
+        "clouds": {"all": 0},
+        "dt": int(time.time()),
+        "name": "Bench",
+    }
+
+
+def air_pollution(lat, lon):
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "list": [{
+            "main": {"aqi": 2},
+            "components": {"co": 230.3, "no": 0.1, "no2": 9.8, "o3": 60.1, "so2": 2.3, "pm2_5": 8.4, "pm10": 21.7, "nh3": 0.9},
+            "dt": int(time.time()),
+        }],
+    }
+
+
+def forecast(lat, lon):
+    now = int(time.time())
+    entries = []
+    for i in range(40):  # 5일 x 3시간 간격
+        dt = now + i * 10800
+        entries.append({
+            "dt": dt,
+            "main": {"temp": 288.0 + (i % 8), "feels_like": 287.5 + (i % 8), "humidity": 60 + i % 20},
+            "weather": [{"id": 500 if i % 7 == 0 else 800, "main": "Rain" if i % 7 == 0 else "Clear", "icon": "01d"}],
+            "wind": {"speed": 3.2, "deg": 200},
+            "pop": 0.4 if i % 7 == 0 else 0,
+            "dt_txt": time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(dt)),
+        })
+    return {"cod": "200", "cnt": len(entries), "list": entries, "city": {"coord": {"lat": lat, "lon": lon}, "name": "Bench"}}
+
+
+RESPONSES = {"weather": current_weather, "air_pollution": air_pollution, "forecast": forecast}
+
+
+class FakeOpenWeatherMapServer:
+    """백그라운드 스레드에서 동작하는 OpenWeatherMap 대체 서버"""
+
+    def __init__(self, latency=0.05, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive 지원 (앱의 커넥션 풀 재사용)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                builder = RESPONSES.get(url.path.rstrip('/').rsplit('/', 1)[-1])
+                query = parse_qs(url.query)
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+                if builder is None:
+                    status, payload = 404, {"cod": "404", "message": "not found"}
+                else:
+                    lat, lon = float(query.get('lat', [0])[0]), float(query.get('lon', [0])[0])
+                    status, payload = 200, builder(lat, lon)
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openweathermap", daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
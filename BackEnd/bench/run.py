@@ -0,0 +1,300 @@
+# bench/run.py
+# 오프라인 부하 테스트
+#
+# MySQL, Gemini, OpenWeatherMap 없이 create_app()을 대체 서비스에 연결해 실행하고,
+# 여러 엔드포인트를 섞은 요청을 정해진 동시성으로 보내 엔드포인트별 지연 시간(p50/p95/p99)과 초당 처리량을 JSON으로 출력한다.
+#
+# 사용법 (BackEnd 디렉터리에서):
+#   python -m bench.run --concurrency 16 --duration 30 --out bench.json
+#   python -m bench.run --mix chat=1,chat_list=1 --gemini-first-token-ms 800
+#
+# - DB: bench/fake_mysql.py (SQLite 메모리 DB, --db-latency-ms로 쿼리 왕복 시간 추가)
+# - Gemini: bench/fake_gemini.py (--gemini-first-token-ms, --gemini-tokens-per-sec, --gemini-reply-tokens)
+# - OpenWeatherMap: bench/fake_openweathermap.py (--owm-latency-ms)
+# 앱 설정은 환경 변수로 바꿀 수 있다 (예: GEMINI_MAX_CONCURRENCY=4 python -m bench.run).
+# 측정값은 대체 서비스 기준이므로 같은 설정으로 돌린 이전 결과와 비교하는 용도로 사용한다.
+
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from bench import fake_gemini, fake_mysql
+from bench.fake_openweathermap import FakeOpenWeatherMapServer
+
+# 시나리오별 기본 비중 (--mix로 변경)
+DEFAULT_MIX = {
+    "login": 5,
+    "chat": 15,
+    "chat_stream": 5,
+    "weather": 15,
+    "weather_air": 10,
+    "weather_3hourly": 10,
+    "gensentence": 10,
+    "chat_list": 10,
+    "action_list": 8,
+    "challenge_list": 5,
+    "action_register": 7,
+}
+
+# 도전 과제 이벤트가 되는 행동 (ActionList.md)
+ACTION_IDS = (2, 4, 5, 9)
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, q):
+    """nearest-rank 방식 분위수"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+
+class Results:
+    """시나리오별 지연 시간과 상태 코드 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._latencies = defaultdict(list)
+        self._statuses = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def add(self, name, status, seconds):
+        with self._lock:
+            self._latencies[name].append(seconds)
+            self._statuses[name][str(status)] += 1
+
+    def summary(self, elapsed):
+        def describe(latencies, statuses):
+            ordered = sorted(latencies)
+            errors = sum(count for status, count in statuses.items() if not status.startswith(('2', '3')))
+            return {
+                "requests": len(ordered),
+                "errors": errors,
+                "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": ms(percentile(ordered, 0.50)),
+                "p95_ms": ms(percentile(ordered, 0.95)),
+                "p99_ms": ms(percentile(ordered, 0.99)),
+                "max_ms": ms(ordered[-1] if ordered else None),
+                "mean_ms": ms(sum(ordered) / len(ordered) if ordered else None),
+                "status": dict(statuses),
+            }
+
+        with self._lock:
+            routes = {name: describe(values, self._statuses[name]) for name, values in sorted(self._latencies.items())}
+            all_latencies = [value for values in self._latencies.values() for value in values]
+            all_statuses = defaultdict(int)
+            for statuses in self._statuses.values():
+                for status, count in statuses.items():
+                    all_statuses[status] += count
+        return routes, describe(all_latencies, all_statuses)
+
+
+def ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class Workload:
+    """
+    시나리오별 요청 생성.
+    채팅방은 클라이언트(스레드)마다 따로 만든다 (실제 사용자처럼 한 채팅방에 동시에 두 메시지를 보내지 않도록).
+    """
+
+    def __init__(self, base_url, users, login_users, regions):
+        self.base_url = base_url
+        self.users = users              # [(username, user_uuid)] 로그인 외 시나리오용
+        self.login_users = login_users  # [(username, password)] 로그인 시나리오 전용 (세션 수 제한으로 다른 사용자의 세션이 밀려나지 않도록)
+        self.regions = regions
+
+    def request(self, session, name, rng, chat_uuids):
+        """
+        시나리오 하나를 실행하고 상태 코드를 반환합니다.
+        rng, chat_uuids({user_uuid: chat_uuid})는 클라이언트마다 따로 가진다.
+        """
+        url = self.base_url
+        if name == "login":
+            username, password = rng.choice(self.login_users)
+            return session.post(f"{url}/auth/login", json={"username": username, "password": password}).status_code
+
+        user_uuid = rng.choice(self.users)[1]
+        if name in ("chat", "chat_stream"):
+            # 대부분 기존 채팅방에 이어서 대화하고, 가끔 새 채팅방을 만든다
+            chat_uuid = None if rng.random() < 0.1 else chat_uuids.get(user_uuid)
+            body = {"user_uuid": user_uuid, "text": "오늘 뭐 하면 좋을까?", "chat_uuid": chat_uuid}
+            if name == "chat":
+                response = session.post(f"{url}/chat", json=body)
+                if response.status_code == 200:
+                    chat_uuids[user_uuid] = response.json()['data']['chat_uuid']
+                return response.status_code
+            with session.post(f"{url}/chat/stream", json=body, stream=True) as response:
+                for _ in response.iter_content(chunk_size=None):
+                    pass
+                return response.status_code
+
+        if name in ("weather", "weather_air", "weather_3hourly"):
+            path = {"weather": "/weather", "weather_air": "/weather/air", "weather_3hourly": "/weather/3hourly"}[name]
+            lat, lon = rng.choice(self.regions)
+            return session.post(f"{url}{path}", json={"user_uuid": user_uuid, "lat": lat, "lon": lon}).status_code
+
+        if name == "gensentence":
+            lat, lon = rng.choice(self.regions)
+            data = {
+                "current_weather": rng.choice(["맑음", "흐림", "비", "눈"]),
+                "current_temp": round(rng.uniform(-5, 33), 1),
+                "current_pm10": rng.randint(5, 120),
+                "current_pm2_5": rng.randint(3, 80),
+                "date": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "location": [lat, lon],
+            }
+            return session.post(f"{url}/weather/gensentence", json={"user_uuid": user_uuid, "data": data}).status_code
+
+        if name in ("chat_list", "action_list", "challenge_list"):
+            path = {"chat_list": "/chat/list", "action_list": "/action/list", "challenge_list": "/challenge/list"}[name]
+            return session.post(f"{url}{path}", json={"user_uuid": user_uuid, "limit": 20}).status_code
+
+        if name == "action_register":
+            body = {"user_uuid": user_uuid, "action_id": rng.choice(ACTION_IDS), "doing_action": "bench"}
+            return session.post(f"{url}/action/register", json=body).status_code
+
+        raise ValueError(f"unknown scenario {name}")
+
+
+def seed_users(base_url, count, prefix, password):
+    """회원가입 + 로그인으로 사용자를 만들고 [(username, user_uuid)]를 반환합니다."""
+    users = []
+    with requests.Session() as session:
+        for i in range(count):
+            username = f"{prefix}{i}"
+            session.post(f"{base_url}/auth/signup", json={"username": username, "password": password})
+            response = session.post(f"{base_url}/auth/login", json={"username": username, "password": password})
+            response.raise_for_status()
+            users.append((username, response.json()['data']['uuid']))
+    return users
+
+
+def run_load(workload, mix, concurrency, duration, warmup, seed):
+    """concurrency개의 스레드로 duration초 동안 요청을 보내고 (Results, 측정 시간)을 반환합니다."""
+    results = Results()
+    names, weights = list(mix), list(mix.values())
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        chat_uuids = {}
+        with requests.Session() as session:
+            while True:
+                name = rng.choices(names, weights)[0]
+                request_started = time.monotonic()
+                if request_started >= deadline:
+                    return
+                try:
+                    status = workload.request(session, name, rng, chat_uuids)
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                if request_started >= measure_from:
+                    results.add(name, status, time.monotonic() - request_started)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"bench-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 마지막 요청이 끝날 때까지의 실제 측정 시간
+    return results, time.monotonic() - measure_from
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test against local stand-ins for MySQL, Gemini and OpenWeatherMap")
+    parser.add_argument('--concurrency', type=int, default=8, help="number of concurrent clients")
+    parser.add_argument('--duration', type=float, default=20, help="measured seconds")
+    parser.add_argument('--warmup', type=float, default=2, help="seconds excluded from the results")
+    parser.add_argument('--users', type=int, default=20, help="seeded users for non-login scenarios")
+    parser.add_argument('--regions', type=int, default=10, help="distinct lat/lon points for weather scenarios")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help="scenario weights, e.g. chat=3,weather=1")
+    parser.add_argument('--gemini-first-token-ms', type=float, default=300)
+    parser.add_argument('--gemini-tokens-per-sec', type=float, default=50)
+    parser.add_argument('--gemini-reply-tokens', type=int, default=40)
+    parser.add_argument('--owm-latency-ms', type=float, default=50)
+    parser.add_argument('--db-latency-ms', type=float, default=0)
+    parser.add_argument('--bcrypt-rounds', type=int, default=int(os.getenv("BCRYPT_ROUNDS", 10)))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    owm_server = FakeOpenWeatherMapServer(latency=args.owm_latency_ms / 1000).start()
+
+    # 앱 모듈을 불러오기 전에 대체 서비스와 설정을 적용 (환경 변수로 이미 지정한 값은 유지)
+    os.environ.setdefault("OPENWEATHERMAP_BASE_URL", owm_server.base_url)
+    os.environ.setdefault("OPENWEATHERMAP_API_KEY", "bench")
+    os.environ.setdefault("GOOGLE_API_KEY", "bench")
+    os.environ.setdefault("MODEL_NAME", "bench-model")
+    os.environ.setdefault("SESSION_SWEEP_INTERVAL", "0")
+    # 사용자 수가 적어 사용자별 호출 한도에 걸리지 않도록 (한도 자체를 측정하려면 환경 변수로 지정)
+    os.environ.setdefault("GEMINI_USER_RATE", "1000")
+    os.environ.setdefault("GEMINI_USER_BURST", "1000")
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    database = fake_mysql.install(query_latency=args.db_latency_ms / 1000)
+    gemini = fake_gemini.install(args.gemini_first_token_ms / 1000, args.gemini_tokens_per_sec, args.gemini_reply_tokens)
+
+    # 앱의 print 로그가 JSON 출력과 섞이지 않도록 실행 중에는 stderr로 보냄
+    stdout = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        from werkzeug.serving import make_server
+        from app import create_app
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+        threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        rng = random.Random(args.seed)
+        regions = [(round(rng.uniform(33.0, 38.5), 4), round(rng.uniform(126.0, 129.5), 4)) for _ in range(args.regions)]
+        users = seed_users(base_url, args.users, "bench", "bench-password")
+        login_users = [(username, "bench-password") for username, _ in seed_users(base_url, max(1, args.users // 4), "bench-login", "bench-password")]
+        workload = Workload(base_url, users, login_users, regions)
+
+        results, elapsed = run_load(workload, args.mix, args.concurrency, args.duration, args.warmup, args.seed)
+        server.shutdown()
+        owm_server.stop()
+
+    routes, total = results.summary(elapsed)
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != 'out'},
+        "elapsed_s": round(elapsed, 3),
+        "total": total,
+        "routes": routes,
+        "stand_ins": {
+            "gemini_calls": gemini.calls,
+            "openweathermap_requests": owm_server.requests,
+            "db_queries": database.queries,
+        },
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    print(output, file=stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+-- 새로 설치한 DB도 'python db/migrate.py upgrade'를 한 번 실행해 마이그레이션 버전을 기록해 두세요.
+-- (이미 반영된 변경은 건너뜀)
+
 -- users 테이블 생성
 CREATE TABLE users (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -12,6 +15,9 @@ CREATE TABLE logins (
     user_id INT NOT NULL,
     uuid CHAR(36) NOT NULL,
     login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NULL, -- 세션 만료 시각 (NULL이면 만료 없음)
+    UNIQUE KEY uq_logins_uuid (uuid), -- 요청마다 uuid로 세션 조회
+    INDEX idx_logins_expires_at (expires_at), -- 만료 세션 정리용
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
@@ -20,20 +26,40 @@ CREATE TABLE chats (
     chat_id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
     chat_uuid CHAR(36) NOT NULL, -- UUID v4 (36 characters)
-    chat_history JSON, -- 채팅 히스토리 (JSON 형식)
+    chat_history JSON, -- 채팅 히스토리 (JSON 형식, chat_messages 이관 전 데이터용)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- 채팅방 생성 타임스탬프
     last_message_at TIMESTAMP NULL, -- 마지막 채팅 타임스탬프
+    summary TEXT NULL, -- 오래된 대화의 요약문 (Gemini 맥락 구성용)
+    summary_seq INT NOT NULL DEFAULT 0, -- 요약에 포함된 마지막 chat_messages.seq
+
+    UNIQUE KEY uq_chats_chat_uuid (chat_uuid),
+    INDEX idx_chats_user_last_message (user_id, last_message_at), -- 채팅방 목록 최신순 페이지 조회
     
     -- 외래키 설정
     CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- chat_messages 테이블 생성 (채팅 메시지를 한 행씩 추가 저장)
+CREATE TABLE chat_messages (
+    message_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    chat_id INT NOT NULL,
+    seq INT NOT NULL, -- 채팅방 내 메시지 순번 (1부터 시작)
+    role VARCHAR(10) NOT NULL, -- 'user' 또는 'model'
+    parts MEDIUMTEXT NOT NULL, -- 메시지 본문
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uq_chat_messages_chat_seq (chat_id, seq),
+    CONSTRAINT fk_chat_messages_chat_id FOREIGN KEY (chat_id) REFERENCES chats(chat_id) ON DELETE CASCADE
+);
+
 -- ChallengeList 테이블 생성
 CREATE TABLE ChallengeList (
     id INT AUTO_INCREMENT PRIMARY KEY,
     challenge_id INT NOT NULL,
     user_id INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_challenge_list_user_challenge (user_id, challenge_id), -- 사용자당 도전 과제 한 번만 등록
+    INDEX idx_challenge_list_user_created (user_id, created_at), -- 도전 과제 목록 최신순 페이지 조회
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
@@ -44,5 +70,18 @@ CREATE TABLE UserActions (
     action_id INT NOT NULL,
     doing_action TEXT NOT NULL,
     time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_actions_user_time (user_id, time),
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
+
+-- achievement_counters 테이블 생성 (도전 과제 판정용 사용자별 이벤트 카운터)
+CREATE TABLE achievement_counters (
+    user_id INT NOT NULL,
+    counter_key VARCHAR(64) NOT NULL, -- 이벤트 이름 (대화방별 카운터는 '<이벤트>@<chat_id>')
+    count INT NOT NULL DEFAULT 0, -- 누적 발생 횟수
+    streak INT NOT NULL DEFAULT 0, -- 연속 발생 일수
+    first_day DATE NOT NULL, -- 처음 발생한 날
+    last_day DATE NOT NULL, -- 마지막으로 발생한 날
+    PRIMARY KEY (user_id, counter_key),
+    CONSTRAINT fk_achievement_counters_user_id FOREIGN KEY (user_id) REFERENCES users(id)
+);
@@ -0,0 +1,60 @@
+# ../db/async_pool.py
+
+import os
+
+import aiomysql
+
+from db_config import DB_HOST, DB_PORT, DB_USERNAME, DB_PASSWORD, DB_NAME
+
+# ASGI 모드에서 사용하는 비동기 MySQL 커넥션 풀
+# 쿼리를 기다리는 동안 이벤트 루프가 다른 요청을 처리할 수 있다.
+DB_ASYNC_POOL_MIN_SIZE = int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", 1))
+DB_ASYNC_POOL_MAX_SIZE = int(os.getenv("DB_ASYNC_POOL_MAX_SIZE", 20))
+DB_ASYNC_POOL_RECYCLE = int(os.getenv("DB_POOL_MAX_LIFETIME", 3600))  # 초, 동기 풀과 같은 설정 사용
+
+_pool = None
+
+async def init_async_pool():
+    """ASGI 앱 시작(lifespan startup) 시 한 번 호출"""
+    global _pool
+    if _pool is None:
+        _pool = await aiomysql.create_pool(
+            host=DB_HOST,
+            port=DB_PORT,
+            user=DB_USERNAME,
+            password=DB_PASSWORD,
+            db=DB_NAME,
+            minsize=DB_ASYNC_POOL_MIN_SIZE,
+            maxsize=DB_ASYNC_POOL_MAX_SIZE,
+            pool_recycle=DB_ASYNC_POOL_RECYCLE,
+            cursorclass=aiomysql.DictCursor,
+            autocommit=True,  # 조회만 한 커넥션이 트랜잭션을 연 채로 풀에 돌아가 이전 스냅샷을 계속 보지 않도록
+        )
+    return _pool
+
+def get_async_pool():
+    """
+    비동기 커넥션 풀을 반환합니다.
+    사용법: async with get_async_pool().acquire() as connection: ...
+    """
+    if _pool is None:
+        raise RuntimeError("Async DB pool is not initialized (call init_async_pool() on startup)")
+    return _pool
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+def async_pool_stats():
+    if _pool is None:
+        return None
+    return {
+        "open": _pool.size,
+        "idle": _pool.freesize,
+        "in_use": _pool.size - _pool.freesize,
+        "min_size": _pool.minsize,
+        "max_size": _pool.maxsize,
+    }
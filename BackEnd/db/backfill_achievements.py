@@ -0,0 +1,126 @@
+# db/backfill_achievements.py
+# 기존 기록으로 도전 과제 카운터(achievement_counters)를 채우는 일회성 스크립트
+#
+# 사용법 (BackEnd 디렉터리에서):
+#   python db/backfill_achievements.py [--batch-size 500]
+#
+# 아직 적용되지 않은 스키마 마이그레이션(db/migrate.py upgrade)을 먼저 적용하고,
+# 사용자마다 지난 이벤트를 시간 순서대로 서버의 판정기(utils/achievements.py)와 같은 규칙으로 다시 반영한다.
+# - login: logins.login_time (만료되어 정리된 세션은 남아 있지 않음)
+# - chat_create: chats.created_at
+# - chat_message: chat_messages의 사용자 메시지 created_at (chat_messages로 이관되지 않은 채팅방은 시각이 없어 제외)
+# - 그 외: UserActions 중 ACTION_EVENTS에 있는 action_id
+# 카운터는 다시 계산한 값으로 덮어쓰고, 그 과정에서 넘어선 도전 과제는 ChallengeList에 등록한다 (이미 있으면 그대로).
+# 따라서 여러 번 실행해도 안전하다. 실행 중에 들어온 이벤트가 덮어써질 수 있으므로 한가한 시간에 실행하고,
+# 필요하면 다시 실행한다.
+#
+# 3시간 예보 조회(/weather/3hourly)는 예전에 AAC 버튼 추가와 같은 action_id 9로 기록되었으므로,
+# 카운터를 계산하기 전에 해당 행을 action_id 11로 옮긴다.
+
+import argparse
+import os
+import sys
+
+from db_config import get_connection
+from migrate import upgrade as upgrade_schema
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.achievements import (
+    ACTION_EVENTS, AWARD_SQL, EVENT_LOGIN, EVENT_CHAT_CREATE, EVENT_CHAT_MESSAGE,
+    advance_counter, evaluate_event, load_rules,
+)
+
+FIX_HOURLY_WEATHER_ACTION_SQL = (
+    "UPDATE UserActions SET action_id = 11 WHERE action_id = 9 AND doing_action = 'Get 3hourly weather info'"
+)
+UPSERT_COUNTER_SQL = (
+    "INSERT INTO achievement_counters (user_id, counter_key, count, streak, first_day, last_day) "
+    "VALUES (%s, %s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE count = VALUES(count), streak = VALUES(streak), "
+    "first_day = VALUES(first_day), last_day = VALUES(last_day)"
+)
+
+def load_events(cursor, user_id):
+    """사용자의 지난 이벤트 [(시각, 이벤트, 범위), ...] (시간 순서)"""
+    events = []
+    cursor.execute("SELECT login_time FROM logins WHERE user_id = %s", (user_id,))
+    events += [(row['login_time'], EVENT_LOGIN, None) for row in cursor.fetchall()]
+    cursor.execute("SELECT created_at FROM chats WHERE user_id = %s", (user_id,))
+    events += [(row['created_at'], EVENT_CHAT_CREATE, None) for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT m.chat_id, m.created_at FROM chat_messages m JOIN chats c ON c.chat_id = m.chat_id "
+        "WHERE c.user_id = %s AND m.role = 'user'",
+        (user_id,)
+    )
+    events += [(row['created_at'], EVENT_CHAT_MESSAGE, row['chat_id']) for row in cursor.fetchall()]
+    placeholders = ", ".join(["%s"] * len(ACTION_EVENTS))
+    cursor.execute(
+        f"SELECT action_id, time FROM UserActions WHERE user_id = %s AND action_id IN ({placeholders})",
+        (user_id, *ACTION_EVENTS)
+    )
+    events += [(row['time'], ACTION_EVENTS[row['action_id']], None) for row in cursor.fetchall()]
+    return sorted((event for event in events if event[0] is not None), key=lambda event: event[0])
+
+def replay(rules, events):
+    """이벤트를 메모리의 카운터에 차례로 반영. 반환값: (카운터 {counter_key: 행}, 넘어선 도전 과제 id 집합)"""
+    counters = {}
+    reached = set()
+    for at, event, scope in events:
+        day = at.date()
+
+        def bump(counter_key):
+            counters[counter_key], before, after = advance_counter(counters.get(counter_key), day)
+            return before, after
+
+        reached.update(rule['id'] for rule in evaluate_event(rules, bump, event, scope))
+    return counters, reached
+
+def backfill(batch_size=500):
+    rules = load_rules()
+    users = counters_written = awarded = 0
+    last_user_id = 0
+
+    with get_connection() as connection:
+        # achievement_counters 테이블이 없으면 먼저 스키마 마이그레이션 적용
+        upgrade_schema(connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute(FIX_HOURLY_WEATHER_ACTION_SQL)
+            print(f"Moved {cursor.rowcount} hourly weather actions from action_id 9 to 11")
+        connection.commit()
+
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT id FROM users WHERE id > %s ORDER BY id LIMIT %s", (last_user_id, batch_size))
+                user_ids = [row['id'] for row in cursor.fetchall()]
+            if not user_ids:
+                break
+
+            # 사용자 한 명씩 커밋 (한 번에 큰 잠금을 잡지 않도록)
+            for user_id in user_ids:
+                with connection.cursor() as cursor:
+                    counters, reached = replay(rules, load_events(cursor, user_id))
+                    for counter_key, counter in counters.items():
+                        cursor.execute(UPSERT_COUNTER_SQL, (
+                            user_id, counter_key, counter['count'], counter['streak'], counter['first_day'], counter['last_day']
+                        ))
+                    for challenge_id in sorted(reached):
+                        cursor.execute(AWARD_SQL, (user_id, challenge_id))
+                        if cursor.rowcount == 1:
+                            awarded += 1
+                connection.commit()
+                counters_written += len(counters)
+
+            users += len(user_ids)
+            last_user_id = user_ids[-1]
+            print(f"... up to user id {last_user_id}: {users} users, {counters_written} counters, {awarded} new challenges")
+
+    return users, counters_written, awarded
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backfill achievement_counters from existing logins, chats and user actions")
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    users, counters_written, awarded = backfill(args.batch_size)
+    print(f"Backfilled {counters_written} counters for {users} users ({awarded} newly awarded challenges)")
@@ -0,0 +1,296 @@
+# db/connection_pool.py
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 제한 시간 안에 커넥션을 얻지 못했을 때 발생"""
+
+
+class TimedCursor:
+    """execute/executemany 실행 시간을 풀의 관찰자에게 알리는 커서 래퍼 (그 외 속성은 원본 커서로 위임)"""
+
+    def __init__(self, cursor, pool):
+        self._cursor = cursor
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, query, args=None):
+        started = time.monotonic()
+        try:
+            return self._cursor.execute(query, args)
+        finally:
+            self._pool._notify("query", time.monotonic() - started)
+
+    def executemany(self, query, args):
+        started = time.monotonic()
+        try:
+            return self._cursor.executemany(query, args)
+        finally:
+            self._pool._notify("query", time.monotonic() - started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+
+class PooledConnection:
+    """
+    풀에서 빌려준 커넥션 래퍼.
+    close() 또는 with 블록 종료 시 실제로 끊지 않고 풀에 반납한다.
+    그 외 속성(cursor, commit, rollback 등)은 원본 커넥션으로 위임한다.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        if self._released:
+            raise AttributeError(f"Connection already returned to pool: {name}")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        if self._released:
+            raise AttributeError("Connection already returned to pool: cursor")
+        cursor = self._raw.cursor(*args, **kwargs)
+        # 관찰자가 있을 때만 쿼리 시간을 잼 (없으면 원본 커서 그대로)
+        return TimedCursor(cursor, self._pool) if self._pool.observers else cursor
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 고정 상한 커넥션 풀.
+    - min_size: 시작 시 미리 열어 둘 커넥션 수
+    - max_size: 동시에 열 수 있는 커넥션 최대 수
+    - max_lifetime: 이 시간(초)보다 오래된 커넥션은 반납/대여 시 폐기 후 재생성
+    - timeout: 커넥션을 기다릴 최대 시간(초)
+    - ping_on_checkout: 대여 시 ping으로 상태를 확인
+    add_observer(fn)로 등록한 함수는 fn("checkout", 대기 초), fn("query", 실행 초) 형태로 호출된다.
+    """
+
+    def __init__(self, creator, min_size=1, max_size=10, max_lifetime=3600,
+                 timeout=10, ping_on_checkout=True):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size: require 0 <= min_size <= max_size and max_size >= 1")
+        self._creator = creator
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_on_checkout = ping_on_checkout
+
+        self._idle = deque()  # (raw, created_at)
+        self._total = 0  # 열려 있는 커넥션 수 (대여 중 + 대기 중)
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+
+        self._prefilled = False
+        self.observers = []
+
+    def add_observer(self, fn):
+        """커넥션 대여 대기 시간과 쿼리 실행 시간을 받을 함수 등록 (요청별 지연 시간 측정용)"""
+        self.observers.append(fn)
+
+    def _notify(self, event, seconds):
+        for observer in self.observers:
+            try:
+                observer(event, seconds)
+            except Exception as e:
+                print(f"Error in connection pool observer: {str(e)}")
+
+    # 내부 유틸
+    def _open(self):
+        raw = self._creator()
+        with self._cond:
+            self._created += 1
+        return raw, time.monotonic()
+
+    def _expired(self, created_at):
+        return self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+
+    def _close_quietly(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, raw):
+        if not self.ping_on_checkout:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _prefill(self):
+        # 첫 사용 시점에 min_size 만큼 채운다 (임포트 시 DB 접속을 피하기 위함)
+        with self._cond:
+            if self._prefilled:
+                return
+            self._prefilled = True
+            missing = max(0, self.min_size - self._total)
+            self._total += missing
+        for _ in range(missing):
+            try:
+                raw, created_at = self._open()
+            except Exception as e:
+                print(f"Error pre-filling connection pool: {str(e)}")
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._idle.append((raw, created_at))
+                self._cond.notify()
+
+    # 공개 API
+    def acquire(self, timeout=None):
+        """풀에서 커넥션을 빌린다. 사용 후 반드시 close()로 반납해야 한다."""
+        if not self._prefilled:
+            self._prefill()
+
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            candidate = None
+            create = False
+            with self._cond:
+                while not self._idle and self._total >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"Timed out after {timeout}s waiting for a database connection")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    candidate = self._idle.pop()
+                else:
+                    self._total += 1
+                    create = True
+
+            if create:
+                try:
+                    raw, created_at = self._open()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                raw, created_at = candidate
+                if self._expired(created_at) or not self._healthy(raw):
+                    # 오래되었거나 끊어진 커넥션은 버리고 다시 시도
+                    expired = self._expired(created_at)
+                    self._close_quietly(raw)
+                    with self._cond:
+                        self._total -= 1
+                        if expired:
+                            self._recycled += 1
+                        else:
+                            self._discarded += 1
+                        self._cond.notify()
+                    continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use += 1
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            self._notify("checkout", waited)
+            return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        expired = self._expired(created_at)
+        keep = raw.open and not expired
+        if keep:
+            try:
+                # 커밋되지 않은 트랜잭션이 다음 사용자에게 넘어가지 않도록 정리
+                raw.rollback()
+            except Exception:
+                keep = False
+        if not keep:
+            self._close_quietly(raw)
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((raw, created_at))
+            else:
+                self._total -= 1
+                if expired:
+                    self._recycled += 1
+                else:
+                    self._discarded += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with 블록이 끝나면 예외 여부와 상관없이 커넥션을 반납한다."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        """풀 상태 및 대기 시간 통계"""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "open": self._total,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "wait_avg_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "discarded": self._discarded,
+            }
+
+    def close_all(self):
+        """대기 중인 커넥션을 모두 닫는다 (대여 중인 커넥션은 반납 시 정리)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._close_quietly(raw)
@@ -3,14 +3,22 @@
 import pymysql
 import os
 
+from connection_pool import ConnectionPool
+
 DB_USERNAME = os.getenv("DB_USERNAME", "your_username")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "your_password")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", 3306))
 DB_NAME = os.getenv("DB_NAME", "your_database_name")
 
-# 데이터베이스 연결 함수
-def get_connection():
+# 커넥션 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_LIFETIME = int(os.getenv("DB_POOL_MAX_LIFETIME", 3600))  # 초
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # 초
+
+# 실제 MySQL 연결 생성 함수 (풀 내부에서만 사용)
+def create_connection():
     connection = pymysql.connect(
         host=DB_HOST,
         user=DB_USERNAME,
@@ -20,3 +28,20 @@ def get_connection():
         cursorclass=pymysql.cursors.DictCursor
     )
     return connection
+
+pool = ConnectionPool(
+    create_connection,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    max_lifetime=DB_POOL_MAX_LIFETIME,
+    timeout=DB_POOL_TIMEOUT,
+)
+
+# 데이터베이스 연결 함수
+# 풀에서 커넥션을 빌려주며, close() 또는 with 블록 종료 시 풀에 반납된다.
+def get_connection():
+    return pool.acquire()
+
+# 풀 상태 조회 함수 (사용 중인 커넥션 수, 대기 시간 등)
+def pool_stats():
+    return pool.stats()
@@ -0,0 +1,134 @@
+# db/migrate.py
+# 버전별 스키마 마이그레이션 실행기
+#
+# 사용법 (BackEnd 디렉터리에서):
+#   python db/migrate.py upgrade [--to 3]   아직 적용되지 않은 마이그레이션을 순서대로 적용
+#   python db/migrate.py status             적용/미적용 마이그레이션 목록
+#   python db/migrate.py check              자주 실행되는 쿼리의 EXPLAIN이 인덱스를 사용하는지 확인
+#   (데이터를 넣어 확인하는 자동 테스트: tests/test_hot_query_indexes.py)
+#
+# 적용된 버전은 schema_migrations 테이블에 기록된다.
+
+import argparse
+import importlib
+import os
+import re
+import sys
+
+from db_config import get_connection
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.get_user_id_from_uuid import SESSION_LOOKUP_SQL
+from utils.session_sweeper import DELETE_EXPIRED_SQL
+from utils.chat_messages import CHAT_LOOKUP_SQL, CHAT_MESSAGES_RANGE_SQL
+from utils.achievements import SELECT_COUNTER_SQL
+from utils.pagination import PageRequest, PAGE_DEFAULT_LIMIT
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+CREATE_SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# 요청 처리 중 자주 실행되는 쿼리와 사용해야 하는 인덱스 (check 명령으로 확인)
+# 실제 요청에서 실행하는 SQL 상수를 그대로 가져와 EXPLAIN 하므로, 쿼리를 고치면 이 확인에도 바로 반영된다.
+# 목록 API는 limit을 보낸 첫 페이지와 같은 SQL (PageRequest.list_query)
+# 도전 과제 등록(AWARD_SQL)은 INSERT ... ON DUPLICATE KEY UPDATE라 EXPLAIN에 키가 나오지 않으므로,
+# 중복 확인에 쓰이는 같은 유니크 키(user_id, challenge_id)로 조회하는 SELECT로 확인한다.
+AWARD_KEY_LOOKUP_SQL = "SELECT id FROM ChallengeList WHERE user_id = %s AND challenge_id = %s"
+
+def _first_page(kind):
+    return PageRequest(kind, {"limit": PAGE_DEFAULT_LIMIT}).list_query((0,))
+
+HOT_QUERIES = [
+    ("session lookup", SESSION_LOOKUP_SQL, ("x",), "uq_logins_uuid"),
+    ("expired session sweep", DELETE_EXPIRED_SQL, (500,), "idx_logins_expires_at"),
+    ("chat lookup", CHAT_LOOKUP_SQL, ("x", 0), "uq_chats_chat_uuid"),
+    ("chat messages range", CHAT_MESSAGES_RANGE_SQL, (0, 0), "uq_chat_messages_chat_seq"),
+    ("challenge register", AWARD_KEY_LOOKUP_SQL, (0, 0), "uq_challenge_list_user_challenge"),
+    ("chat list page", *_first_page('chats'), "idx_chats_user_last_message"),
+    ("action list page", *_first_page('actions'), "idx_user_actions_user_time"),
+    ("achievement counter", SELECT_COUNTER_SQL, (0, "login"), "PRIMARY"),
+    ("challenge list page", *_first_page('challenges'), "idx_challenge_list_user_created"),
+]
+
+def load_migrations():
+    """[(version, name, module), ...] 버전 오름차순"""
+    sys.path.insert(0, os.path.dirname(MIGRATIONS_DIR))
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r'^(\d{4})_(\w+)\.py$', filename)
+        if match:
+            module = importlib.import_module(f"migrations.{filename[:-3]}")
+            migrations.append((int(match.group(1)), match.group(2), module))
+    return migrations
+
+def applied_versions(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SCHEMA_MIGRATIONS_SQL)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row['version'] for row in cursor.fetchall()}
+
+def upgrade(connection, target=None):
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용하고, 적용한 버전 목록을 반환합니다."""
+    done = applied_versions(connection)
+    applied = []
+    for version, name, module in load_migrations():
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"Applying {version:04d}_{name} ...")
+        with connection.cursor() as cursor:
+            module.upgrade(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        connection.commit()
+        applied.append(version)
+    return applied
+
+def status(connection):
+    done = applied_versions(connection)
+    for version, name, _ in load_migrations():
+        print(f"{'[x]' if version in done else '[ ]'} {version:04d}_{name}")
+
+def check_indexes(connection):
+    """
+    HOT_QUERIES의 EXPLAIN 결과가 기대한 인덱스를 사용하는지 확인하고, 실패한 쿼리 수를 반환합니다.
+    조회 값이 없는 유니크 조회는 실행 계획이 나오지 않으므로 SKIP으로 표시한다 (데이터가 있는 DB에서 확인).
+    """
+    failures = 0
+    with connection.cursor() as cursor:
+        for label, query, params, expected in HOT_QUERIES:
+            cursor.execute("EXPLAIN " + query, params)
+            plan = cursor.fetchall()
+            keys = [row.get('key') for row in plan]
+            if expected in keys:
+                result = "OK  "
+            elif any('const table' in (row.get('Extra') or '') for row in plan):
+                # 유니크 인덱스 조회 결과가 없으면 MySQL이 실행 계획 대신 이 메시지를 보여줌
+                result = "SKIP"
+            else:
+                result = "FAIL"
+                failures += 1
+            print(f"{result} {label}: key={keys} type={[row.get('type') for row in plan]} (expected {expected})")
+    return failures
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    upgrade_parser = subparsers.add_parser('upgrade', help="apply pending migrations")
+    upgrade_parser.add_argument('--to', type=int, default=None, help="stop after this version")
+    subparsers.add_parser('status', help="list applied and pending migrations")
+    subparsers.add_parser('check', help="verify hot queries use their indexes (EXPLAIN)")
+    args = parser.parse_args()
+
+    with get_connection() as connection:
+        if args.command == 'upgrade':
+            applied = upgrade(connection, args.to)
+            print(f"Applied {len(applied)} migrations" if applied else "Already up to date")
+        elif args.command == 'status':
+            status(connection)
+        elif args.command == 'check':
+            sys.exit(1 if check_indexes(connection) else 0)
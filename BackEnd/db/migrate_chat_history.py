@@ -0,0 +1,71 @@
+# db/migrate_chat_history.py
+# chats.chat_history JSON 컬럼의 기존 대화를 chat_messages 테이블로 옮기는 일회성 스크립트
+#
+# 사용법 (BackEnd 디렉터리에서):
+#   python db/migrate_chat_history.py [--batch-size 100] [--dry-run]
+#
+# 아직 적용되지 않은 스키마 마이그레이션(db/migrate.py upgrade)을 먼저 적용한다.
+# 이미 chat_messages에 행이 있는 채팅방은 건너뛰므로 여러 번 실행해도 안전하다.
+# chat_history 컬럼은 삭제하지 않는다 (이관 기간 동안 읽기 대체 경로로 사용).
+
+import argparse
+import json
+
+from db_config import get_connection
+from migrate import upgrade as upgrade_schema
+
+def migrate(batch_size=100, dry_run=False):
+    migrated_chats = 0
+    migrated_messages = 0
+    last_chat_id = 0
+
+    with get_connection() as connection:
+        # chat_messages 테이블/요약 컬럼이 없으면 먼저 스키마 마이그레이션 적용
+        upgrade_schema(connection)
+
+        while True:
+            # chat_id 순서로 batch_size 개씩 이관 대상 조회
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT c.chat_id, c.chat_history FROM chats c
+                    WHERE c.chat_id > %s
+                      AND NOT EXISTS (SELECT 1 FROM chat_messages m WHERE m.chat_id = c.chat_id)
+                    ORDER BY c.chat_id
+                    LIMIT %s
+                    """,
+                    (last_chat_id, batch_size)
+                )
+                chats = cursor.fetchall()
+            if not chats:
+                break
+
+            for chat in chats:
+                last_chat_id = chat['chat_id']
+                history = json.loads(chat['chat_history']) if chat['chat_history'] else []
+                if not history:
+                    continue
+                rows = [(chat['chat_id'], i + 1, m['role'], m['parts']) for i, m in enumerate(history)]
+                if not dry_run:
+                    with connection.cursor() as cursor:
+                        cursor.executemany(
+                            "INSERT INTO chat_messages (chat_id, seq, role, parts) VALUES (%s, %s, %s, %s)",
+                            rows
+                        )
+                migrated_chats += 1
+                migrated_messages += len(rows)
+
+            if not dry_run:
+                connection.commit()
+            print(f"... up to chat_id {last_chat_id}: {migrated_chats} chats, {migrated_messages} messages")
+
+    return migrated_chats, migrated_messages
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrate chats.chat_history JSON into chat_messages rows")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    chats, messages = migrate(args.batch_size, args.dry_run)
+    print(f"Migrated {chats} chats ({messages} messages){' [dry run]' if args.dry_run else ''}")
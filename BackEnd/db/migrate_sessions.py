@@ -0,0 +1,53 @@
+# db/migrate_sessions.py
+# logins 테이블에 세션 만료 시각(expires_at)을 추가하는 일회성 스크립트
+#
+# 사용법 (BackEnd 디렉터리에서):
+#   python db/migrate_sessions.py [--ttl 2592000] [--batch-size 1000]
+#
+# 아직 적용되지 않은 스키마 마이그레이션(db/migrate.py upgrade)을 먼저 적용하고,
+# 기존 세션은 login_time + ttl 로 만료 시각을 채운다.
+# 만료 시각이 이미 있는 행은 건너뛰므로 여러 번 실행해도 안전하다.
+
+import argparse
+import os
+
+from db_config import get_connection
+from migrate import upgrade as upgrade_schema
+
+def migrate(ttl, batch_size=1000):
+    updated = 0
+    last_login_id = 0
+
+    with get_connection() as connection:
+        # expires_at 컬럼/인덱스가 없으면 먼저 스키마 마이그레이션 적용
+        upgrade_schema(connection)
+
+        while True:
+            # login_id 범위 단위로 나눠서 갱신 (한 번에 큰 잠금을 잡지 않도록)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT MAX(login_id) AS last_id FROM (SELECT login_id FROM logins WHERE login_id > %s ORDER BY login_id LIMIT %s) t",
+                    (last_login_id, batch_size)
+                )
+                last_id = cursor.fetchone()['last_id']
+                if last_id is None:
+                    break
+                cursor.execute(
+                    "UPDATE logins SET expires_at = login_time + INTERVAL %s SECOND "
+                    "WHERE login_id > %s AND login_id <= %s AND expires_at IS NULL",
+                    (ttl, last_login_id, last_id)
+                )
+                updated += cursor.rowcount
+            connection.commit()
+            last_login_id = last_id
+            print(f"... up to login_id {last_login_id}: {updated} sessions")
+
+    return updated
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Add logins.expires_at and backfill it for existing sessions")
+    parser.add_argument('--ttl', type=int, default=int(os.getenv("SESSION_TTL", 30 * 24 * 3600)))
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Backfilled expires_at for {migrate(args.ttl, args.batch_size)} sessions")
@@ -0,0 +1,22 @@
+# chat_messages 테이블과 chats 요약 컬럼 추가
+# (기존 chats.chat_history 데이터 이관은 db/migrate_chat_history.py)
+
+from migrations import add_column
+
+CREATE_CHAT_MESSAGES_SQL = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    message_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    chat_id INT NOT NULL,
+    seq INT NOT NULL,
+    role VARCHAR(10) NOT NULL,
+    parts MEDIUMTEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_chat_messages_chat_seq (chat_id, seq),
+    CONSTRAINT fk_chat_messages_chat_id FOREIGN KEY (chat_id) REFERENCES chats(chat_id) ON DELETE CASCADE
+)
+"""
+
+def upgrade(cursor):
+    cursor.execute(CREATE_CHAT_MESSAGES_SQL)
+    add_column(cursor, 'chats', 'summary', "TEXT NULL")
+    add_column(cursor, 'chats', 'summary_seq', "INT NOT NULL DEFAULT 0")
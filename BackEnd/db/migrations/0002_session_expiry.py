@@ -0,0 +1,8 @@
+# logins 세션 만료 시각 컬럼과 정리용 인덱스 추가
+# (기존 세션의 만료 시각 채우기는 db/migrate_sessions.py)
+
+from migrations import add_column, add_index
+
+def upgrade(cursor):
+    add_column(cursor, 'logins', 'expires_at', "TIMESTAMP NULL")
+    add_index(cursor, 'logins', 'idx_logins_expires_at', 'expires_at')
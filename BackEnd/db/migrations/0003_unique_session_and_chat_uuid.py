@@ -0,0 +1,8 @@
+# 요청마다 조회하는 logins.uuid, chats.chat_uuid에 유니크 인덱스 추가
+# (get_user_id_from_uuid, get_chat 등이 전체 테이블 스캔 대신 인덱스 조회를 하도록)
+
+from migrations import add_index
+
+def upgrade(cursor):
+    add_index(cursor, 'logins', 'uq_logins_uuid', 'uuid', unique=True)
+    add_index(cursor, 'chats', 'uq_chats_chat_uuid', 'chat_uuid', unique=True)
@@ -0,0 +1,13 @@
+# ChallengeList (user_id, challenge_id) 유니크 인덱스 추가
+# register_challenge가 조회 후 INSERT 대신 INSERT ... ON DUPLICATE KEY 한 번으로 처리할 수 있도록 한다.
+
+from migrations import index_exists, add_index
+
+def upgrade(cursor):
+    if not index_exists(cursor, 'ChallengeList', 'uq_challenge_list_user_challenge'):
+        # 동시 요청으로 이미 중복 등록된 행이 있으면 가장 먼저 등록된 행만 남김
+        cursor.execute(
+            "DELETE newer FROM ChallengeList newer JOIN ChallengeList older "
+            "ON newer.user_id = older.user_id AND newer.challenge_id = older.challenge_id AND newer.id > older.id"
+        )
+    add_index(cursor, 'ChallengeList', 'uq_challenge_list_user_challenge', 'user_id, challenge_id', unique=True)
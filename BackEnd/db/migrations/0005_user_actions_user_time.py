@@ -0,0 +1,6 @@
+# UserActions (user_id, time) 인덱스 추가 (사용자별 행동 목록을 시간순으로 조회)
+
+from migrations import add_index
+
+def upgrade(cursor):
+    add_index(cursor, 'UserActions', 'idx_user_actions_user_time', 'user_id, time')
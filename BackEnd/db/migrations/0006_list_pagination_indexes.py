@@ -0,0 +1,11 @@
+# 목록 API keyset 페이지네이션용 인덱스 추가
+# /chat/list는 (user_id, last_message_at), /challenge/list는 (user_id, created_at) 순서로 최신순 조회한다.
+# (/action/list는 0005의 idx_user_actions_user_time 사용)
+
+from migrations import add_index
+
+def upgrade(cursor):
+    # 마지막 메시지 시각이 없는 예전 채팅방은 생성 시각으로 채워 정렬/커서 비교에서 빠지지 않도록 함
+    cursor.execute("UPDATE chats SET last_message_at = created_at WHERE last_message_at IS NULL")
+    add_index(cursor, 'chats', 'idx_chats_user_last_message', 'user_id, last_message_at')
+    add_index(cursor, 'ChallengeList', 'idx_challenge_list_user_created', 'user_id, created_at')
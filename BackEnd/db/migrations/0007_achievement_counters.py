@@ -0,0 +1,17 @@
+# 도전 과제 판정용 사용자별 카운터 테이블 추가 (utils/achievements.py)
+
+CREATE_ACHIEVEMENT_COUNTERS_SQL = """
+CREATE TABLE IF NOT EXISTS achievement_counters (
+    user_id INT NOT NULL,
+    counter_key VARCHAR(64) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    streak INT NOT NULL DEFAULT 0,
+    first_day DATE NOT NULL,
+    last_day DATE NOT NULL,
+    PRIMARY KEY (user_id, counter_key),
+    CONSTRAINT fk_achievement_counters_user_id FOREIGN KEY (user_id) REFERENCES users(id)
+)
+"""
+
+def upgrade(cursor):
+    cursor.execute(CREATE_ACHIEVEMENT_COUNTERS_SQL)
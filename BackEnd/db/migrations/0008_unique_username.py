@@ -0,0 +1,16 @@
+# users.username 유니크 인덱스 추가 (db.sql로 만든 DB에는 이미 있음)
+# signup이 중복 확인 후 비밀번호를 해싱하는 사이에 같은 이름으로 가입한 요청을 INSERT 시점에 막는다.
+# 이미 같은 이름의 사용자가 여러 명 있으면 인덱스 생성이 실패하므로, 먼저 직접 정리해야 한다.
+
+from migrations import add_index
+
+def unique_username_index_exists(cursor):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users' "
+        "AND COLUMN_NAME = 'username' AND NON_UNIQUE = 0 AND SEQ_IN_INDEX = 1"
+    )
+    return cursor.fetchone() is not None
+
+def upgrade(cursor):
+    if not unique_username_index_exists(cursor):
+        add_index(cursor, 'users', 'uq_users_username', 'username', unique=True)
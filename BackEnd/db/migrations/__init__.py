@@ -0,0 +1,27 @@
+# db/migrations
+# 버전별 스키마 마이그레이션 (db/migrate.py upgrade 로 적용)
+#
+# 파일 이름: <4자리 버전>_<설명>.py, 각 파일은 upgrade(cursor) 함수를 가진다.
+# db.sql로 새로 만든 DB에도 그대로 적용할 수 있도록, 모든 마이그레이션은 이미 적용된 변경이면 건너뛰어야 한다.
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+def add_column(cursor, table, column, ddl):
+    if not column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+def add_index(cursor, table, index, columns, unique=False):
+    if not index_exists(cursor, table, index):
+        cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index} ON {table} ({columns})")
@@ -5,10 +5,12 @@ from .auth import auth_bp
 from .challenge import challenge_bp
 from .action import action_bp
 from .weather import weather_bp
+from .dashboard import dashboard_bp
 
 def register_routes(app):
     app.register_blueprint(chat_bp)
     app.register_blueprint(challenge_bp)
     app.register_blueprint(action_bp)
     app.register_blueprint(weather_bp)
+    app.register_blueprint(dashboard_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')  # 회원가입 라우트 등록
\ No newline at end of file
@@ -11,6 +11,12 @@ sys.path.append(parent_dir)
 from db_config import get_connection
 from utils.response import create_response
 from utils.get_user_id_from_uuid import get_user_id_from_uuid
+from utils.action_recorder import action_recorder
+from utils.pagination import PageRequest, InvalidPageRequest
+from utils.achievements import achievement_engine, ACTION_EVENTS
+
+# /action/register 기록 방식: sync(기본, 응답 전에 저장 보장) 또는 async
+ACTION_REGISTER_LOG_MODE = os.getenv("ACTION_REGISTER_LOG_MODE", "sync")
 
 # Blueprint 생성
 action_bp = Blueprint('action', __name__)
@@ -32,14 +38,13 @@ def register_action():
             if user_id is None:
                 return create_response(403, "Invalid user_uuid")
 
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO UserActions (user_id, action_id, doing_action) VALUES (%s, %s, %s)",
-                    (user_id, action_id, doing_action)
-                )
-                connection.commit()
+            action_recorder.record(user_id, action_id, doing_action, mode=ACTION_REGISTER_LOG_MODE, connection=connection)
+
+            # 이 행동으로 새로 달성한 도전 과제 (action_id가 도전 과제 이벤트가 아니면 빈 목록)
+            event = ACTION_EVENTS.get(int(action_id)) if str(action_id).isdigit() else None
+            new_challenges = achievement_engine.record(user_id, [(event, None)], connection) if event else []
 
-        return create_response(200, "Action recorded successfully")
+        return create_response(200, "Action recorded successfully", {"new_challenges": new_challenges})
 
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
@@ -54,17 +59,25 @@ def action_list():
     if not user_uuid:
         return create_response(400, "Missing 'user_uuid' parameter")
 
+    try:
+        # 최근 행동부터 limit개씩 (cursor, since/until 선택, limit과 cursor가 없으면 전체)
+        page = PageRequest('actions', data)
+    except InvalidPageRequest as e:
+        return create_response(400, str(e))
+
     try:
         with get_connection() as connection:
             user_id = get_user_id_from_uuid(user_uuid, connection)
             if user_id is None:
                 return create_response(403, "Invalid user_uuid")
 
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT action_id, doing_action FROM UserActions WHERE user_id = %s", (user_id,))
-                actions = [{"action_id": record['action_id'], "doing_action": record['doing_action']} for record in cursor.fetchall()]
+            with page.cursor(connection) as cursor:
+                cursor.execute(*page.list_query((user_id,)))
+                actions, next_cursor = page.fetch(cursor, 'time', 'id', lambda record: {
+                    "action_id": record['action_id'], "doing_action": record['doing_action'], "time": record['time']
+                })
 
-        return create_response(200, "Action list retrieved successfully", {"actions": actions})
+        return create_response(200, "Action list retrieved successfully", {"actions": actions, "next_cursor": next_cursor})
 
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
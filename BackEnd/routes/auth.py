@@ -1,8 +1,8 @@
 import os
 import sys
-import uuid
+
+import pymysql
 from flask import Blueprint, request, jsonify
-import bcrypt
 
 # ../db 경로를 sys.path에 추가하여 db_config 모듈을 불러올 수 있도록 설정
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,64 +11,112 @@ sys.path.append(parent_dir)
 
 from db_config import get_connection  # db_config 임포트
 from utils.response import create_response  # utils/response의 create_response 사용
+from utils.get_user_id_from_uuid import get_user_id_from_uuid, invalidate_user_uuid
+from utils.password_hasher import password_hasher, HasherBusyError
+from utils.uuid_generator import insert_with_new_uuid, is_duplicate_key
+from utils.achievements import achievement_engine, EVENT_LOGIN
 
 auth_bp = Blueprint('auth', __name__)
 
+# 세션(logins) 설정
+SESSION_TTL = int(os.getenv("SESSION_TTL", 30 * 24 * 3600))  # 초, 로그인 후 세션 유지 시간 (0이면 만료 없음)
+SESSION_MAX_PER_USER = int(os.getenv("SESSION_MAX_PER_USER", 5))  # 사용자당 유지할 최대 세션 수 (0이면 제한 없음)
+
 def hash_password(password):
-    """비밀번호를 bcrypt 해시로 변환"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed
+    """비밀번호를 bcrypt 해시로 변환 (전용 워커 풀에서 실행)"""
+    return password_hasher.hash(password)
 
 def check_password(hashed_password, password):
-    """해시된 비밀번호와 입력된 비밀번호를 검증"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+    """해시된 비밀번호와 입력된 비밀번호를 검증 (전용 워커 풀에서 실행)"""
+    return password_hasher.verify(hashed_password, password)
+
+def create_session(cursor, user_id):
+    """
+    새 세션을 만들고 uuid를 반환합니다. (커밋은 호출자가 수행)
+    사용자당 세션이 SESSION_MAX_PER_USER 개를 넘으면 오래된 세션부터 삭제합니다.
+    """
+    # uuid 중복은 유니크 인덱스(uq_logins_uuid)가 막으므로 미리 조회하지 않고 바로 INSERT
+    if SESSION_TTL > 0:
+        user_uuid = insert_with_new_uuid(
+            cursor,
+            "INSERT INTO logins (user_id, uuid, expires_at) VALUES (%s, %s, NOW() + INTERVAL %s SECOND)",
+            lambda new_uuid: (user_id, new_uuid, SESSION_TTL),
+            'uq_logins_uuid'
+        )
+    else:
+        user_uuid = insert_with_new_uuid(
+            cursor,
+            "INSERT INTO logins (user_id, uuid) VALUES (%s, %s)",
+            lambda new_uuid: (user_id, new_uuid),
+            'uq_logins_uuid'
+        )
+
+    if SESSION_MAX_PER_USER > 0:
+        cursor.execute(
+            "SELECT login_id, uuid FROM logins WHERE user_id = %s ORDER BY login_id DESC LIMIT 1000 OFFSET %s",
+            (user_id, SESSION_MAX_PER_USER)
+        )
+        evicted = cursor.fetchall()
+        if evicted:
+            placeholders = ", ".join(["%s"] * len(evicted))
+            cursor.execute(
+                f"DELETE FROM logins WHERE login_id IN ({placeholders})",
+                [row['login_id'] for row in evicted]
+            )
+            for row in evicted:
+                invalidate_user_uuid(row['uuid'])
+    return user_uuid
 
-def generate_unique_uuid(cursor):
-    """UUID 중복 방지를 위해 유일한 UUID 생성"""
-    while True:
-        new_uuid = str(uuid.uuid4())
-        cursor.execute("SELECT * FROM logins WHERE uuid = %s", (new_uuid,))
-        if not cursor.fetchone():  # 중복이 없다면 해당 UUID 사용
-            return new_uuid
+def hasher_busy_response(error):
+    """비밀번호 처리 대기열이 가득 찼을 때의 응답 (재시도 시점 안내)"""
+    retry_after = int(error.retry_after) + 1
+    return create_response(503, "요청이 많아 잠시 후 다시 시도해 주세요.",
+                           {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
 
 # 회원가입
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
-    connection = None  # 초기화
     try:
         data = request.get_json()
         username = data.get('username')
         password = data.get('password')
         if not username or not password:
             return create_response(400, "사용자 이름과 비밀번호는 필수입니다.")
-        connection = get_connection()
-        with connection.cursor() as cursor:
-            # 사용자 이름이 이미 존재하는지 확인
-            cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-            existing_user = cursor.fetchone()
-            if existing_user:
-                return create_response(400, "이미 존재하는 사용자 이름입니다.")
-            # 비밀번호를 bcrypt 방식으로 해싱 후 저장
-            hashed_password = hash_password(password)
-            cursor.execute(
-                "INSERT INTO users (username, password) VALUES (%s, %s)",
-                (username, hashed_password)
-            )
+        # 사용자 이름이 이미 존재하는지 먼저 확인 (중복이면 해싱 비용을 쓰지 않음, 커넥션은 바로 반납)
+        with get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT id FROM users WHERE username = %s", (username,))
+                existing_user = cursor.fetchone()
+        if existing_user:
+            return create_response(400, "이미 존재하는 사용자 이름입니다.")
+
+        # 비밀번호를 bcrypt 방식으로 해싱 (해싱을 기다리는 동안 DB 커넥션을 붙잡지 않음)
+        hashed_password = hash_password(password)
+
+        # 확인 이후에 같은 이름으로 먼저 가입한 요청은 유니크 인덱스가 막음
+        with get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO users (username, password) VALUES (%s, %s)",
+                    (username, hashed_password)
+                )
             connection.commit()
         return create_response(201, "회원가입 성공")
-    
+
+    except pymysql.err.IntegrityError as e:
+        if is_duplicate_key(e, 'username'):
+            return create_response(400, "이미 존재하는 사용자 이름입니다.")
+        print(f"Error occurred: {e}")
+        return create_response(500, f"회원가입 중 오류가 발생했습니다: {str(e)}")
+    except HasherBusyError as e:
+        return hasher_busy_response(e)
     except Exception as e:
         print(f"Error occurred: {e}")
         return create_response(500, f"회원가입 중 오류가 발생했습니다: {str(e)}")
-    finally:
-        if connection:
-            connection.close()
 
 # 로그인
 @auth_bp.route('/login', methods=['POST'])
 def login():
-    connection = None  # 초기화
     try:
         data = request.get_json()
         username = data.get('username')
@@ -77,29 +125,34 @@ def login():
         if not username or not password:
             return create_response(400, "사용자 이름과 비밀번호는 필수입니다.")
 
-        connection = get_connection()
-        with connection.cursor() as cursor:
-            # 사용자 조회 및 비밀번호 검증
-            cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-            user = cursor.fetchone()
-            if user and check_password(user['password'].encode('utf-8'), password):
-                # 유일한 UUID 생성 후 logins 테이블에 삽입
-                user_uuid = generate_unique_uuid(cursor)
-                cursor.execute(
-                    "INSERT INTO logins (user_id, uuid) VALUES (%s, %s)",
-                    (user['id'], user_uuid)
-                )
-                connection.commit()
-                return create_response(200, "로그인 성공", {"uuid": user_uuid})
-            else:
-                return create_response(401, "사용자 이름 또는 비밀번호가 잘못되었습니다.")
+        # 사용자 조회만 하고 커넥션을 반납한 뒤 비밀번호 검증 (검증/재해싱 중에는 커넥션을 붙잡지 않음)
+        with get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT id, password FROM users WHERE username = %s", (username,))
+                user = cursor.fetchone()
+        stored_hash = user['password'].encode('utf-8') if user else None
+        if not user or not check_password(stored_hash, password):
+            return create_response(401, "사용자 이름 또는 비밀번호가 잘못되었습니다.")
+
+        # 이전 비용(BCRYPT_ROUNDS)으로 저장된 해시는 현재 비용으로 다시 해싱
+        new_hash = hash_password(password) if password_hasher.needs_rehash(stored_hash) else None
+
+        with get_connection() as connection:
+            with connection.cursor() as cursor:
+                if new_hash is not None:
+                    cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new_hash, user['id']))
+                # 유일한 UUID로 세션 생성 (만료 시각 설정, 세션 수 제한)
+                user_uuid = create_session(cursor, user['id'])
+            connection.commit()
+            # 로그인 연속 일수 등 도전 과제 판정
+            new_challenges = achievement_engine.record(user['id'], [(EVENT_LOGIN, None)], connection)
+        return create_response(200, "로그인 성공", {"uuid": user_uuid, "new_challenges": new_challenges})
     
+    except HasherBusyError as e:
+        return hasher_busy_response(e)
     except Exception as e:
         print(f"Error occurred: {e}")
         return create_response(500, f"로그인 중 오류가 발생했습니다: {str(e)}")
-    finally:
-        if connection:
-            connection.close()
 
 # 로그아웃
 @auth_bp.route('/logout', methods=['POST'])
@@ -115,7 +168,9 @@ def logout():
             # logins 테이블에서 uuid로 레코드 삭제
             cursor.execute("DELETE FROM logins WHERE uuid = %s", (user_uuid,))
             connection.commit()
-            return create_response(200, "로그아웃 성공")
+        # 세션 캐시에서도 즉시 제거
+        invalidate_user_uuid(user_uuid)
+        return create_response(200, "로그아웃 성공")
     
     except Exception as e:
         print(f"Error occurred: {e}")
@@ -138,15 +193,14 @@ def check_uuid():
 
         connection = get_connection()
         with connection.cursor() as cursor:
-            # UUID가 logins 테이블에 있는지 확인
-            cursor.execute("SELECT user_id FROM logins WHERE uuid = %s", (user_uuid,))
-            login_record = cursor.fetchone()
+            # UUID가 logins 테이블에 있는지 확인 (세션 캐시 우선)
+            user_id = get_user_id_from_uuid(user_uuid, connection)
 
-            if not login_record:
+            if user_id is None:
                 return create_response(404, "UUID가 존재하지 않습니다.")
 
             # 유저네임 조회
-            cursor.execute("SELECT username FROM users WHERE id = %s", (login_record['user_id'],))
+            cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
             user_info = cursor.fetchone()
 
             if user_info:
@@ -12,6 +12,8 @@ sys.path.append(parent_dir)
 from db_config import get_connection
 from utils.response import create_response
 from utils.get_user_id_from_uuid import get_user_id_from_uuid
+from utils.pagination import PageRequest, InvalidPageRequest
+from utils.achievements import AWARD_SQL
 
 # Blueprint 생성
 challenge_bp = Blueprint('challenge', __name__)
@@ -27,15 +29,22 @@ def fetch_challenge_data():
         print(f"Error reading challenge_list.jsonl: {str(e)}")
         return set()
 
-def is_user_challenge_registered(user_id, challenge_id, connection):
-    """유저가 특정 도전 과제를 등록했는지 확인합니다."""
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1 FROM ChallengeList WHERE user_id = %s AND challenge_id = %s", (user_id, challenge_id))
-            return cursor.fetchone() is not None
-    except Exception as e:
-        print(f"Error in is_user_challenge_registered: {str(e)}")
-        return False
+def register_user_challenge(user_id, challenge_id, connection):
+    """
+    도전 과제를 등록합니다. 이미 등록되어 있으면 False를 반환합니다.
+    (user_id, challenge_id) 유니크 인덱스로 중복을 막으므로 조회 없이 INSERT 한 번으로 처리한다.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(AWARD_SQL, (user_id, challenge_id))
+        inserted = cursor.rowcount == 1
+    connection.commit()
+    return inserted
+
+def list_user_challenges(connection, user_id, page):
+    """최근 등록한 도전 과제부터 한 페이지 조회. 반환값: (challenge_id 목록, next_cursor)"""
+    with page.cursor(connection) as cursor:
+        cursor.execute(*page.list_query((user_id,)))
+        return page.fetch(cursor, 'created_at', 'id', lambda record: record['challenge_id'])
 
 # Challenge 존재 여부를 사전에 로드
 CHALLENGE_IDS = fetch_challenge_data()
@@ -58,16 +67,9 @@ def register_challenge():
         if user_id is None:
             return create_response(403, "Invalid user_uuid")
 
-        if is_user_challenge_registered(user_id, challenge_id, connection):
+        if not register_user_challenge(user_id, challenge_id, connection):
             return create_response(409, "Challenge already registered for this user")
 
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "INSERT INTO ChallengeList (user_id, challenge_id, created_at) VALUES (%s, %s, NOW())",
-                (user_id, challenge_id)
-            )
-            connection.commit()
-
         return create_response(200, "Challenge registered successfully")
 
     except Exception as e:
@@ -87,17 +89,21 @@ def challenge_list():
     if not user_uuid:
         return create_response(400, "Missing 'user_uuid' parameter")
 
+    try:
+        # 최근 등록한 도전 과제부터 limit개씩 (cursor, since/until 선택, limit과 cursor가 없으면 전체)
+        page = PageRequest('challenges', data)
+    except InvalidPageRequest as e:
+        return create_response(400, str(e))
+
     try:
         connection = get_connection()
         user_id = get_user_id_from_uuid(user_uuid, connection)
         if user_id is None:
             return create_response(403, "Invalid user_uuid")
 
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT challenge_id FROM ChallengeList WHERE user_id = %s", (user_id,))
-            challenges = [record['challenge_id'] for record in cursor.fetchall()]
+        challenges, next_cursor = list_user_challenges(connection, user_id, page)
 
-        return create_response(200, "Challenge list retrieved successfully", {"challenges": challenges})
+        return create_response(200, "Challenge list retrieved successfully", {"challenges": challenges, "next_cursor": next_cursor})
 
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
@@ -1,10 +1,10 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, Response, stream_with_context
 import google.generativeai as genai
 import os
 import sys
-import uuid
 from dotenv import load_dotenv
 import json
+import time
 import traceback
 
 # .env 파일 로드 및 환경 변수에서 API 키 및 모델명 가져오기
@@ -18,6 +18,22 @@ sys.path.append(parent_dir)
 from db_config import get_connection
 from utils.response import create_response
 from utils.get_user_id_from_uuid import get_user_id_from_uuid
+from utils.chat_messages import (
+    get_chat, get_chat_id, has_chat_messages, load_chat_messages, load_legacy_chat_history,
+    append_chat_messages, save_chat_summary, lock_last_seq, to_model_history
+)
+from utils.chat_context import build_summary_prompt
+from utils.chat_state import (
+    NEW_CHAT_SQL, NEW_CHAT_UUID_KEY, TOUCH_CHAT_SQL, new_chat_params, existing_chat, new_chat,
+    needs_legacy_history, split_history, apply_summary, model_history, turn_messages, chat_turn_events
+)
+from utils.circuit_breaker import get_breaker, CircuitOpenError
+from utils.model_registry import prompt_registry
+from utils.uuid_generator import insert_with_new_uuid
+from utils.pagination import PageRequest, InvalidPageRequest
+from utils.achievements import achievement_engine
+from utils.gemini_gateway import gemini_gateway, GatewayRejectedError, QUEUE_TIMEOUT
+from utils.request_metrics import phase, observe_phase, PHASE_GEMINI, PHASE_GEMINI_QUEUE, PHASE_CHAT_HISTORY
 
 # .env 파일 로드 및 환경 변수에서 API 키 및 모델명 가져오기
 load_dotenv()
@@ -33,51 +49,169 @@ generation_config = {
     "max_output_tokens": 8096,
 }
 
+# Gemini 장애 시 요청을 바로 실패시키는 회로 차단기 (weather 블루프린트와 공유)
+gemini_breaker = get_breaker("gemini")
+
+# 시스템 프롬프트는 처음 사용할 때 한 번 읽고, 파일이 바뀌면 자동으로 다시 읽음
+prompt_registry.register('chat', os.path.join(current_dir, 'prompt.md'))
+
 # Blueprint 생성
 chat_bp = Blueprint('chat', __name__)
 
-def is_valid_chat_for_user(user_id, chat_uuid, connection):
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1 FROM chats WHERE chat_uuid = %s AND user_id = %s", (chat_uuid, user_id))
-            return cursor.fetchone() is not None
-    except Exception as e:
-        print(f"Error in is_valid_chat_for_user: {str(e)}")
-        return False
-
-# 고유 chat_uuid 생성 함수
-def generate_unique_chat_uuid(connection):
-    try:
-        with connection.cursor() as cursor:
-            while True:
-                chat_uuid = str(uuid.uuid4())
-                cursor.execute("SELECT COUNT(*) AS count FROM chats WHERE chat_uuid = %s", (chat_uuid,))
-                if cursor.fetchone()['count'] == 0:
-                    return chat_uuid
-    except Exception as e:
-        print(f"Error in generate_unique_chat_uuid: {str(e)}")
+# 0 이상의 정수(또는 숫자 문자열)를 int로 변환 (형식 오류 시 None 반환)
+def parse_non_negative_int(value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
         return None
+    return int(value)
 
-# 시스템 프롬프트 로드 함수
-def load_system_prompt():
-    prompt_path = os.path.join(current_dir, 'prompt.md')
-    with open(prompt_path, 'r', encoding='utf-8') as file:
-        return file.read()
+# 요청에서 text, user_uuid, chat_uuid 추출 (형식 오류 시 None 반환)
+def parse_chat_request():
+    if request.method == 'GET':
+        return request.args.get('text'), request.args.get('user_uuid'), request.args.get('chat_uuid')
+    if request.method == 'POST' and request.is_json:
+        data = request.get_json()
+        return data.get('text'), data.get('user_uuid'), data.get('chat_uuid')
+    return None
+
+# 오래된 메시지를 기존 요약에 합쳐 새 요약문 생성
+def summarize_messages(summary, messages):
+    model, _ = prompt_registry.get_model(None, MODEL_NAME)
+    with phase(PHASE_GEMINI):
+        response = gemini_breaker.call(
+            lambda: model.generate_content(build_summary_prompt(summary, messages), generation_config=generation_config)
+        )
+    return response.text.strip()
+
+# 기존 채팅방을 불러오거나, chat_uuid가 없거나 유효하지 않으면 새로운 채팅방 생성
+def open_chat(connection, user_id, chat_uuid):
+    """반환값: 채팅방 상태 dict (utils/chat_state.py existing_chat 참고)"""
+    record = get_chat(user_id, chat_uuid, connection) if chat_uuid else None
+    if record is not None:
+        # 요약 이후의 메시지만 범위 조회로 불러오기
+        messages = load_chat_messages(connection, record['chat_id'], after_seq=record['summary_seq'] or 0)
+        legacy = False
+        if needs_legacy_history(messages, record['summary_seq'] or 0):
+            messages = load_legacy_chat_history(connection, record['chat_id'])
+            legacy = bool(messages)
+        return existing_chat(record, chat_uuid, messages, legacy)
+
+    with connection.cursor() as cursor:
+        chat_uuid = insert_with_new_uuid(cursor, NEW_CHAT_SQL, new_chat_params(user_id), NEW_CHAT_UUID_KEY)
+        chat_id = cursor.lastrowid
+        connection.commit()
+    return new_chat(chat_id, chat_uuid)
+
+# Gemini에 보낼 히스토리 구성 (필요하면 오래된 메시지를 요약으로 접음)
+def build_chat_history(chat):
+    to_fold, keep = split_history(chat)
+    if to_fold:
+        apply_summary(chat, summarize_messages(chat['summary'], to_fold), to_fold)
+    return model_history(chat, keep)
+
+# 이번 턴의 메시지 저장 (요약이 바뀌었으면 요약도 함께)
+# seq는 채팅방 행을 잠근 뒤 정하므로, 같은 채팅방에 동시에 보낸 메시지도 (chat_id, seq)가 겹치지 않음
+def save_chat_turn(connection, chat, text, reply):
+    start_seq, messages = turn_messages(chat, text, reply, lock_last_seq(connection, chat['chat_id']))
+    append_chat_messages(connection, chat['chat_id'], start_seq, messages)
+    if chat['summary_changed']:
+        save_chat_summary(connection, chat['chat_id'], chat['summary'], chat['summary_seq'])
+    with connection.cursor() as cursor:
+        cursor.execute(TOUCH_CHAT_SQL, (chat['chat_id'],))
+    connection.commit()
+
+# 캐시된 모델로 ChatSession 생성 (모델 객체는 프롬프트가 바뀔 때만 새로 만듦)
+def start_model_chat(history):
+    """반환값: (ChatSession, 프롬프트 버전)"""
+    model, prompt_version = prompt_registry.get_model('chat', MODEL_NAME)
+    return model.start_chat(history=history), prompt_version
+
+# Gemini 회로가 열려 있을 때의 응답 (재시도 시점 안내)
+def circuit_open_response(error):
+    retry_after = int(error.retry_after) + 1
+    return create_response(503, "Chat service temporarily unavailable, please retry later",
+                           {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+
+# Gemini 게이트웨이가 요청을 받지 못했을 때의 응답 (한도 초과/대기열 가득 참: 429, 대기 시간 초과: 503)
+def gateway_rejected_response(error):
+    retry_after = int(error.retry_after) + 1
+    status = 503 if error.reason == QUEUE_TIMEOUT else 429
+    return create_response(status, "Too many chat requests, please retry later",
+                           {"retry_after": retry_after, "reason": error.reason}, headers={"Retry-After": str(retry_after)})
+
+# SSE 이벤트 한 건을 문자열로 직렬화
+def sse_event(data, event=None):
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return (f"event: {event}\n" if event else "") + f"data: {payload}\n\n"
 
 # /chat 엔드포인트
 @chat_bp.route('/chat', methods=['GET', 'POST'])
 def chat_route():
+    try:
+        params = parse_chat_request()
+        if params is None:
+            return create_response(400, "Content-Type must be application/json for POST requests")
+        text, user_uuid, chat_uuid = params
+
+        if not text or not user_uuid:
+            return create_response(400, "Missing required parameters")
+
+        # 게이트웨이 대기와 Gemini 호출 중에는 DB 커넥션을 붙잡지 않도록, 조회/생성만 짧게 빌려서 처리
+        with get_connection() as connection:
+            user_id = get_user_id_from_uuid(user_uuid, connection)
+        if user_id is None:
+            return create_response(403, "Invalid user_uuid")
+
+        # Gemini 회로가 열려 있으면 채팅방 조회/생성 전에 바로 실패
+        gemini_breaker.reject_if_open()
+        # 사용자별 호출 한도 확인
+        gemini_gateway.check_rate(user_id)
+
+        # Gemini 실행 슬롯 확보 (요약 생성과 응답 생성이 같은 슬롯 사용)
+        # 채팅방은 슬롯을 얻은 뒤에 조회/생성하므로, 대기열에서 거절된 요청은 빈 채팅방을 남기지 않음
+        with gemini_gateway.acquire() as slot:
+            observe_phase(PHASE_GEMINI_QUEUE, slot.wait)
+
+            with get_connection() as connection:
+                chat_state = open_chat(connection, user_id, chat_uuid)
+            chat_uuid = chat_state['chat_uuid']
+
+            # AI 모델로 응답 생성
+            with phase(PHASE_CHAT_HISTORY):
+                history = build_chat_history(chat_state)
+            chat, prompt_version = start_model_chat(history)
+            with phase(PHASE_GEMINI):
+                response = gemini_breaker.call(lambda: chat.send_message(text, generation_config=generation_config))
+
+        # 응답 저장은 새로 빌린 커넥션으로
+        with get_connection() as connection:
+            save_chat_turn(connection, chat_state, text, response.text)
+            new_challenges = achievement_engine.record(user_id, chat_turn_events(chat_state), connection)
+
+        print(f"[chat] chat_uuid={chat_uuid} prompt_version={prompt_version} queue_wait_ms={slot.wait * 1000:.1f}")
+        return create_response(200, "Success to response",
+                               {"chat_uuid": chat_uuid, "input": text, "response": response.text, "new_challenges": new_challenges},
+                               headers={"X-Prompt-Version": prompt_version})
+
+    except CircuitOpenError as e:
+        return circuit_open_response(e)
+    except GatewayRejectedError as e:
+        return gateway_rejected_response(e)
+    except Exception as e:
+        print("".join(traceback.format_exception(None, e, e.__traceback__)))
+        return create_response(500, f"Internal Server Error: {str(e)}")
+
+# /chat/stream 엔드포인트: 생성되는 토큰을 Server-Sent Events로 바로 전달
+@chat_bp.route('/chat/stream', methods=['GET', 'POST'])
+def chat_stream_route():
+    started = time.monotonic()
     connection = get_connection()
+    slot = None
+    stream_ready = False
     try:
-        system_prompt = load_system_prompt()
-        
-        if request.method == 'GET':
-            text, user_uuid, chat_uuid = request.args.get('text'), request.args.get('user_uuid'), request.args.get('chat_uuid')
-        elif request.method == 'POST' and request.is_json:
-            data = request.get_json()
-            text, user_uuid, chat_uuid = data.get('text'), data.get('user_uuid'), data.get('chat_uuid')
-        else:
+        params = parse_chat_request()
+        if params is None:
             return create_response(400, "Content-Type must be application/json for POST requests")
+        text, user_uuid, chat_uuid = params
 
         if not text or not user_uuid:
             return create_response(400, "Missing required parameters")
@@ -86,48 +220,108 @@ def chat_route():
         if user_id is None:
             return create_response(403, "Invalid user_uuid")
 
-        # 채팅 uuid가 없거나 유효하지 않다면 새로운 채팅 생성
-        if not chat_uuid or not is_valid_chat_for_user(user_id, chat_uuid, connection):
-            chat_uuid = generate_unique_chat_uuid(connection)
-            chat_history = []
-            # 새로운 채팅방 생성
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO chats (user_id, chat_uuid, chat_history, created_at, last_message_at) VALUES (%s, %s, %s, NOW(), NOW())",
-                    (user_id, chat_uuid, json.dumps(chat_history))
-                )
-                connection.commit()
-        else:
-            # 기존 채팅방의 chat_history 불러오기
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT chat_history FROM chats WHERE chat_uuid = %s", (chat_uuid,))
-                chat_history = json.loads(cursor.fetchone()['chat_history'])
-
-        # 새 메시지를 chat_history에 추가하고 AI 모델로 응답 생성
-        chat_history.append({"role": "user", "parts": text})
-        chat = genai.GenerativeModel(model_name=MODEL_NAME, system_instruction=system_prompt).start_chat(history=chat_history)
-        response = chat.send_message(text, generation_config=generation_config)
-        chat_history.append({"role": "model", "parts": response.text})
-
-        # chat_history 업데이트
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "UPDATE chats SET chat_history = %s, last_message_at = NOW() WHERE chat_uuid = %s",
-                (json.dumps(chat_history), chat_uuid)
-            )
-            connection.commit()
+        # Gemini 회로가 열려 있으면 채팅방 조회/생성 전에 바로 실패
+        gemini_breaker.reject_if_open()
+
+        # 사용자별 호출 한도 확인
+        gemini_gateway.check_rate(user_id)
+
+        # 게이트웨이 대기, 요약/응답 생성 중에는 DB 커넥션을 붙잡지 않도록 바로 반납
+        connection.close()
+
+        # Gemini 실행 슬롯 확보 (슬롯은 스트림이 끝날 때 반납)
+        # 채팅방은 슬롯을 얻은 뒤에 조회/생성하므로, 대기열에서 거절된 요청은 빈 채팅방을 남기지 않음
+        slot = gemini_gateway.acquire()
+        observe_phase(PHASE_GEMINI_QUEUE, slot.wait)
 
-        return create_response(200, "Success to response", {"chat_uuid": chat_uuid, "input": text, "response": response.text})
+        with get_connection() as connection:
+            chat_state = open_chat(connection, user_id, chat_uuid)
+        chat_uuid = chat_state['chat_uuid']
 
+        with phase(PHASE_CHAT_HISTORY):
+            history = build_chat_history(chat_state)
+        chat, prompt_version = start_model_chat(history)
+
+        # 스트림을 시작하기 전에 회로 상태 확인 (결과는 스트림이 끝날 때 기록)
+        gemini_breaker.allow()
+        stream_ready = True
+
+    except CircuitOpenError as e:
+        return circuit_open_response(e)
+    except GatewayRejectedError as e:
+        return gateway_rejected_response(e)
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
         return create_response(500, f"Internal Server Error: {str(e)}")
     finally:
+        # 오류로 빠져나온 경우에도 커넥션 반납 (이미 반납했으면 아무 일도 하지 않음)
         connection.close()
+        # 스트림을 시작하지 못했으면 Gemini 슬롯도 바로 반납
+        if slot is not None and not stream_ready:
+            slot.release()
+
+    body_started = False
+
+    def generate():
+        nonlocal body_started
+        body_started = True
+        first_token_at = None
+        stream_done = False
+        gemini_failed = False
+        reply = []
+        yield sse_event({"chat_uuid": chat_uuid, "input": text}, event="start")
+        try:
+            # 생성 시간에는 클라이언트로 토큰을 보내는 시간도 포함됨 (마지막 토큰까지)
+            with phase(PHASE_GEMINI):
+                for chunk in chat.send_message(text, generation_config=generation_config, stream=True):
+                    if not chunk.text:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    reply.append(chunk.text)
+                    yield sse_event({"text": chunk.text})
+            stream_done = True
+
+            # 스트림이 끝나면 전체 응답을 저장
+            response_text = "".join(reply)
+            with get_connection() as save_connection:
+                save_chat_turn(save_connection, chat_state, text, response_text)
+                new_challenges = achievement_engine.record(user_id, chat_turn_events(chat_state), save_connection)
+
+            yield sse_event({"chat_uuid": chat_uuid, "response": response_text, "new_challenges": new_challenges}, event="done")
+
+        except Exception as e:
+            gemini_failed = not stream_done
+            print("".join(traceback.format_exception(None, e, e.__traceback__)))
+            yield sse_event({"message": f"Internal Server Error: {str(e)}"}, event="error")
+        finally:
+            slot.release()
+
+            # 회로 차단기에 결과 기록 (클라이언트가 중간에 끊은 경우 토큰을 받았으면 성공으로 간주)
+            if stream_done or (first_token_at is not None and not gemini_failed):
+                gemini_breaker.record_success()
+            else:
+                gemini_breaker.record_failure()
+
+            # 요청 시작부터 첫 토큰까지의 시간(TTFT) 기록
+            ttft = f"{(first_token_at - started) * 1000:.1f}" if first_token_at else "None"
+            print(f"[chat/stream] chat_uuid={chat_uuid} prompt_version={prompt_version} queue_wait_ms={slot.wait * 1000:.1f} ttft_ms={ttft} total_ms={(time.monotonic() - started) * 1000:.1f}")
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Prompt-Version": prompt_version})
+    # 스트림이 시작되기 전에 클라이언트가 끊으면 generate()가 실행되지 않으므로,
+    # 슬롯과 회로 차단기 허가(HALF_OPEN 시험 호출)를 여기서 반납
+    def release_unstarted():
+        slot.release()
+        if not body_started:
+            gemini_breaker.release()
+    response.call_on_close(release_unstarted)
+    return response
 
 # /chat/list 엔드포인트
 @chat_bp.route('/chat/list', methods=['POST'])
 def chatlist_route():
+    connection = None  # 초기화
     try:
         data = request.get_json()
         if not data:
@@ -137,27 +331,35 @@ def chatlist_route():
         if not user_uuid:
             return create_response(400, "Missing 'user_uuid' parameter")
 
+        # 마지막 메시지가 최근인 채팅방부터 limit개씩 (cursor, since/until 선택, limit과 cursor가 없으면 전체)
+        page = PageRequest('chats', data)
+
         connection = get_connection()
         user_id = get_user_id_from_uuid(user_uuid, connection)
         if user_id is None:
             return create_response(403, "Invalid user_uuid")
 
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT chat_uuid, created_at, last_message_at FROM chats WHERE user_id = %s", (user_id,))
-            chat_list = [
-                {"chat_uuid": record['chat_uuid'], "created_at": record['created_at'], "last_message_at": record['last_message_at']}
-                for record in cursor.fetchall()
-            ]
+        with page.cursor(connection) as cursor:
+            cursor.execute(*page.list_query((user_id,)))
+            chat_list, next_cursor = page.fetch(cursor, 'last_message_at', 'chat_id', lambda record: {
+                "chat_uuid": record['chat_uuid'], "created_at": record['created_at'], "last_message_at": record['last_message_at']
+            })
 
-        return create_response(200, "Success to retrieve chat list", {"chats": chat_list})
+        return create_response(200, "Success to retrieve chat list", {"chats": chat_list, "next_cursor": next_cursor})
 
+    except InvalidPageRequest as e:
+        return create_response(400, str(e))
     except Exception as e:
         print(f"Error in chatlist_route: {str(e)}")
         return create_response(500, "Internal Server Error")
+    finally:
+        if connection:
+            connection.close()
 
 # /chat/delete 엔드포인트
 @chat_bp.route('/chat/delete', methods=['POST'])
 def delete_chat_route():
+    connection = None  # 초기화
     try:
         data = request.get_json()
         if not data:
@@ -169,21 +371,29 @@ def delete_chat_route():
 
         connection = get_connection()
         user_id = get_user_id_from_uuid(user_uuid, connection)
-        if user_id is None or not is_valid_chat_for_user(user_id, chat_uuid, connection):
+        if user_id is None:
             return create_response(403, "Invalid user_uuid or chat_uuid for this user")
 
+        # 소유자 조건을 DELETE에 포함시켜 별도의 유효성 조회 없이 처리
         with connection.cursor() as cursor:
             cursor.execute("DELETE FROM chats WHERE chat_uuid = %s AND user_id = %s", (chat_uuid, user_id))
+            deleted = cursor.rowcount
             connection.commit()
+        if not deleted:
+            return create_response(403, "Invalid user_uuid or chat_uuid for this user")
 
         return create_response(200, "Chat room deleted successfully")
 
     except Exception as e:
         print(f"Error in delete_chat_route: {str(e)}")
         return create_response(500, "Internal Server Error")
+    finally:
+        if connection:
+            connection.close()
 
 @chat_bp.route('/chat/detail', methods=['POST'])
 def chat_detail_route():
+    connection = None  # 초기화
     try:
         data = request.get_json()
         if not data:
@@ -193,27 +403,37 @@ def chat_detail_route():
         if not user_uuid or not chat_uuid:
             return create_response(400, "Missing 'user_uuid' or 'chat_uuid' parameter")
 
+        # 선택: after_seq 이후의 메시지만 limit 개 조회 (기본값은 전체)
+        after_seq = parse_non_negative_int(data.get('after_seq', 0))
+        limit = data.get('limit')
+        limit = parse_non_negative_int(limit) if limit is not None else None
+        if after_seq is None or (data.get('limit') is not None and limit is None):
+            return create_response(400, "'after_seq' and 'limit' must be non-negative integers")
+
         connection = get_connection()
         user_id = get_user_id_from_uuid(user_uuid, connection)
         
         # 유효한 user_uuid와 chat_uuid 확인
-        if user_id is None or not is_valid_chat_for_user(user_id, chat_uuid, connection):
+        chat_id = get_chat_id(user_id, chat_uuid, connection) if user_id is not None else None
+        if chat_id is None:
             return create_response(403, "Invalid user_uuid or chat_uuid for this user")
 
-        with connection.cursor() as cursor:
-            # 해당 채팅방의 채팅 내역 가져오기
-            cursor.execute("SELECT chat_history FROM chats WHERE chat_uuid = %s", (chat_uuid,))
-            result = cursor.fetchone()
+        # 해당 채팅방의 채팅 내역을 seq 범위로 가져오기
+        messages = load_chat_messages(connection, chat_id, after_seq, limit)
+        if not messages and not has_chat_messages(connection, chat_id):
+            # 아직 chat_messages로 이관되지 않은 채팅방이면 JSON 컬럼에서 같은 범위를 잘라 반환
+            messages = [m for m in load_legacy_chat_history(connection, chat_id) if m['seq'] > after_seq]
+            if limit is not None:
+                messages = messages[:limit]
 
-            if not result:
-                return create_response(404, "Chat history not found")
-            
-            chat_history = json.loads(result['chat_history'])
+        chat_history = to_model_history(messages)
+        last_seq = messages[-1]['seq'] if messages else after_seq
 
-        return create_response(200, "Chat history retrieved successfully", {"chat_uuid": chat_uuid, "chat_history": chat_history})
+        return create_response(200, "Chat history retrieved successfully", {"chat_uuid": chat_uuid, "chat_history": chat_history, "last_seq": last_seq})
 
     except Exception as e:
         print(f"Error in chat_detail_route: {str(e)}")
         return create_response(500, "Internal Server Error")
     finally:
-        connection.close()
\ No newline at end of file
+        if connection:
+            connection.close()
\ No newline at end of file
@@ -0,0 +1,260 @@
+# routes/chat_async.py
+# ASGI 모드용 /chat, /chat/stream 비동기 핸들러
+# Gemini 응답을 기다리는 동안 스레드를 점유하지 않으므로, 한 프로세스에서 많은 생성 요청을 동시에 처리할 수 있다.
+# 설정/프롬프트/회로 차단기/게이트웨이는 동기 버전(routes/chat.py)과 공유한다.
+
+import asyncio
+import json
+import os
+import sys
+import time
+import traceback
+
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+# ../db 경로를 sys.path에 추가하여 async_pool 모듈을 불러올 수 있도록 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'db'))
+
+from async_pool import get_async_pool
+from routes.chat import MODEL_NAME, generation_config, gemini_breaker, start_model_chat, sse_event
+from utils.async_response import create_async_response
+from utils.get_user_id_from_uuid import get_user_id_from_uuid_async
+from utils.chat_messages_async import (
+    get_chat, load_chat_messages, load_legacy_chat_history, append_chat_messages, save_chat_summary, lock_last_seq
+)
+from utils.chat_context import build_summary_prompt
+from utils.chat_state import (
+    NEW_CHAT_SQL, NEW_CHAT_UUID_KEY, TOUCH_CHAT_SQL, new_chat_params, existing_chat, new_chat,
+    needs_legacy_history, split_history, apply_summary, model_history, turn_messages, chat_turn_events
+)
+from utils.circuit_breaker import CircuitOpenError
+from utils.gemini_gateway import gemini_gateway, GatewayRejectedError, QUEUE_TIMEOUT
+from utils.model_registry import prompt_registry
+from utils.uuid_generator import insert_with_new_uuid_async
+from utils.achievements import achievement_engine
+
+# 요청에서 text, user_uuid, chat_uuid 추출 (형식 오류 시 None 반환)
+async def parse_chat_request(request):
+    if request.method == 'GET':
+        params = request.query_params
+        return params.get('text'), params.get('user_uuid'), params.get('chat_uuid')
+    if request.method == 'POST' and request.headers.get('content-type', '').startswith('application/json'):
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return None
+        return data.get('text'), data.get('user_uuid'), data.get('chat_uuid')
+    return None
+
+# 오래된 메시지를 기존 요약에 합쳐 새 요약문 생성
+async def summarize_messages(summary, messages):
+    model, _ = prompt_registry.get_model(None, MODEL_NAME)
+    response = await gemini_breaker.call_async(
+        lambda: model.generate_content_async(build_summary_prompt(summary, messages), generation_config=generation_config)
+    )
+    return response.text.strip()
+
+# 기존 채팅방을 불러오거나, chat_uuid가 없거나 유효하지 않으면 새로운 채팅방 생성 (routes/chat.py open_chat의 I/O만 비동기)
+async def open_chat(connection, user_id, chat_uuid):
+    record = await get_chat(user_id, chat_uuid, connection) if chat_uuid else None
+    if record is not None:
+        messages = await load_chat_messages(connection, record['chat_id'], after_seq=record['summary_seq'] or 0)
+        legacy = False
+        if needs_legacy_history(messages, record['summary_seq'] or 0):
+            messages = await load_legacy_chat_history(connection, record['chat_id'])
+            legacy = bool(messages)
+        return existing_chat(record, chat_uuid, messages, legacy)
+
+    async with connection.cursor() as cursor:
+        chat_uuid = await insert_with_new_uuid_async(cursor, NEW_CHAT_SQL, new_chat_params(user_id), NEW_CHAT_UUID_KEY)
+        chat_id = cursor.lastrowid
+    await connection.commit()
+    return new_chat(chat_id, chat_uuid)
+
+# Gemini에 보낼 히스토리 구성 (필요하면 오래된 메시지를 요약으로 접음)
+async def build_chat_history(chat):
+    to_fold, keep = split_history(chat)
+    if to_fold:
+        apply_summary(chat, await summarize_messages(chat['summary'], to_fold), to_fold)
+    return model_history(chat, keep)
+
+# 이번 턴의 메시지 저장 (요약이 바뀌었으면 요약도 함께)
+async def save_chat_turn(connection, chat, text, reply):
+    # 풀이 autocommit이므로 seq 확보부터 저장까지 한 트랜잭션으로 묶음
+    await connection.begin()
+    try:
+        start_seq, messages = turn_messages(chat, text, reply, await lock_last_seq(connection, chat['chat_id']))
+        await append_chat_messages(connection, chat['chat_id'], start_seq, messages)
+        if chat['summary_changed']:
+            await save_chat_summary(connection, chat['chat_id'], chat['summary'], chat['summary_seq'])
+        async with connection.cursor() as cursor:
+            await cursor.execute(TOUCH_CHAT_SQL, (chat['chat_id'],))
+    except Exception:
+        await connection.rollback()
+        raise
+    await connection.commit()
+
+def circuit_open_response(error):
+    retry_after = int(error.retry_after) + 1
+    return create_async_response(503, "Chat service temporarily unavailable, please retry later",
+                                 {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+
+def gateway_rejected_response(error):
+    retry_after = int(error.retry_after) + 1
+    status = 503 if error.reason == QUEUE_TIMEOUT else 429
+    return create_async_response(status, "Too many chat requests, please retry later",
+                                 {"retry_after": retry_after, "reason": error.reason}, headers={"Retry-After": str(retry_after)})
+
+# 요청 검증 후 (text, user_id, chat_uuid) 또는 오류 응답 반환
+async def resolve_chat_request(request):
+    params = await parse_chat_request(request)
+    if params is None:
+        return None, create_async_response(400, "Content-Type must be application/json for POST requests")
+    text, user_uuid, chat_uuid = params
+    if not text or not user_uuid:
+        return None, create_async_response(400, "Missing required parameters")
+
+    async with get_async_pool().acquire() as connection:
+        user_id = await get_user_id_from_uuid_async(user_uuid, connection)
+    if user_id is None:
+        return None, create_async_response(403, "Invalid user_uuid")
+    return (text, user_id, chat_uuid), None
+
+# /chat 엔드포인트
+async def chat_route(request):
+    try:
+        params, error_response = await resolve_chat_request(request)
+        if error_response is not None:
+            return error_response
+        text, user_id, chat_uuid = params
+
+        # Gemini 회로가 열려 있으면 채팅방 조회/생성 전에 바로 실패
+        gemini_breaker.reject_if_open()
+
+        # 사용자별 호출 한도 확인 후 Gemini 실행 슬롯 확보
+        gemini_gateway.check_rate(user_id)
+        with (await gemini_gateway.acquire_async()) as slot:
+            # DB 커넥션은 조회/저장할 때만 빌리고, Gemini 응답을 기다리는 동안에는 붙잡지 않음
+            async with get_async_pool().acquire() as connection:
+                chat_state = await open_chat(connection, user_id, chat_uuid)
+            chat_uuid = chat_state['chat_uuid']
+
+            chat, prompt_version = start_model_chat(await build_chat_history(chat_state))
+            response = await gemini_breaker.call_async(
+                lambda: chat.send_message_async(text, generation_config=generation_config)
+            )
+
+        async with get_async_pool().acquire() as connection:
+            await save_chat_turn(connection, chat_state, text, response.text)
+        # 도전 과제 판정기는 동기 커넥션 풀을 쓰므로 스레드에서 실행
+        new_challenges = await asyncio.to_thread(achievement_engine.record, user_id, chat_turn_events(chat_state))
+
+        print(f"[chat/async] chat_uuid={chat_uuid} prompt_version={prompt_version} queue_wait_ms={slot.wait * 1000:.1f}")
+        return create_async_response(200, "Success to response",
+                                     {"chat_uuid": chat_uuid, "input": text, "response": response.text, "new_challenges": new_challenges},
+                                     headers={"X-Prompt-Version": prompt_version})
+
+    except CircuitOpenError as e:
+        return circuit_open_response(e)
+    except GatewayRejectedError as e:
+        return gateway_rejected_response(e)
+    except Exception as e:
+        print("".join(traceback.format_exception(None, e, e.__traceback__)))
+        return create_async_response(500, f"Internal Server Error: {str(e)}")
+
+# /chat/stream 엔드포인트: 생성되는 토큰을 Server-Sent Events로 바로 전달
+async def chat_stream_route(request):
+    started = time.monotonic()
+    slot = None
+    stream_ready = False
+    try:
+        params, error_response = await resolve_chat_request(request)
+        if error_response is not None:
+            return error_response
+        text, user_id, chat_uuid = params
+
+        gemini_breaker.reject_if_open()
+
+        # 사용자별 호출 한도 확인 후 Gemini 실행 슬롯 확보 (슬롯은 스트림이 끝날 때 반납)
+        gemini_gateway.check_rate(user_id)
+        slot = await gemini_gateway.acquire_async()
+
+        async with get_async_pool().acquire() as connection:
+            chat_state = await open_chat(connection, user_id, chat_uuid)
+        chat_uuid = chat_state['chat_uuid']
+        chat, prompt_version = start_model_chat(await build_chat_history(chat_state))
+
+        # 스트림을 시작하기 전에 회로 상태 확인 (결과는 스트림이 끝날 때 기록)
+        gemini_breaker.allow()
+        stream_ready = True
+
+    except CircuitOpenError as e:
+        return circuit_open_response(e)
+    except GatewayRejectedError as e:
+        return gateway_rejected_response(e)
+    except Exception as e:
+        print("".join(traceback.format_exception(None, e, e.__traceback__)))
+        return create_async_response(500, f"Internal Server Error: {str(e)}")
+    finally:
+        # 스트림을 시작하지 못했으면 Gemini 슬롯을 바로 반납
+        if slot is not None and not stream_ready:
+            slot.release()
+
+    body_started = False
+
+    async def generate():
+        nonlocal body_started
+        body_started = True
+        first_token_at = None
+        stream_done = False
+        gemini_failed = False
+        reply = []
+        yield sse_event({"chat_uuid": chat_uuid, "input": text}, event="start")
+        try:
+            response = await chat.send_message_async(text, generation_config=generation_config, stream=True)
+            async for chunk in response:
+                if not chunk.text:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                reply.append(chunk.text)
+                yield sse_event({"text": chunk.text})
+            stream_done = True
+
+            # 스트림이 끝나면 전체 응답을 저장
+            response_text = "".join(reply)
+            async with get_async_pool().acquire() as connection:
+                await save_chat_turn(connection, chat_state, text, response_text)
+            new_challenges = await asyncio.to_thread(achievement_engine.record, user_id, chat_turn_events(chat_state))
+
+            yield sse_event({"chat_uuid": chat_uuid, "response": response_text, "new_challenges": new_challenges}, event="done")
+
+        except Exception as e:
+            gemini_failed = not stream_done
+            print("".join(traceback.format_exception(None, e, e.__traceback__)))
+            yield sse_event({"message": f"Internal Server Error: {str(e)}"}, event="error")
+        finally:
+            slot.release()
+
+            # 회로 차단기에 결과 기록 (클라이언트가 중간에 끊은 경우 토큰을 받았으면 성공으로 간주)
+            if stream_done or (first_token_at is not None and not gemini_failed):
+                gemini_breaker.record_success()
+            else:
+                gemini_breaker.record_failure()
+
+            ttft = f"{(first_token_at - started) * 1000:.1f}" if first_token_at else "None"
+            print(f"[chat/stream/async] chat_uuid={chat_uuid} prompt_version={prompt_version} "
+                  f"queue_wait_ms={slot.wait * 1000:.1f} ttft_ms={ttft} total_ms={(time.monotonic() - started) * 1000:.1f}")
+
+    # 스트림이 시작되기 전에 클라이언트가 끊으면 generate()가 실행되지 않으므로,
+    # 슬롯과 회로 차단기 허가(HALF_OPEN 시험 호출)를 응답 후 작업에서 반납
+    def release_unstarted():
+        slot.release()
+        if not body_started:
+            gemini_breaker.release()
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Prompt-Version": prompt_version},
+                             background=BackgroundTask(release_unstarted))
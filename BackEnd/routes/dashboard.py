@@ -0,0 +1,256 @@
+from flask import Blueprint, request
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+# 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.join(current_dir, '..', 'db')
+sys.path.append(parent_dir)
+
+from db_config import get_connection
+from utils.response import create_response
+from utils.get_user_id_from_uuid import get_user_id_from_uuid
+from utils.pagination import PageRequest, InvalidPageRequest
+from utils.circuit_breaker import CircuitOpenError
+from utils.gemini_gateway import GatewayRejectedError, QUEUE_TIMEOUT
+from utils.model_registry import prompt_registry
+from utils.suggestion_cache import gensentence_payload
+from utils.request_metrics import worker_phases, merge_phases, SLOW_REQUEST_THRESHOLD_MS
+from utils.request_profiler import request_profiler
+from routes.weather import fetch_weather_data, weather_suggestion, log_user_action, validate_request_data
+from routes.challenge import list_user_challenges
+
+# 홈 화면 대시보드
+# 앱 시작 시 따로 호출하던 /weather, /weather/air, /weather/gensentence, /challenge/list를 한 번의 요청으로 처리한다.
+# 사용자는 한 번만 확인하고, 각 항목은 워커 스레드 풀에서 동시에 조회한다.
+# 추천 문구는 앱이 /weather/gensentence로 보내던 것과 같은 입력(섭씨 기온, 날씨 상태, 미세먼지, 3시간 예보)이 필요하므로
+# 현재 날씨, 대기질, 예보가 모두 오면 그 입력을 만들어 시작한다.
+# 일부 항목이 실패하거나 제한 시간 안에 끝나지 않아도 나머지 결과와 항목별 오류를 함께 반환한다.
+#
+# 제한 시간이 지나 버려진 항목도 끝날 때까지 워커를 차지하므로,
+# - 실행 중이거나 대기 중인 항목이 DASHBOARD_WORKERS 개면 새 항목은 풀에서 기다리지 않고 바로 503으로 처리하고
+# - 추천 문구의 Gemini 슬롯 대기는 요청의 남은 시간까지만 기다린다
+#   (날씨 조회는 HTTP 타임아웃, 도전 과제는 커넥션 풀 대기 시간으로 이미 제한됨).
+DASHBOARD_WORKERS = int(os.getenv("DASHBOARD_WORKERS", 16))
+DASHBOARD_TIMEOUT = float(os.getenv("DASHBOARD_TIMEOUT", 8))  # 초, 요청 전체의 제한 시간
+
+SECTIONS = ("weather", "air", "suggestion", "challenges")
+
+# 날씨 조회 항목 → OpenWeatherMap 엔드포인트 (forecast는 추천 문구 입력용으로만 조회)
+WEATHER_SECTIONS = {"weather": "weather", "air": "air_pollution", "forecast": "forecast"}
+# 추천 문구 입력을 만드는 데 필요한 항목
+SUGGESTION_INPUTS = ("weather", "air", "forecast")
+
+# 항목별로 기록할 사용자 행동 (각 엔드포인트를 따로 호출했을 때와 같은 행동 ID, ActionList.md 참고)
+SECTION_ACTIONS = {
+    "weather": (7, 'Get weather info'),
+    "air": (8, 'Get air pollution info'),
+    "suggestion": (10, "Generate weather-related suggestions using the Gemini API"),
+}
+
+dashboard_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+# 아직 끝나지 않은 항목 수 제한 (워커 수와 같아서 풀의 대기열에는 쌓이지 않음)
+dashboard_capacity = threading.BoundedSemaphore(DASHBOARD_WORKERS)
+
+# Blueprint 생성
+dashboard_bp = Blueprint('dashboard', __name__)
+
+
+class SectionError(Exception):
+    """항목 조회 실패 (status: 해당 엔드포인트를 따로 호출했을 때의 상태 코드)"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+def load_weather(endpoint, lat, lon):
+    status_code, data, cache_age, stale = fetch_weather_data(endpoint, lat, lon)
+    if status_code != 200:
+        raise SectionError(status_code, f"Failed to fetch {endpoint} data")
+    return {"data": data, "cache_age": cache_age, "stale": stale}
+
+
+def load_suggestion(user_id, inputs, deadline):
+    """inputs: 추천 문구 입력 항목 이름 → OpenWeatherMap 원본 응답"""
+    _, prompt_version = prompt_registry.get_prompt('weather')
+    weather_data = gensentence_payload(inputs['weather'], inputs['air'], inputs['forecast'])
+    queue_timeout = max(deadline - time.monotonic(), 0)
+    return {"data": weather_suggestion(user_id, weather_data, prompt_version, queue_timeout), "prompt_version": prompt_version}
+
+
+def load_challenges(user_id, page):
+    with get_connection() as connection:
+        challenges, next_cursor = list_user_challenges(connection, user_id, page)
+    return {"challenges": challenges, "next_cursor": next_cursor}
+
+
+class SectionTask:
+    """
+    워커 스레드에서 실행하는 항목 하나.
+    워커에는 요청 컨텍스트가 없으므로 구간 시간과 프로파일 표본을 따로 모았다가, 끝난 뒤 요청 스레드에서 합친다.
+    """
+
+    def __init__(self, name, fn, *args):
+        self.name = name
+        self.phases = {}
+        self.samples = Counter()
+        self.profile = request_profiler.current()
+        self._fn = fn
+        self._args = args
+
+    def run(self):
+        with worker_phases(self.phases):
+            if self.profile is None:
+                return self._fn(*self._args)
+            with request_profiler.worker(self.samples):
+                return self._fn(*self._args)
+
+    def merge(self):
+        merge_phases(self.phases)
+        if self.profile is not None:
+            request_profiler.add_samples(self.profile, self.samples)
+
+
+def submit_section(pending, name, fn, *args):
+    """항목을 워커 풀에 넣음. 버려진 항목들로 워커가 모두 차 있으면 SectionError(503)"""
+    if not dashboard_capacity.acquire(blocking=False):
+        raise SectionError(503, f"Too many dashboard requests in progress for {name}", retry_after=1)
+    task = SectionTask(name, fn, *args)
+    try:
+        future = dashboard_executor.submit(task.run)
+    except Exception:
+        dashboard_capacity.release()
+        raise
+    # 끝나거나 취소되면 반납 (버려진 항목은 실제로 끝날 때 반납)
+    future.add_done_callback(lambda _: dashboard_capacity.release())
+    pending[future] = task
+
+
+def section_error(name, error):
+    """항목 예외를 응답의 errors 항목으로 변환 (상태 코드는 개별 엔드포인트와 같게)"""
+    if isinstance(error, SectionError):
+        result = {"status": error.status, "message": error.message}
+        if error.retry_after is not None:
+            result["retry_after"] = error.retry_after
+        return result
+    if isinstance(error, GatewayRejectedError):
+        status = 503 if error.reason == QUEUE_TIMEOUT else 429
+        return {"status": status, "message": f"{name} rejected: {error.reason}", "retry_after": int(error.retry_after) + 1}
+    if isinstance(error, CircuitOpenError):
+        return {"status": 503, "message": f"{name} temporarily unavailable", "retry_after": int(error.retry_after) + 1}
+    if isinstance(error, requests.Timeout):
+        return {"status": 504, "message": f"Timed out fetching {name}"}
+    if isinstance(error, requests.ConnectionError):
+        return {"status": 502, "message": f"Failed to connect while fetching {name}"}
+    print("".join(traceback.format_exception(None, error, error.__traceback__)))
+    return {"status": 500, "message": f"Failed to load {name}"}
+
+
+# /dashboard 엔드포인트: 홈 화면에 필요한 데이터를 한 번에 조회
+@dashboard_bp.route('/dashboard', methods=['POST'])
+def dashboard_route():
+    """
+    요청: user_uuid, lat, lon, sections(선택, 기본은 전체), challenges(선택, /challenge/list와 같은 페이지 옵션)
+    응답: 항목 이름 → 결과 (실패한 항목은 None이고 errors에 상태 코드와 메시지)
+    """
+    started = time.monotonic()
+    data = request.get_json()
+    validation_error = validate_request_data(data, ['user_uuid', 'lat', 'lon'])
+    if validation_error:
+        return validation_error
+
+    sections = data.get('sections', list(SECTIONS))
+    if not isinstance(sections, list) or any(name not in SECTIONS for name in sections):
+        return create_response(400, f"sections must be a list of: {', '.join(SECTIONS)}")
+
+    try:
+        page = PageRequest('challenges', data.get('challenges') or {})
+    except InvalidPageRequest as e:
+        return create_response(400, str(e))
+
+    # 사용자는 한 번만 확인 (항목들은 각자 풀에서 커넥션을 빌림)
+    with get_connection() as connection:
+        user_id = get_user_id_from_uuid(data['user_uuid'], connection)
+    if user_id is None:
+        return create_response(403, "Invalid user_uuid")
+
+    lat, lon = data['lat'], data['lon']
+    results = {name: None for name in sections}
+    errors = {}
+    deadline = started + DASHBOARD_TIMEOUT
+    needed = set(SUGGESTION_INPUTS) if 'suggestion' in sections else set()
+    inputs = {}
+    pending = {}
+
+    def fail(name, error):
+        # 추천 문구 입력 항목이 실패하면 추천 문구도 만들 수 없음
+        if name in needed and 'suggestion' not in errors:
+            errors['suggestion'] = {"status": 424, "message": f"{name} data unavailable for suggestion"}
+        if name in results:
+            errors[name] = section_error(name, error)
+
+    def start(name, fn, *args):
+        try:
+            submit_section(pending, name, fn, *args)
+        except SectionError as e:
+            fail(name, e)
+
+    for name, endpoint in WEATHER_SECTIONS.items():
+        if name in sections or name in needed:
+            start(name, load_weather, endpoint, lat, lon)
+    if 'challenges' in sections:
+        start('challenges', load_challenges, user_id, page)
+
+    while pending:
+        done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            task = pending.pop(future)
+            task.merge()
+            name = task.name
+            try:
+                result = future.result()
+            except Exception as e:
+                fail(name, e)
+                continue
+
+            if name in results:
+                results[name] = result
+            if name in needed:
+                inputs[name] = result['data']
+                if len(inputs) == len(needed) and 'suggestion' not in errors:
+                    start('suggestion', load_suggestion, user_id, inputs, deadline)
+
+    # 제한 시간 안에 끝나지 않은 항목은 기다리지 않음 (실행 중인 조회는 끝까지 진행되어 캐시를 채움)
+    for future in pending:
+        future.cancel()
+    for name in sections:
+        if results[name] is None and name not in errors:
+            errors[name] = {"status": 504, "message": f"Timed out loading {name}"}
+
+    # 성공한 항목은 개별 엔드포인트를 호출했을 때와 같이 사용자 행동 기록
+    # (기록 실패는 로그로 남기고, 이미 조회한 결과는 그대로 반환)
+    for name, (action_id, doing_action) in SECTION_ACTIONS.items():
+        if results.get(name) is not None:
+            try:
+                log_user_action(None, user_id, action_id, doing_action)
+            except Exception as e:
+                print(f"[dashboard] Failed to log action {action_id} for user_id={user_id}: {str(e)}")
+
+    # 느린 요청만 항목별 결과를 로그로 남김 (SLOW_REQUEST_THRESHOLD_MS, 0이면 기록하지 않음)
+    total_ms = (time.monotonic() - started) * 1000
+    if SLOW_REQUEST_THRESHOLD_MS and total_ms >= SLOW_REQUEST_THRESHOLD_MS:
+        print(f"[dashboard] user_id={user_id} sections={','.join(sections)} failed={','.join(errors) or '-'} "
+              f"total_ms={total_ms:.1f}")
+    return create_response(200, "Dashboard retrieved", {**results, "errors": errors})
@@ -5,11 +5,23 @@ import traceback
 from dotenv import load_dotenv
 import requests
 import json
+import math
 import google.generativeai as genai
-from datetime import datetime
 from db_config import get_connection
 from utils.response import create_response
 from utils.get_user_id_from_uuid import get_user_id_from_uuid
+from utils.weather_cache import create_weather_cache
+from utils.single_flight import SingleFlight
+from utils.suggestion_cache import SuggestionCache, weather_fingerprint
+from utils.action_recorder import action_recorder
+from utils.upstream_client import UpstreamClient, RETRYABLE_STATUS
+from utils.circuit_breaker import get_breaker, CircuitOpenError
+from utils.model_registry import prompt_registry
+from utils.gemini_gateway import gemini_gateway, GatewayRejectedError, QUEUE_TIMEOUT
+from utils.request_metrics import phase, observe_phase, PHASE_GEMINI, PHASE_GEMINI_QUEUE
+from utils.forecast_compact import (
+    InvalidCompactRequest, parse_compact_options, compact_forecast, project, lookup_compact, store_compact
+)
 
 # .env 파일 로드 및 환경 변수에서 API 키 가져오기
 load_dotenv()
@@ -26,64 +38,202 @@ generation_config = {
     "max_output_tokens": 8096,  # 최대 출력 토큰 수
 }
 
+# OpenWeatherMap 엔드포인트별 URL 및 캐시 유지 시간(초)
+WEATHER_ENDPOINTS = {
+    "weather": {
+        "url": "http://api.openweathermap.org/data/2.5/weather",
+        "ttl": int(os.getenv("WEATHER_CACHE_TTL_CURRENT", 600)),  # 현재 날씨: 10분
+        "read_timeout": float(os.getenv("WEATHER_READ_TIMEOUT_CURRENT", 5)),
+    },
+    "air_pollution": {
+        "url": "http://api.openweathermap.org/data/2.5/air_pollution",
+        "ttl": int(os.getenv("WEATHER_CACHE_TTL_AIR", 1800)),  # 공기질: 30분
+        "read_timeout": float(os.getenv("WEATHER_READ_TIMEOUT_AIR", 5)),
+    },
+    "forecast": {
+        "url": "https://api.openweathermap.org/data/2.5/forecast",
+        "ttl": int(os.getenv("WEATHER_CACHE_TTL_FORECAST", 3600)),  # 3시간 간격 예보: 1시간
+        "read_timeout": float(os.getenv("WEATHER_READ_TIMEOUT_FORECAST", 10)),  # 응답이 커서 더 길게
+    },
+}
+
+# OpenWeatherMap API 주소를 바꿀 때 설정 (예: 벤치마크용 대체 서버), 경로 끝은 엔드포인트 이름
+OPENWEATHERMAP_BASE_URL = os.getenv("OPENWEATHERMAP_BASE_URL")
+if OPENWEATHERMAP_BASE_URL:
+    for endpoint, config in WEATHER_ENDPOINTS.items():
+        config['url'] = f"{OPENWEATHERMAP_BASE_URL.rstrip('/')}/{endpoint}"
+
+# OpenWeatherMap 공용 HTTP 클라이언트 (keep-alive 커넥션 풀, 타임아웃, 재시도, 지연 시간 히스토그램)
+WEATHER_CONNECT_TIMEOUT = float(os.getenv("WEATHER_CONNECT_TIMEOUT", 3.05))
+weather_client = UpstreamClient(
+    "openweathermap",
+    timeouts={endpoint: (WEATHER_CONNECT_TIMEOUT, config['read_timeout']) for endpoint, config in WEATHER_ENDPOINTS.items()},
+    max_retries=int(os.getenv("WEATHER_MAX_RETRIES", 2)),
+    pool_maxsize=int(os.getenv("WEATHER_POOL_MAXSIZE", 20)),
+)
+
+# 위경도 격자 단위 응답 캐시
+weather_cache = create_weather_cache()
+
+# 외부 서비스 장애 시 요청을 바로 실패시키는 회로 차단기 (gemini는 chat 블루프린트와 공유)
+weather_breaker = get_breaker("openweathermap")
+gemini_breaker = get_breaker("gemini")
+
+# 같은 키로 동시에 들어온 외부 호출을 하나로 합치는 single-flight 그룹
+weather_flight = SingleFlight("openweathermap")
+gensentence_flight = SingleFlight("gensentence")
+
+# 날씨 관련 행동 기록 방식: async(기본, 모아서 저장) 또는 sync(요청 중 바로 저장)
+WEATHER_ACTION_LOG_MODE = os.getenv("WEATHER_ACTION_LOG_MODE", "async")
+
+# 날씨 지문별 추천 문구 캐시 (지문마다 GENSENTENCE_VARIANTS 개의 문구를 모아 무작위로 제공)
+suggestion_cache = SuggestionCache(
+    maxsize=int(os.getenv("GENSENTENCE_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("GENSENTENCE_CACHE_TTL", 10800)),  # 3시간
+    variants=int(os.getenv("GENSENTENCE_VARIANTS", 3)),
+)
+
 # Blueprint 생성: weather 관련 API 그룹화
 weather_bp = Blueprint('weather', __name__)
 
-# 시스템 프롬프트 로드 함수
-def load_system_prompt():
+# 시스템 프롬프트 등록: 처음 사용할 때 한 번 읽고, 파일이 바뀌면 자동으로 다시 읽음
+# (파일이 없으면 사용 시점에 FileNotFoundError 발생)
+prompt_registry.register('weather', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weather_prompt.md'))
+
+# 요청 데이터 유효성 검사 함수
+def coordinate_error(data):
     """
-    시스템에서 사용할 프롬프트 파일을 읽어오는 함수.
-    파일이 없으면 FileNotFoundError 발생.
+    lat/lon이 숫자(또는 숫자 문자열)이고 범위 안인지 확인. 잘못되었으면 오류 메시지, 아니면 None.
+    (캐시 칸 계산이나 외부 API 호출 중에 500으로 실패하지 않도록 요청 단계에서 거름)
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    prompt_path = os.path.join(current_dir, 'weather_prompt.md')
-    if not os.path.exists(prompt_path):
-        raise FileNotFoundError(f"Prompt file not found at {prompt_path}")
-    with open(prompt_path, 'r', encoding='utf-8') as file:
-        return file.read()
+    for key, bound in (('lat', 90), ('lon', 180)):
+        value = data[key]
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            number = float(value)
+        except (TypeError, ValueError):
+            return f"'{key}' must be a number"
+        if not math.isfinite(number) or abs(number) > bound:
+            return f"'{key}' must be between -{bound} and {bound}"
+    return None
 
-# 요청 데이터 유효성 검사 함수
 def validate_request_data(data, keys):
     """
     요청 데이터에서 필수 키가 모두 존재하는지 확인.
-    누락된 키가 있으면 400 상태 코드 응답 반환.
+    누락된 키가 있거나 lat/lon이 올바른 좌표가 아니면 400 상태 코드 응답 반환.
     """
+    if not isinstance(data, dict):
+        return create_response(400, "Invalid JSON payload")
     missing_keys = [key for key in keys if key not in data]
     if missing_keys:
         return create_response(400, f"Missing parameters: {', '.join(missing_keys)}")
+    if 'lat' in keys and 'lon' in keys:
+        error = coordinate_error(data)
+        if error:
+            return create_response(400, error)
     return None
 
 # 사용자 행동 기록 함수
 def log_user_action(connection, user_id, action_id, doing_action):
     """
     사용자의 특정 행동을 DB에 기록하는 함수.
+    WEATHER_ACTION_LOG_MODE가 async면 큐에 넣고 바로 반환한다.
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO useractions (user_id, action_id, doing_action, time) 
-                VALUES (%s, %s, %s, %s)
-                """,
-                (user_id, action_id, doing_action, datetime.now())
-            )
-            connection.commit()
+        action_recorder.record(user_id, action_id, doing_action, mode=WEATHER_ACTION_LOG_MODE, connection=connection)
     except Exception as e:
         print(f"Error logging user action: {str(e)}")
         raise
 
-# API 호출 및 사용자 행동 기록 함수
-def call_api_and_record_action(user_uuid, lat, lon, api_url, action_id, doing_action, data_key):
+# 캐시를 거쳐 OpenWeatherMap 데이터 조회
+def fetch_weather_data(endpoint, lat, lon):
     """
-    외부 API를 호출하고 사용자 행동을 기록하는 함수.
+    위경도를 격자 칸으로 반올림한 뒤, 캐시에 있으면 캐시 값을, 없으면 외부 API를 호출한다.
+    외부 API가 실패하거나 회로가 열려 있으면 보관 중인 오래된 값을 stale로 표시해 반환한다.
+    반환값: (status_code, data, cache_age_seconds, stale) - 외부 호출 결과면 cache_age는 0
     """
-    try:
-        # 외부 API 호출
-        response = requests.get(api_url)
+    config = WEATHER_ENDPOINTS[endpoint]
+    cell_lat, cell_lon = weather_cache.cell(lat, lon)
+    cache_key = weather_cache.key(endpoint, cell_lat, cell_lon)
+
+    cached = weather_cache.get(cache_key, config['ttl'])
+    if cached is not None:
+        data, age = cached
+        return 200, data, int(age), False
+
+    def serve_stale(error_status):
+        stale = weather_cache.get_stale(cache_key)
+        if stale is None:
+            return None
+        print(f"Serving stale {endpoint} data for {cache_key} (age {int(stale[1])}s) after upstream failure: {error_status}")
+        return 200, stale[0], int(stale[1]), True
+
+    def fetch():
+        # 앞선 호출이 방금 캐시를 채웠을 수 있으므로 한 번 더 확인
+        cached = weather_cache.get(cache_key, config['ttl'])
+        if cached is not None:
+            return 200, cached[0], int(cached[1]), False
+
+        params = {"lat": cell_lat, "lon": cell_lon, "appid": OPENWEATHERMAP_API_KEY}
+        try:
+            response = weather_breaker.call(
+                lambda: weather_client.get(endpoint, config['url'], params=params),
+                is_failure=lambda r: r.status_code in RETRYABLE_STATUS
+            )
+        except (CircuitOpenError, requests.RequestException) as e:
+            result = serve_stale(type(e).__name__)
+            if result is None:
+                raise
+            return result
+
         if response.status_code != 200:
-            return create_response(response.status_code, f"Failed to fetch {data_key} data")
+            return serve_stale(response.status_code) or (response.status_code, None, None, False)
 
         data = response.json()  # API 응답 데이터를 JSON 형태로 파싱
+        weather_cache.set(cache_key, data, config['ttl'])
+        return 200, data, 0, False
+
+    # 같은 칸에 대한 동시 요청은 외부 호출 한 번으로 합침
+    return weather_flight.do(cache_key, fetch)
+
+# compact 형식의 3시간 간격 예보 조회
+def fetch_compact_forecast(lat, lon, units):
+    """
+    단위계별 compact 예보가 캐시에 있으면 원본 예보를 읽지 않고 바로 반환하고,
+    없으면 원본 예보(fetch_weather_data)를 변환한 뒤 원본 옆에 캐시한다.
+    반환값: fetch_weather_data와 같은 (status_code, data, cache_age_seconds, stale)
+    """
+    config = WEATHER_ENDPOINTS['forecast']
+    raw_key = weather_cache.key('forecast', *weather_cache.cell(lat, lon))
+    cached = lookup_compact(weather_cache, raw_key, units, config['ttl'])
+    if cached is not None:
+        return 200, cached[0], cached[1], False
+
+    status_code, data, cache_age, stale = fetch_weather_data('forecast', lat, lon)
+    if status_code != 200:
+        return status_code, data, cache_age, stale
+
+    compact = compact_forecast(data, units)
+    # 장애 중 받은 오래된(stale) 원본으로 만든 결과는 캐시하지 않음
+    if not stale:
+        store_compact(weather_cache, raw_key, units, config['ttl'], compact, cache_age)
+    return 200, compact, cache_age, stale
+
+# API 호출 및 사용자 행동 기록 함수
+def call_api_and_record_action(user_uuid, lat, lon, endpoint, action_id, doing_action, data_key, compact=None):
+    """
+    외부 API를 호출(또는 캐시 조회)하고 사용자 행동을 기록하는 함수.
+    compact: 3시간 간격 예보를 compact 형식으로 받을 때 parse_compact_options의 (units, fields)
+    """
+    try:
+        # 외부 API 호출 (격자 칸 단위 캐시)
+        if compact is None:
+            status_code, data, cache_age, stale = fetch_weather_data(endpoint, lat, lon)
+        else:
+            status_code, data, cache_age, stale = fetch_compact_forecast(lat, lon, compact[0])
+        if status_code != 200:
+            return create_response(status_code, f"Failed to fetch {data_key} data")
 
         # DB 연결 및 사용자 행동 기록
         with get_connection() as connection:
@@ -93,15 +243,101 @@ def call_api_and_record_action(user_uuid, lat, lon, api_url, action_id, doing_ac
 
             log_user_action(connection, user_id, action_id, doing_action)
 
-        return create_response(200, {
+        result = {
             "message": f"{doing_action} recorded successfully",
-            data_key: data
-        })
+            data_key: data if compact is None else project(data, compact[1]),
+            "cache_age": cache_age,
+            "stale": stale
+        }
+        if compact is not None:
+            result["format"] = "compact"
+        return create_response(200, result)
 
+    except CircuitOpenError as e:
+        # 회로가 열려 있고 보관 중인 값도 없으면 바로 실패 (재시도 시점 안내)
+        retry_after = int(e.retry_after) + 1
+        return create_response(503, f"Weather service temporarily unavailable for {data_key}",
+                               {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+    except requests.Timeout:
+        return create_response(504, f"Timed out fetching {data_key} data")
+    except requests.ConnectionError:
+        return create_response(502, f"Failed to connect while fetching {data_key} data")
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
         return create_response(500, "Internal Server Error")
 
+# Gemini 응답 텍스트에서 JSON 추출
+def parse_suggestion(response_text):
+    """
+    코드 블록/개행을 제거하고 JSON으로 파싱한다.
+    문자열 안에 JSON이 한 번 더 감싸져 있으면 다시 파싱하며, 실패하면 {"text": 원문}을 반환한다.
+    """
+    try:
+        while True:
+            response_text = response_text.replace('\n', '').replace('\t', '').replace('```json', '').replace('```', '').strip()
+            
+            try:
+                parsed_data = json.loads(response_text)
+                if isinstance(parsed_data, str):
+                    response_text = parsed_data
+                    continue
+                if isinstance(parsed_data, dict):
+                    return parsed_data
+            
+            except json.JSONDecodeError:
+                break
+        
+        return {"text": response_text}
+    
+    except Exception:
+        return {"text": response_text}
+
+# 날씨 데이터로 추천 문구 생성
+def generate_weather_sentence(weather_data):
+    # 캐시된 모델로 ChatSession 생성 및 메시지 전송
+    model, prompt_version = prompt_registry.get_model('weather', MODEL_NAME)
+    print(f"[weather/gensentence] prompt_version={prompt_version}")
+    chat = model.start_chat()
+    user_message = str(weather_data)
+    response = chat.send_message(content=user_message, generation_config=generation_config)
+    
+    # 결과 데이터 처리
+    return parse_suggestion(response.text.strip())
+
+# 날씨 데이터에 맞는 추천 문구 조회 (캐시 → 생성 중인 요청에 합류 → Gemini 생성)
+def weather_suggestion(user_id, weather_data, prompt_version, queue_timeout=None):
+    """
+    Gemini를 호출할 수 없고 모인 문구도 없으면 CircuitOpenError/GatewayRejectedError를 그대로 던진다.
+    queue_timeout: Gemini 게이트웨이 슬롯 대기 시간 한도 (없으면 게이트웨이 설정값)
+    """
+    # 대략적인 날씨 상황이 같으면 캐시된 문구를 사용 (생성 중인 요청이 있으면 모인 문구라도 사용)
+    # 프롬프트가 바뀌면 이전 프롬프트로 만든 문구는 쓰지 않도록 버전을 키에 포함
+    fingerprint = f"{prompt_version}:{weather_fingerprint(weather_data)}"
+    cached = suggestion_cache.lookup(fingerprint, allow_partial=gensentence_flight.in_flight(fingerprint))
+    if cached is not None:
+        return cached
+
+    def generate():
+        # Gemini 게이트웨이의 실행 슬롯 안에서 생성 (동시 생성 수 제한)
+        with gemini_gateway.acquire(queue_timeout) as slot:
+            observe_phase(PHASE_GEMINI_QUEUE, slot.wait)
+            with phase(PHASE_GEMINI):
+                result = gemini_breaker.call(lambda: generate_weather_sentence(weather_data))
+        suggestion_cache.add(fingerprint, result)
+        return result
+
+    # 같은 지문으로 동시에 들어온 요청은 Gemini 호출 한 번으로 합침
+    try:
+        # 실제로 생성이 필요한 요청만 사용자별 호출 한도에 포함
+        gemini_gateway.check_rate(user_id)
+        return dict(gensentence_flight.do(fingerprint, generate))
+    except (CircuitOpenError, GatewayRejectedError):
+        # Gemini를 호출할 수 없으면 모인 문구라도 사용
+        cached = suggestion_cache.lookup(fingerprint, allow_partial=True)
+        if cached is not None:
+            return cached
+        raise
+
 # /weather 엔드포인트: 현재 날씨 조회 및 기록
 @weather_bp.route('/weather', methods=['POST'])
 def register_weather_action():
@@ -113,9 +349,8 @@ def register_weather_action():
     if validation_error:
         return validation_error
 
-    weather_url = f"http://api.openweathermap.org/data/2.5/weather?lat={data['lat']}&lon={data['lon']}&appid={OPENWEATHERMAP_API_KEY}"
     return call_api_and_record_action(
-        data['user_uuid'], data['lat'], data['lon'], weather_url, action_id=7,
+        data['user_uuid'], data['lat'], data['lon'], 'weather', action_id=7,
         doing_action='Get weather info', data_key='weather_data'
     )
 
@@ -130,9 +365,8 @@ def register_air_pollution_action():
     if validation_error:
         return validation_error
 
-    air_pollution_url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={data['lat']}&lon={data['lon']}&appid={OPENWEATHERMAP_API_KEY}"
     return call_api_and_record_action(
-        data['user_uuid'], data['lat'], data['lon'], air_pollution_url, action_id=8,
+        data['user_uuid'], data['lat'], data['lon'], 'air_pollution', action_id=8,
         doing_action='Get air pollution info', data_key='air_pollution_data'
     )
 
@@ -141,16 +375,21 @@ def register_air_pollution_action():
 def register_hourly_weather_action():
     """
     3시간 간격 날씨 정보를 OpenWeatherMap에서 조회하고 DB에 행동을 기록하는 엔드포인트.
+    compact/fields 옵션을 주면 예보를 열 단위 배열로 바꿔 필요한 열만 보낸다 (utils/forecast_compact.py).
     """
     data = request.get_json()
     validation_error = validate_request_data(data, ['user_uuid', 'lat', 'lon'])
     if validation_error:
         return validation_error
 
-    hourly_weather_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={data['lat']}&lon={data['lon']}&appid={OPENWEATHERMAP_API_KEY}"
+    try:
+        compact = parse_compact_options(data)
+    except InvalidCompactRequest as e:
+        return create_response(400, str(e))
+
     return call_api_and_record_action(
-        data['user_uuid'], data['lat'], data['lon'], hourly_weather_url, action_id=9,
-        doing_action='Get 3hourly weather info', data_key='hourly_weather_data'
+        data['user_uuid'], data['lat'], data['lon'], 'forecast', action_id=11,
+        doing_action='Get 3hourly weather info', data_key='hourly_weather_data', compact=compact
     )
 
 # /weather/gensentence 엔드포인트: AI 기반 문장 생성
@@ -161,8 +400,9 @@ def gensentence_route():
     """
     connection = get_connection()
     try:
-        # 시스템 프롬프트 로드
-        system_prompt = load_system_prompt()
+        # 현재 시스템 프롬프트 버전 확인 (파일이 바뀌었으면 다시 읽음)
+        _, prompt_version = prompt_registry.get_prompt('weather')
+        version_header = {"X-Prompt-Version": prompt_version}
         
         # 요청 데이터 확인
         if not request.is_json:
@@ -183,34 +423,20 @@ def gensentence_route():
         # 사용자 행동 기록
         log_user_action(connection, user_id, action_id=10, doing_action="Generate weather-related suggestions using the Gemini API")
         
-        # ChatSession 생성 및 메시지 전송
-        chat = genai.GenerativeModel(model_name=MODEL_NAME, system_instruction=system_prompt).start_chat()
-        user_message = str(weather_data)
-        response = chat.send_message(content=user_message, generation_config=generation_config)
-        
-        # 결과 데이터 처리
-        response_text = response.text.strip()
+        # Gemini 호출 중에는 DB 커넥션을 붙잡지 않도록 먼저 반납
+        connection.close()
         
         try:
-            # JSON 형식의 응답 데이터 파싱
-            while True:
-                response_text = response_text.replace('\n', '').replace('\t', '').replace('```json', '').replace('```', '').strip()
-                
-                try:
-                    parsed_data = json.loads(response_text)
-                    if isinstance(parsed_data, str):
-                        response_text = parsed_data
-                        continue
-                    if isinstance(parsed_data, dict):
-                        return create_response(200, "Success to response", parsed_data)
-                
-                except json.JSONDecodeError:
-                    break
-            
-            return create_response(200, "Success to response", {"text": response_text})
-        
-        except Exception:
-            return create_response(200, "Success to response", {"text": response_text})
+            result = weather_suggestion(user_id, weather_data, prompt_version)
+        except (CircuitOpenError, GatewayRejectedError) as e:
+            # Gemini를 호출할 수 없고 모인 문구도 없으면 재시도 시점 안내
+            retry_after = int(e.retry_after) + 1
+            if isinstance(e, GatewayRejectedError) and e.reason != QUEUE_TIMEOUT:
+                return create_response(429, "Too many suggestion requests, please retry later",
+                                       {"retry_after": retry_after, "reason": e.reason}, headers={"Retry-After": str(retry_after)})
+            return create_response(503, "Suggestion service temporarily unavailable",
+                                   {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+        return create_response(200, "Success to response", result, headers=version_header)
     
     except Exception as e:
         print("".join(traceback.format_exception(None, e, e.__traceback__)))
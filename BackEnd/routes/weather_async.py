@@ -0,0 +1,258 @@
+# routes/weather_async.py
+# ASGI 모드용 /weather, /weather/air, /weather/3hourly, /weather/gensentence 비동기 핸들러
+# 캐시/회로 차단기/추천 문구 캐시는 동기 버전(routes/weather.py)과 공유하고,
+# 외부 호출(OpenWeatherMap, Gemini)과 DB 조회만 비동기로 처리한다.
+
+import asyncio
+import json
+import os
+import traceback
+
+import httpx
+
+from async_pool import get_async_pool
+from routes.weather import (
+    OPENWEATHERMAP_API_KEY, MODEL_NAME, generation_config, WEATHER_ENDPOINTS, WEATHER_CONNECT_TIMEOUT,
+    weather_cache, weather_breaker, gemini_breaker, suggestion_cache, parse_suggestion, coordinate_error
+)
+from utils.async_response import create_async_response
+from utils.async_upstream_client import AsyncUpstreamClient
+from utils.get_user_id_from_uuid import get_user_id_from_uuid_async
+from utils.single_flight import AsyncSingleFlight
+from utils.suggestion_cache import weather_fingerprint
+from utils.action_recorder import action_recorder, MODE_ASYNC
+from utils.upstream_client import RETRYABLE_STATUS
+from utils.circuit_breaker import CircuitOpenError
+from utils.gemini_gateway import gemini_gateway, GatewayRejectedError, QUEUE_TIMEOUT
+from utils.model_registry import prompt_registry
+from utils.forecast_compact import (
+    InvalidCompactRequest, parse_compact_options, compact_forecast, project, lookup_compact, store_compact
+)
+
+# OpenWeatherMap 비동기 HTTP 클라이언트 (이벤트 루프 하나가 많은 요청을 처리하므로 커넥션 풀을 더 크게)
+weather_client = AsyncUpstreamClient(
+    "openweathermap-async",
+    timeouts={endpoint: (WEATHER_CONNECT_TIMEOUT, config['read_timeout']) for endpoint, config in WEATHER_ENDPOINTS.items()},
+    max_retries=int(os.getenv("WEATHER_MAX_RETRIES", 2)),
+    pool_maxsize=int(os.getenv("WEATHER_ASYNC_POOL_MAXSIZE", 100)),
+)
+
+weather_flight = AsyncSingleFlight("openweathermap-async")
+gensentence_flight = AsyncSingleFlight("gensentence-async")
+
+# 요청 본문(JSON) 읽기 (형식 오류 시 None)
+async def read_json(request):
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+# 사용자 행동 기록 (이벤트 루프를 막지 않도록 항상 async 모드로 큐에 넣음)
+def log_user_action(user_id, action_id, doing_action):
+    try:
+        action_recorder.record(user_id, action_id, doing_action, mode=MODE_ASYNC)
+    except Exception as e:
+        print(f"Error logging user action: {str(e)}")
+        raise
+
+# 캐시 호출 (SQLite 백엔드처럼 블로킹 I/O를 하는 캐시는 이벤트 루프를 막지 않도록 스레드에서 실행)
+async def cache_call(func, *args):
+    if weather_cache.blocking:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+# 캐시를 거쳐 OpenWeatherMap 데이터 조회 (routes/weather.py fetch_weather_data와 동일한 동작)
+async def fetch_weather_data(endpoint, lat, lon):
+    """반환값: (status_code, data, cache_age_seconds, stale)"""
+    config = WEATHER_ENDPOINTS[endpoint]
+    cell_lat, cell_lon = weather_cache.cell(lat, lon)
+    cache_key = weather_cache.key(endpoint, cell_lat, cell_lon)
+
+    cached = await cache_call(weather_cache.get, cache_key, config['ttl'])
+    if cached is not None:
+        data, age = cached
+        return 200, data, int(age), False
+
+    async def serve_stale(error_status):
+        stale = await cache_call(weather_cache.get_stale, cache_key)
+        if stale is None:
+            return None
+        print(f"Serving stale {endpoint} data for {cache_key} (age {int(stale[1])}s) after upstream failure: {error_status}")
+        return 200, stale[0], int(stale[1]), True
+
+    async def fetch():
+        cached = await cache_call(weather_cache.get, cache_key, config['ttl'])
+        if cached is not None:
+            return 200, cached[0], int(cached[1]), False
+
+        params = {"lat": cell_lat, "lon": cell_lon, "appid": OPENWEATHERMAP_API_KEY}
+        try:
+            response = await weather_breaker.call_async(
+                lambda: weather_client.get(endpoint, config['url'], params=params),
+                is_failure=lambda r: r.status_code in RETRYABLE_STATUS
+            )
+        except (CircuitOpenError, httpx.RequestError) as e:
+            result = await serve_stale(type(e).__name__)
+            if result is None:
+                raise
+            return result
+
+        if response.status_code != 200:
+            return await serve_stale(response.status_code) or (response.status_code, None, None, False)
+
+        data = response.json()
+        await cache_call(weather_cache.set, cache_key, data, config['ttl'])
+        return 200, data, 0, False
+
+    # 같은 칸에 대한 동시 요청은 외부 호출 한 번으로 합침
+    return await weather_flight.do(cache_key, fetch)
+
+# compact 형식의 3시간 간격 예보 조회 (routes/weather.py fetch_compact_forecast와 동일한 동작)
+async def fetch_compact_forecast(lat, lon, units):
+    config = WEATHER_ENDPOINTS['forecast']
+    raw_key = weather_cache.key('forecast', *weather_cache.cell(lat, lon))
+    cached = await cache_call(lookup_compact, weather_cache, raw_key, units, config['ttl'])
+    if cached is not None:
+        return 200, cached[0], cached[1], False
+
+    status_code, data, cache_age, stale = await fetch_weather_data('forecast', lat, lon)
+    if status_code != 200:
+        return status_code, data, cache_age, stale
+
+    compact = compact_forecast(data, units)
+    if not stale:
+        await cache_call(store_compact, weather_cache, raw_key, units, config['ttl'], compact, cache_age)
+    return 200, compact, cache_age, stale
+
+# API 호출 및 사용자 행동 기록 (routes/weather.py call_api_and_record_action과 같은 응답 형식)
+async def call_api_and_record_action(request, endpoint, action_id, doing_action, data_key, allow_compact=False):
+    data = await read_json(request)
+    if data is None:
+        return create_async_response(400, "Invalid JSON payload")
+    missing_keys = [key for key in ['user_uuid', 'lat', 'lon'] if key not in data]
+    if missing_keys:
+        return create_async_response(400, f"Missing parameters: {', '.join(missing_keys)}")
+    error = coordinate_error(data)
+    if error:
+        return create_async_response(400, error)
+
+    try:
+        compact = parse_compact_options(data) if allow_compact else None
+    except InvalidCompactRequest as e:
+        return create_async_response(400, str(e))
+
+    try:
+        if compact is None:
+            status_code, result, cache_age, stale = await fetch_weather_data(endpoint, data['lat'], data['lon'])
+        else:
+            status_code, result, cache_age, stale = await fetch_compact_forecast(data['lat'], data['lon'], compact[0])
+        if status_code != 200:
+            return create_async_response(status_code, f"Failed to fetch {data_key} data")
+
+        async with get_async_pool().acquire() as connection:
+            user_id = await get_user_id_from_uuid_async(data['user_uuid'], connection)
+        if user_id is None:
+            return create_async_response(403, "Invalid user_uuid")
+
+        log_user_action(user_id, action_id, doing_action)
+
+        payload = {
+            "message": f"{doing_action} recorded successfully",
+            data_key: result if compact is None else project(result, compact[1]),
+            "cache_age": cache_age,
+            "stale": stale
+        }
+        if compact is not None:
+            payload["format"] = "compact"
+        return create_async_response(200, payload)
+
+    except CircuitOpenError as e:
+        retry_after = int(e.retry_after) + 1
+        return create_async_response(503, f"Weather service temporarily unavailable for {data_key}",
+                                     {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+    except httpx.TimeoutException:
+        return create_async_response(504, f"Timed out fetching {data_key} data")
+    except httpx.ConnectError:
+        return create_async_response(502, f"Failed to connect while fetching {data_key} data")
+    except Exception as e:
+        print("".join(traceback.format_exception(None, e, e.__traceback__)))
+        return create_async_response(500, "Internal Server Error")
+
+# 날씨 데이터로 추천 문구 생성
+async def generate_weather_sentence(weather_data):
+    model, prompt_version = prompt_registry.get_model('weather', MODEL_NAME)
+    print(f"[weather/gensentence/async] prompt_version={prompt_version}")
+    chat = model.start_chat()
+    response = await chat.send_message_async(content=str(weather_data), generation_config=generation_config)
+    return parse_suggestion(response.text.strip())
+
+# /weather 엔드포인트: 현재 날씨 조회 및 기록
+async def register_weather_action(request):
+    return await call_api_and_record_action(
+        request, 'weather', action_id=7, doing_action='Get weather info', data_key='weather_data'
+    )
+
+# /weather/air 엔드포인트: 공기질 조회 및 기록
+async def register_air_pollution_action(request):
+    return await call_api_and_record_action(
+        request, 'air_pollution', action_id=8, doing_action='Get air pollution info', data_key='air_pollution_data'
+    )
+
+# /weather/3hourly 엔드포인트: 3시간 간격 날씨 조회 및 기록
+async def register_hourly_weather_action(request):
+    return await call_api_and_record_action(
+        request, 'forecast', action_id=11, doing_action='Get 3hourly weather info', data_key='hourly_weather_data',
+        allow_compact=True
+    )
+
+# /weather/gensentence 엔드포인트: AI 기반 문장 생성
+async def gensentence_route(request):
+    try:
+        _, prompt_version = prompt_registry.get_prompt('weather')
+        version_header = {"X-Prompt-Version": prompt_version}
+
+        data = await read_json(request)
+        if data is None:
+            return create_async_response(400, "Content-Type must be application/json")
+        user_uuid = data.get('user_uuid')
+        weather_data = data.get('data')
+        if not user_uuid or not weather_data:
+            return create_async_response(400, "Missing required parameters: user_uuid and data")
+
+        async with get_async_pool().acquire() as connection:
+            user_id = await get_user_id_from_uuid_async(user_uuid, connection)
+        if user_id is None:
+            return create_async_response(403, "Invalid user_uuid")
+
+        log_user_action(user_id, action_id=10, doing_action="Generate weather-related suggestions using the Gemini API")
+
+        fingerprint = f"{prompt_version}:{weather_fingerprint(weather_data)}"
+        cached = suggestion_cache.lookup(fingerprint, allow_partial=gensentence_flight.in_flight(fingerprint))
+        if cached is not None:
+            return create_async_response(200, "Success to response", cached, headers=version_header)
+
+        async def generate():
+            with (await gemini_gateway.acquire_async()):
+                result = await gemini_breaker.call_async(lambda: generate_weather_sentence(weather_data))
+            suggestion_cache.add(fingerprint, result)
+            return result
+
+        try:
+            gemini_gateway.check_rate(user_id)
+            result = await gensentence_flight.do(fingerprint, generate)
+        except (CircuitOpenError, GatewayRejectedError) as e:
+            cached = suggestion_cache.lookup(fingerprint, allow_partial=True)
+            if cached is not None:
+                return create_async_response(200, "Success to response", cached, headers=version_header)
+            retry_after = int(e.retry_after) + 1
+            if isinstance(e, GatewayRejectedError) and e.reason != QUEUE_TIMEOUT:
+                return create_async_response(429, "Too many suggestion requests, please retry later",
+                                             {"retry_after": retry_after, "reason": e.reason}, headers={"Retry-After": str(retry_after)})
+            return create_async_response(503, "Suggestion service temporarily unavailable",
+                                         {"retry_after": retry_after}, headers={"Retry-After": str(retry_after)})
+        return create_async_response(200, "Success to response", dict(result), headers=version_header)
+
+    except Exception as e:
+        print("".join(traceback.format_exception(None, e, e.__traceback__)))
+        return create_async_response(500, f"Internal Server Error: {str(e)}")
@@ -0,0 +1,87 @@
+# tests/test_achievements.py
+# 도전 과제 카운터 갱신(advance_counter)과 규칙 판정(evaluate_event), 기존 기록 재반영(db/backfill_achievements.py replay) 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_achievements
+#
+# utils/achievements.py는 db_config를 임포트하므로 db/db_config.py가 있어야 실행한다.
+# (임포트만 하며 DB에 접속하지는 않음 - 커넥션 풀은 첫 대여 시점에 연결)
+
+import os
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+sys.path.append(os.path.join(current_dir, '..', 'db'))
+
+try:
+    from utils.achievements import ACTION_EVENTS, advance_counter, evaluate_event
+    from backfill_achievements import replay
+except ImportError as e:
+    advance_counter = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = None
+
+RULES = {
+    "login": [
+        {"id": 1, "name": "first", "type": "count", "target": 1, "per": None},
+        {"id": 2, "name": "week", "type": "streak", "target": 3, "per": None},
+        {"id": 50, "name": "year", "type": "days_since_first", "target": 365, "per": None},
+    ],
+    "chat_message": [
+        {"id": 20, "name": "ten in a chat", "type": "count", "target": 2, "per": "chat"},
+    ],
+}
+
+
+@unittest.skipIf(advance_counter is None, f"utils.achievements is not importable: {IMPORT_ERROR}")
+class AchievementCounterTest(unittest.TestCase):
+
+    def test_action_ids_do_not_overlap_weather(self):
+        # 11: Get 3hourly weather info (예전 9번), 9는 AAC 버튼 추가
+        self.assertEqual(ACTION_EVENTS[9], "aac_button_add")
+        self.assertNotIn(11, ACTION_EVENTS)
+
+    def test_new_counter(self):
+        row, before, after = advance_counter(None, date(2024, 11, 1))
+        self.assertEqual((row['count'], row['streak'], before, after), (1, 1, (0, 0, 0), (1, 1, 0)))
+
+    def test_streak(self):
+        row, _, _ = advance_counter(None, date(2024, 11, 1))
+        row, _, _ = advance_counter(row, date(2024, 11, 1))   # 같은 날은 연속 일수 그대로
+        row, _, after = advance_counter(row, date(2024, 11, 2))
+        self.assertEqual(after, (3, 2, 1))
+        row, _, after = advance_counter(row, date(2024, 11, 5))  # 하루 이상 빠지면 다시 1
+        self.assertEqual(after, (4, 1, 4))
+        self.assertEqual(row['first_day'], date(2024, 11, 1))
+
+    def test_evaluate_reports_crossed_rules_once(self):
+        counters = {}
+
+        def bump(key):
+            counters[key], before, after = advance_counter(counters.get(key), date(2024, 11, 1))
+            return before, after
+
+        self.assertEqual([rule['id'] for rule in evaluate_event(RULES, bump, "login", None)], [1])
+        self.assertEqual(evaluate_event(RULES, bump, "login", None), [])
+        self.assertEqual(evaluate_event(RULES, bump, "todo_add", None), [])
+        self.assertNotIn("todo_add", counters)
+
+    def test_replay_history(self):
+        start = datetime(2023, 11, 1, 9)
+        events = [(start + timedelta(days=n), "login", None) for n in range(3)]
+        events += [(start + timedelta(days=400), "login", None)]
+        events += [(start + timedelta(minutes=n), "chat_message", 7) for n in range(2)]
+        events += [(start, "chat_message", 8)]
+        counters, reached = replay(RULES, sorted(events, key=lambda event: event[0]))
+        self.assertEqual(reached, {1, 2, 50, 20})
+        self.assertEqual((counters["login"]['count'], counters["login"]['streak']), (4, 1))
+        self.assertEqual(counters["chat_message@7"]['count'], 2)
+        self.assertEqual(counters["chat_message@8"]['count'], 1)
+        self.assertEqual(counters["chat_message"]['count'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
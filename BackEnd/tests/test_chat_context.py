@@ -0,0 +1,99 @@
+# tests/test_chat_context.py
+# 대화 맥락 분할(utils/chat_context.py split_for_context)과 한 턴의 저장 메시지(utils/chat_state.py turn_messages) 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_chat_context
+#
+# chat_state는 도전 과제 모듈을 통해 db_config를 임포트하므로 db/db_config.py가 있어야 turn_messages 테스트를 실행한다.
+# (임포트만 하며 DB에 접속하지는 않음 - 커넥션 풀은 첫 대여 시점에 연결)
+
+import os
+import sys
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+sys.path.append(os.path.join(current_dir, '..', 'db'))
+
+from utils.chat_context import split_for_context, build_model_history
+
+try:
+    from utils.chat_state import existing_chat, new_chat, turn_messages
+except ImportError as e:
+    turn_messages = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = None
+
+
+def conversation(turns, text="안녕"):
+    messages = []
+    for turn in range(turns):
+        messages.append({"seq": turn * 2 + 1, "role": "user", "parts": f"{text} {turn}"})
+        messages.append({"seq": turn * 2 + 2, "role": "model", "parts": f"답변 {turn}"})
+    return messages
+
+
+class SplitForContextTest(unittest.TestCase):
+
+    def test_short_history_is_kept(self):
+        messages = conversation(12)
+        self.assertEqual(split_for_context(messages, max_turns=10, fold_turns=5), ([], messages))
+
+    def test_folds_down_to_max_turns(self):
+        messages = conversation(16)
+        to_fold, keep = split_for_context(messages, max_turns=10, fold_turns=5)
+        self.assertEqual(len(keep), 20)
+        self.assertEqual(to_fold + keep, messages)
+        self.assertEqual(keep[0]['role'], 'user')
+
+    def test_folds_by_tokens(self):
+        messages = conversation(4, text="가" * 300)
+        to_fold, keep = split_for_context(messages, max_turns=10, max_tokens=300)
+        self.assertTrue(to_fold)
+        self.assertEqual(to_fold + keep, messages)
+        self.assertGreaterEqual(len(keep), 2)  # 마지막 한 턴은 항상 남김
+        self.assertEqual(keep[0]['role'], 'user')
+
+    def test_keep_starts_with_user(self):
+        messages = [{"seq": 1, "role": "model", "parts": "환영해요"}] + conversation(3)
+        to_fold, keep = split_for_context(messages, max_turns=1)
+        self.assertEqual([m['role'] for m in keep], ['user', 'model'])
+        self.assertEqual(len(to_fold), 5)
+
+    def test_model_history_with_summary(self):
+        history = build_model_history("요약", conversation(1))
+        self.assertEqual([m['role'] for m in history], ['user', 'model', 'user', 'model'])
+        self.assertIn("요약", history[0]['parts'])
+        self.assertNotIn('seq', history[-1])
+
+
+@unittest.skipIf(turn_messages is None, f"utils.chat_state is not importable: {IMPORT_ERROR}")
+class TurnMessagesTest(unittest.TestCase):
+
+    def test_new_chat_starts_at_one(self):
+        start, messages = turn_messages(new_chat(1, "c"), "hi", "hello", 0)
+        self.assertEqual(start, 1)
+        self.assertEqual(messages, [{"role": "user", "parts": "hi"}, {"role": "model", "parts": "hello"}])
+
+    def test_appends_after_locked_last_seq(self):
+        chat = existing_chat({"chat_id": 1, "summary": None, "summary_seq": None}, "c", conversation(2), legacy=False)
+        # 다른 요청이 먼저 저장해 마지막 seq가 불러온 메시지보다 뒤에 있어도 그 뒤에 이어 붙임
+        start, messages = turn_messages(chat, "hi", "hello", 6)
+        self.assertEqual(start, 7)
+        self.assertEqual(len(messages), 2)
+
+    def test_legacy_chat_copies_history(self):
+        chat = existing_chat({"chat_id": 1, "summary": None, "summary_seq": None}, "c", conversation(2), legacy=True)
+        start, messages = turn_messages(chat, "hi", "hello", 0)
+        self.assertEqual(start, 1)
+        self.assertEqual(len(messages), 6)
+        self.assertEqual(messages[-2:], [{"role": "user", "parts": "hi"}, {"role": "model", "parts": "hello"}])
+
+    def test_legacy_chat_already_migrated_by_another_turn(self):
+        chat = existing_chat({"chat_id": 1, "summary": None, "summary_seq": None}, "c", conversation(2), legacy=True)
+        start, messages = turn_messages(chat, "hi", "hello", 6)
+        self.assertEqual((start, len(messages)), (7, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_circuit_breaker.py
+# utils/circuit_breaker.py CircuitBreaker 상태 전이 확인 (시계는 가짜 monotonic으로 진행)
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_circuit_breaker
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(circuit_breaker.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30, probe_timeout=10)
+
+    def trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()  # 성공하면 연속 실패 횟수 초기화
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.opened, 1)
+
+    def test_open_rejects_with_retry_after(self):
+        self.trip()
+        self.now += 10
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.breaker.allow()
+        self.assertEqual(ctx.exception.retry_after, 20)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.reject_if_open()
+        self.assertEqual(self.breaker.rejected, 2)
+
+    def test_half_open_allows_one_probe(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.reject_if_open()  # 시험 호출 수를 소모하지 않음
+        self.breaker.allow()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+
+    def test_probe_success_closes(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_probe_failure_reopens(self):
+        self.trip()
+        self.now += 30
+        with self.assertRaises(ValueError):
+            self.breaker.call(mock.Mock(side_effect=ValueError("boom")))
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.opened, 2)
+
+    def test_is_failure_result_counts_as_failure(self):
+        for _ in range(3):
+            self.breaker.call(lambda: 503, is_failure=lambda status: status >= 500)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_released_probe_can_be_retried(self):
+        self.trip()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.release()
+        self.breaker.allow()
+
+    def test_lost_probe_reopens_after_probe_timeout(self):
+        self.trip()
+        self.now += 30
+        self.breaker.allow()
+        self.now += 10
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now += 30
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.allow()
+
+
+if __name__ == '__main__':
+    unittest.main()
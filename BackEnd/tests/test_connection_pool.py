@@ -0,0 +1,135 @@
+# tests/test_connection_pool.py
+# db/connection_pool.py ConnectionPool 대여/반납/재생성 확인 (실제 DB 없이 가짜 커넥션 사용)
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_connection_pool
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'db'))
+
+import connection_pool
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """pymysql 커넥션 중 풀이 사용하는 부분만 흉내 냄"""
+
+    def __init__(self):
+        self.open = True
+        self.healthy = True
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.healthy:
+            raise ConnectionError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+
+    def creator(self):
+        raw = FakeConnection()
+        self.created.append(raw)
+        return raw
+
+    def pool(self, **kwargs):
+        return ConnectionPool(self.creator, **{"min_size": 0, "max_size": 2, "timeout": 0.05, **kwargs})
+
+    def test_prefill_on_first_acquire(self):
+        pool = self.pool(min_size=2)
+        self.assertEqual(self.created, [])  # 생성 시에는 접속하지 않음
+        with pool.acquire():
+            pass
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(pool.stats()["open"], 2)
+
+    def test_release_reuses_connection_and_rolls_back(self):
+        pool = self.pool()
+        with pool.acquire() as connection:
+            raw = connection._raw
+        self.assertEqual(raw.rollbacks, 1)
+        with pool.acquire() as connection:
+            self.assertIs(connection._raw, raw)
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["checkouts"], stats["in_use"], stats["idle"]), (1, 2, 0, 1))
+
+    def test_close_is_idempotent(self):
+        pool = self.pool()
+        connection = pool.acquire()
+        connection.close()
+        connection.close()
+        self.assertEqual(pool.stats()["in_use"], 0)
+        self.assertEqual(pool.stats()["idle"], 1)
+        with self.assertRaises(AttributeError):
+            connection.cursor()
+
+    def test_timeout_when_exhausted(self):
+        pool = self.pool(max_size=1)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        held.close()
+        with pool.acquire():
+            pass
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.pool(max_size=1, timeout=2)
+        held = pool.acquire()
+        threading.Timer(0.05, held.close).start()
+        with pool.acquire() as connection:
+            self.assertIs(connection._raw, held._raw)
+        self.assertEqual(len(self.created), 1)
+
+    def test_expired_connection_is_recycled(self):
+        now = [1000.0]
+        with mock.patch.object(connection_pool.time, 'monotonic', lambda: now[0]):
+            pool = self.pool(max_lifetime=60)
+            with pool.acquire() as connection:
+                first = connection._raw
+            now[0] += 61
+            with pool.acquire() as connection:
+                self.assertIsNot(connection._raw, first)
+        self.assertFalse(first.open)
+        self.assertEqual(pool.stats()["recycled"], 1)
+
+    def test_unhealthy_connection_is_discarded(self):
+        pool = self.pool()
+        with pool.acquire() as connection:
+            first = connection._raw
+        first.healthy = False
+        with pool.acquire() as connection:
+            self.assertIsNot(connection._raw, first)
+        stats = pool.stats()
+        self.assertEqual((stats["discarded"], stats["open"]), (1, 1))
+
+    def test_closed_connection_is_not_returned(self):
+        pool = self.pool()
+        with pool.acquire() as connection:
+            connection._raw.close()
+        stats = pool.stats()
+        self.assertEqual((stats["open"], stats["idle"], stats["discarded"]), (0, 0, 1))
+
+    def test_failed_create_frees_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=ConnectionError("refused")), min_size=0, max_size=1, timeout=0.05)
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                pool.acquire()
+        self.assertEqual(pool.stats()["open"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_forecast_compact.py
+# utils/forecast_compact.py compact 예보 변환과 옵션 검사 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_forecast_compact
+
+import os
+import sys
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils.forecast_compact import (
+    COLUMNS, InvalidCompactRequest, compact_forecast, parse_compact_options, project
+)
+
+FORECAST = {
+    "city": {"timezone": 32400},
+    "list": [
+        {"dt": 1730451600, "main": {"temp": 284.45, "feels_like": 283.0, "humidity": 80},
+         "weather": [{"id": 500, "icon": "10d"}], "pop": 0.62, "rain": {"3h": 1.27}, "wind": {"speed": 3.14}},
+        {"dt": 1730462400, "main": {"temp": 273.15, "feels_like": 270.1, "humidity": 60},
+         "weather": [{"id": 800, "icon": "01n"}], "wind": {"speed": 1.0}},
+    ],
+}
+
+
+class CompactForecastTest(unittest.TestCase):
+
+    def test_metric_columns(self):
+        compact = compact_forecast(FORECAST)
+        self.assertEqual(compact["time"], [1730451600, 1730462400])
+        self.assertEqual(compact["temp"], [11.3, 0.0])
+        self.assertEqual(compact["condition"], [500, 800])
+        self.assertEqual(compact["pop"], [62, 0])
+        self.assertEqual(compact["precipitation"], [1.27, 0])
+        self.assertEqual(compact["units"], {"temp": "C", "precipitation": "mm", "wind_speed": "m/s"})
+        self.assertEqual(compact["timezone"], 32400)
+
+    def test_imperial_and_standard(self):
+        imperial = compact_forecast(FORECAST, "imperial")
+        self.assertEqual(imperial["temp"], [52.3, 32.0])
+        self.assertEqual(imperial["precipitation"], [0.05, 0])
+        self.assertEqual(imperial["wind_speed"], [7.0, 2.2])
+        self.assertEqual(compact_forecast(FORECAST, "standard")["temp"], [284.45, 273.15])
+
+    def test_columns_line_up(self):
+        compact = compact_forecast(FORECAST)
+        self.assertEqual({len(compact[name]) for name in COLUMNS}, {2})
+
+    def test_empty_forecast(self):
+        compact = compact_forecast({})
+        self.assertEqual(compact["time"], [])
+        self.assertIsNone(compact["timezone"])
+
+    def test_project(self):
+        result = project(compact_forecast(FORECAST), ["time", "temp"])
+        self.assertEqual(set(result), {"time", "temp", "units", "timezone"})
+
+
+class CompactOptionsTest(unittest.TestCase):
+
+    def test_not_compact(self):
+        self.assertIsNone(parse_compact_options({}))
+
+    def test_defaults(self):
+        self.assertEqual(parse_compact_options({"compact": True}), ("metric", list(COLUMNS)))
+
+    def test_fields_string(self):
+        self.assertEqual(parse_compact_options({"fields": "time, temp", "units": "imperial"}), ("imperial", ["time", "temp"]))
+
+    def test_invalid(self):
+        for data in ({"fields": []}, {"fields": ["time", "nope"]}, {"compact": True, "units": "kelvin"}):
+            with self.subTest(data=data), self.assertRaises(InvalidCompactRequest):
+                parse_compact_options(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
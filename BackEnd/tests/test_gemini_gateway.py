@@ -0,0 +1,114 @@
+# tests/test_gemini_gateway.py
+# utils/gemini_gateway.py 실행 슬롯 대기열(동기/비동기)과 사용자별 호출 한도 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_gemini_gateway
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils.gemini_gateway import GeminiGateway, GatewayRejectedError, QUEUE_FULL, QUEUE_TIMEOUT, RATE_LIMITED
+
+
+def gateway(**kwargs):
+    return GeminiGateway(**{"max_concurrency": 1, "max_queue": 2, "queue_timeout": 5, "user_rate": 0, **kwargs})
+
+
+class GatewayTest(unittest.TestCase):
+
+    def test_queue_full(self):
+        gw = gateway(max_queue=0)
+        with gw.acquire():
+            with self.assertRaises(GatewayRejectedError) as ctx:
+                gw.acquire()
+        self.assertEqual(ctx.exception.reason, QUEUE_FULL)
+        with gw.acquire():
+            pass
+
+    def test_queue_timeout(self):
+        gw = gateway()
+        with gw.acquire():
+            started = time.monotonic()
+            with self.assertRaises(GatewayRejectedError) as ctx:
+                gw.acquire(timeout=0.05)
+        self.assertEqual(ctx.exception.reason, QUEUE_TIMEOUT)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_release_is_idempotent(self):
+        gw = gateway(max_concurrency=2)
+        slot = gw.acquire()
+        slot.release()
+        slot.release()
+        self.assertEqual(gw.stats()["in_flight"], 0)
+
+    def test_rate_limit(self):
+        gw = gateway(user_rate=1, user_burst=2)
+        gw.check_rate("u1")
+        gw.check_rate("u1")
+        with self.assertRaises(GatewayRejectedError) as ctx:
+            gw.check_rate("u1")
+        self.assertEqual(ctx.exception.reason, RATE_LIMITED)
+        gw.check_rate("u2")
+
+
+class AsyncGatewayTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_honors_timeout(self):
+        gw = gateway()
+        held = gw.acquire()
+        started = time.monotonic()
+        with self.assertRaises(GatewayRejectedError) as ctx:
+            await gw.acquire_async(timeout=0.1)
+        self.assertEqual(ctx.exception.reason, QUEUE_TIMEOUT)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(gw.stats()["queued"], 0)
+        held.release()
+
+    async def test_woken_by_release_from_another_thread(self):
+        gw = gateway()
+        held = gw.acquire()
+        threading.Timer(0.05, held.release).start()
+        with await gw.acquire_async(timeout=2) as slot:
+            self.assertGreaterEqual(slot.wait, 0.04)
+            self.assertLess(slot.wait, 1)
+
+    async def test_waiters_are_served_in_order(self):
+        gw = gateway()
+        held = gw.acquire()
+        order = []
+
+        async def wait(name):
+            with await gw.acquire_async():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        tasks = [asyncio.create_task(wait("first")), asyncio.create_task(wait("second"))]
+        await asyncio.sleep(0.01)
+        held.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["first", "second"])
+
+    async def test_cancelled_waiter_passes_its_turn_on(self):
+        gw = gateway()
+        held = gw.acquire()
+        first = asyncio.create_task(gw.acquire_async())
+        second = asyncio.create_task(gw.acquire_async(timeout=2))
+        await asyncio.sleep(0.01)
+        # 반납 알림이 첫 번째 대기자에게 전달되기 전에 취소
+        held.release()
+        first.cancel()
+        slot = await second
+        slot.release()
+        self.assertTrue(first.cancelled())
+        self.assertEqual(gw.stats()["in_flight"], 0)
+        self.assertEqual(gw.stats()["queued"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_histogram.py
+# utils/histogram.py LatencyHistogram 누적 구간과 분위수 근사치 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_histogram
+
+import json
+import os
+import sys
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils.histogram import LatencyHistogram
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def setUp(self):
+        self.histogram = LatencyHistogram(buckets=(0.1, 0.5, 1.0))
+
+    def test_empty(self):
+        self.assertIsNone(self.histogram.quantile(0.5))
+
+    def test_snapshot_is_cumulative(self):
+        for seconds in (0.05, 0.1, 0.3, 2.0):
+            self.histogram.observe(seconds)
+        snapshot = self.histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], [(0.1, 2), (0.5, 3), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["sum"], 2.45)
+
+    def test_quantile_uses_bucket_upper_bound(self):
+        for seconds in [0.05] * 50 + [0.3] * 45 + [0.8] * 5:
+            self.histogram.observe(seconds)
+        self.assertEqual(self.histogram.quantile(0.5), 0.1)
+        self.assertEqual(self.histogram.quantile(0.9), 0.5)
+        self.assertEqual(self.histogram.quantile(0.99), 1.0)
+
+    def test_quantile_beyond_largest_bucket_is_finite(self):
+        for seconds in (0.05, 5.0, 30.0):
+            self.histogram.observe(seconds)
+        self.assertEqual(self.histogram.quantile(0.99), 1.0)
+        json.dumps({"p99": self.histogram.quantile(0.99)}, allow_nan=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# tests/test_hot_query_indexes.py
+# 자주 실행되는 쿼리(db/migrate.py HOT_QUERIES)가 인덱스를 사용하는지 실제 MySQL의 EXPLAIN으로 확인한다.
+#
+# 실행 (BackEnd 디렉터리에서, 마이그레이션을 모두 적용한 테스트용 DB 필요):
+#   RUN_DB_TESTS=1 python -m unittest tests.test_hot_query_indexes
+#
+# 테스트 데이터는 이름이 hot_query_test_로 시작하는 사용자로 넣고, 끝나면 모두 지운다.
+# RUN_DB_TESTS가 없거나 DB에 연결할 수 없으면 건너뛴다.
+
+import os
+import sys
+import unittest
+import uuid
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'db'))
+
+try:
+    from db_config import get_connection
+    from migrate import HOT_QUERIES
+except ImportError as e:
+    get_connection = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = None
+
+SEED_USERS = 5             # 조회 대상 사용자 외의 사용자도 넣어 인덱스 선택도가 실제와 비슷하도록
+ROWS_PER_USER = 30
+SEED_PREFIX = "hot_query_test_"
+
+
+@unittest.skipUnless(os.getenv("RUN_DB_TESTS"), "set RUN_DB_TESTS=1 to run tests against a MySQL test database")
+class HotQueryIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        if get_connection is None:
+            raise unittest.SkipTest(f"db_config is not available: {IMPORT_ERROR}")
+        try:
+            cls.connection = get_connection()
+        except Exception as e:
+            raise unittest.SkipTest(f"Cannot connect to the test database: {e}")
+
+        cls.tag = uuid.uuid4().hex[:8]
+        cls.user_ids = []
+        try:
+            cls.seed()
+        except Exception:
+            cls.cleanup()
+            cls.connection.close()
+            raise
+
+    @classmethod
+    def seed(cls):
+        with cls.connection.cursor() as cursor:
+            for n in range(SEED_USERS):
+                cursor.execute("INSERT INTO users (username, password) VALUES (%s, %s)", (f"{SEED_PREFIX}{cls.tag}_{n}", "x" * 60))
+                user_id = cursor.lastrowid
+                cls.user_ids.append(user_id)
+
+                # 세션: 대부분은 만료 전, 일부만 만료된 상태
+                cursor.executemany(
+                    "INSERT INTO logins (user_id, uuid, expires_at) VALUES (%s, %s, NOW() + INTERVAL %s DAY)",
+                    [(user_id, str(uuid.uuid4()), -1 if i % 10 == 0 else 30) for i in range(ROWS_PER_USER)]
+                )
+                cursor.executemany(
+                    "INSERT INTO chats (user_id, chat_uuid, chat_history, last_message_at) VALUES (%s, %s, '[]', NOW() - INTERVAL %s MINUTE)",
+                    [(user_id, str(uuid.uuid4()), i) for i in range(ROWS_PER_USER)]
+                )
+                chat_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO chat_messages (chat_id, seq, role, parts) VALUES (%s, %s, %s, %s)",
+                    [(chat_id, seq, 'user' if seq % 2 else 'model', "hello") for seq in range(1, ROWS_PER_USER + 1)]
+                )
+                cursor.executemany(
+                    "INSERT INTO ChallengeList (user_id, challenge_id, created_at) VALUES (%s, %s, NOW() - INTERVAL %s MINUTE)",
+                    [(user_id, challenge_id, challenge_id) for challenge_id in range(1, ROWS_PER_USER + 1)]
+                )
+                cursor.executemany(
+                    "INSERT INTO UserActions (user_id, action_id, doing_action, time) VALUES (%s, %s, %s, NOW() - INTERVAL %s MINUTE)",
+                    [(user_id, 7, "Get weather info", i) for i in range(ROWS_PER_USER)]
+                )
+                cursor.execute(
+                    "INSERT INTO achievement_counters (user_id, counter_key, count, streak, first_day, last_day) "
+                    "VALUES (%s, 'login', 1, 1, CURDATE(), CURDATE())",
+                    (user_id,)
+                )
+
+            # 조회 대상: 첫 번째 사용자의 세션/채팅방/메시지
+            user_id = cls.user_ids[0]
+            cursor.execute("SELECT uuid FROM logins WHERE user_id = %s LIMIT 1", (user_id,))
+            session_uuid = cursor.fetchone()['uuid']
+            cursor.execute("SELECT chat_id, chat_uuid FROM chats WHERE user_id = %s LIMIT 1", (user_id,))
+            chat = cursor.fetchone()
+            cursor.execute("SELECT chat_id FROM chat_messages WHERE chat_id IN (SELECT chat_id FROM chats WHERE user_id = %s) LIMIT 1", (user_id,))
+            message_chat_id = cursor.fetchone()['chat_id']
+
+            for table in ("users", "logins", "chats", "chat_messages", "ChallengeList", "UserActions", "achievement_counters"):
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+        cls.connection.commit()
+
+        # HOT_QUERIES의 자리 표시 값 대신 넣은 데이터와 일치하는 값으로 EXPLAIN (목록 페이지는 사용자만 바꾸고 LIMIT 값은 그대로)
+        defaults = {label: params for label, _, params, _ in HOT_QUERIES}
+        cls.params = {
+            "session lookup": (session_uuid,),
+            "expired session sweep": defaults["expired session sweep"],
+            "chat lookup": (chat['chat_uuid'], user_id),
+            "chat messages range": (message_chat_id, ROWS_PER_USER // 2),
+            "challenge register": (user_id, 1),
+            "chat list page": (user_id,) + defaults["chat list page"][1:],
+            "action list page": (user_id,) + defaults["action list page"][1:],
+            "achievement counter": (user_id, "login"),
+            "challenge list page": (user_id,) + defaults["challenge list page"][1:],
+        }
+
+    @classmethod
+    def cleanup(cls):
+        if not cls.user_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(cls.user_ids))
+        with cls.connection.cursor() as cursor:
+            for table in ("achievement_counters", "UserActions", "ChallengeList", "chats", "logins"):
+                cursor.execute(f"DELETE FROM {table} WHERE user_id IN ({placeholders})", cls.user_ids)
+            cursor.execute(f"DELETE FROM users WHERE id IN ({placeholders})", cls.user_ids)
+        cls.connection.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            cls.cleanup()
+        finally:
+            cls.connection.close()
+
+    def test_hot_queries_use_an_index(self):
+        self.assertEqual(set(self.params), {label for label, _, _, _ in HOT_QUERIES}, "every hot query needs seed params")
+        with self.connection.cursor() as cursor:
+            for label, query, _, expected in HOT_QUERIES:
+                with self.subTest(query=label):
+                    cursor.execute("EXPLAIN " + query, self.params[label])
+                    plan = cursor.fetchall()
+                    self.assertTrue(plan, f"{label}: empty plan")
+                    for row in plan:
+                        self.assertIsNotNone(row.get('key'), f"{label}: no index used ({row})")
+                        self.assertNotEqual(row.get('type'), 'ALL', f"{label}: full table scan ({row})")
+                    self.assertIn(expected, [row.get('key') for row in plan], f"{label}: expected index {expected}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# tests/test_pagination.py
+# utils/pagination.py PageRequest 커서 인코딩/디코딩과 keyset 페이지 조회 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_pagination
+
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pymysql
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils import pagination
+from utils.pagination import (
+    PageRequest, InvalidPageRequest, encode_cursor, decode_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
+)
+
+
+class FakeCursor:
+    """실행한 SQL 대신 미리 정해 둔 행을 돌려주는 커서"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+        self.batches = []
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        self.batches.append(len(rows))
+        return rows
+
+
+class FakeConnection:
+    def cursor(self, cursor_class=None):
+        return cursor_class
+
+
+def rows(count):
+    return [{"id": n, "time": datetime(2024, 11, 1, 12, 0, n % 60)} for n in range(count, 0, -1)]
+
+
+class CursorEncodingTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor('actions', datetime(2024, 11, 1, 12, 30), 42)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor('actions', cursor), ('2024-11-01 12:30:00', 42))
+
+    def test_rejects_other_kind(self):
+        cursor = encode_cursor('chats', '2024-11-01 12:30:00', 1)
+        with self.assertRaises(InvalidPageRequest):
+            decode_cursor('actions', cursor)
+
+    def test_rejects_malformed(self):
+        for cursor in ("not a cursor", "e30", encode_cursor('actions', 'x', 1)[:-3], "!!!"):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidPageRequest):
+                decode_cursor('actions', cursor)
+
+    def test_rejects_non_integer_id(self):
+        cursor = encode_cursor('actions', '2024-11-01 12:30:00', "1")
+        with self.assertRaises(InvalidPageRequest):
+            decode_cursor('actions', cursor)
+
+
+class PageRequestTest(unittest.TestCase):
+
+    def test_legacy_request_has_no_limit(self):
+        page = PageRequest('actions', {"user_uuid": "x"})
+        self.assertIsNone(page.limit)
+        sql, params = page.list_query((7,))
+        self.assertNotIn("LIMIT", sql)
+        self.assertEqual(params, (7,))
+
+    def test_cursor_only_uses_default_limit(self):
+        page = PageRequest('actions', {"cursor": encode_cursor('actions', '2024-11-01 12:00:00', 5)})
+        self.assertEqual(page.limit, PAGE_DEFAULT_LIMIT)
+
+    def test_invalid_limit(self):
+        for limit in (0, PAGE_MAX_LIMIT + 1, "ten", True, 1.5, None):
+            with self.subTest(limit=limit), self.assertRaises(InvalidPageRequest):
+                PageRequest('actions', {"limit": limit})
+
+    def test_invalid_time_filter(self):
+        for value in ("yesterday", "2024-11-01T12:00:00+09:00"):
+            with self.subTest(value=value), self.assertRaises(InvalidPageRequest):
+                PageRequest('actions', {"since": value})
+
+    def test_query_after_cursor(self):
+        cursor = encode_cursor('actions', '2024-11-01 12:00:00', 5)
+        page = PageRequest('actions', {"limit": 10, "cursor": cursor, "since": "2024-11-01"})
+        sql, params = page.list_query((7,))
+        self.assertIn("FROM UserActions WHERE user_id = %s AND time >= %s AND (time < %s OR (time = %s AND id < %s))", sql)
+        self.assertTrue(sql.endswith("ORDER BY time DESC, id DESC LIMIT %s"))
+        self.assertEqual(params, (7, '2024-11-01 00:00:00', '2024-11-01 12:00:00', '2024-11-01 12:00:00', 5, 11))
+
+    def test_fetch_pages(self):
+        page = PageRequest('actions', {"limit": 3})
+        items, next_cursor = page.fetch(FakeCursor(rows(4)), 'time', 'id', lambda row: row['id'])
+        self.assertEqual(items, [4, 3, 2])
+        self.assertEqual(decode_cursor('actions', next_cursor), ('2024-11-01 12:00:02', 2))
+
+    def test_fetch_last_page(self):
+        page = PageRequest('actions', {"limit": 3})
+        items, next_cursor = page.fetch(FakeCursor(rows(3)), 'time', 'id', lambda row: row['id'])
+        self.assertEqual(items, [3, 2, 1])
+        self.assertIsNone(next_cursor)
+
+    def test_fetch_legacy_returns_everything_in_batches(self):
+        page = PageRequest('actions', {})
+        cursor = FakeCursor(rows(1200))
+        items, next_cursor = page.fetch(cursor, 'time', 'id', lambda row: row['id'])
+        self.assertEqual(items, list(range(1200, 0, -1)))
+        self.assertIsNone(next_cursor)
+        self.assertLessEqual(max(cursor.batches), pagination.PAGE_FETCH_BATCH_SIZE)
+
+    def test_legacy_request_uses_server_side_cursor(self):
+        self.assertIs(PageRequest('actions', {}).cursor(FakeConnection()), pymysql.cursors.SSDictCursor)
+        self.assertIsNone(PageRequest('actions', {"limit": 5}).cursor(FakeConnection()))
+
+
+if __name__ == '__main__':
+    unittest.main()
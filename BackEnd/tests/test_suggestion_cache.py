@@ -0,0 +1,72 @@
+# tests/test_suggestion_cache.py
+# 추천 문구 캐시 지문(weather_fingerprint)과 대시보드가 만드는 gensentence 입력(gensentence_payload) 확인
+#
+# 실행 (BackEnd 디렉터리에서): python -m unittest tests.test_suggestion_cache
+
+import os
+import sys
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from utils.suggestion_cache import gensentence_payload, weather_fingerprint
+
+NOW = 1760000000  # 2025-10-09 08:53:20 UTC
+
+
+def openweathermap(temp_k, main, pm10, pm2_5, later_main, tz_offset):
+    """OpenWeatherMap 현재 날씨 / 대기질 / 5일 예보 응답과 같은 형식의 원본 데이터"""
+    weather = {"weather": [{"main": main}], "main": {"temp": temp_k}, "wind": {"speed": 3.1}, "timezone": tz_offset}
+    air = {"list": [{"components": {"pm10": pm10, "pm2_5": pm2_5}}]}
+    forecast = {"list": [
+        {"dt_txt": f"2025-10-09 {hour:02d}:00:00", "main": {"temp": temp_k}, "weather": [{"main": main if hour < 12 else later_main}]}
+        for hour in range(0, 24, 3)
+    ]}
+    return weather, air, forecast
+
+
+class GensentencePayloadTest(unittest.TestCase):
+
+    def test_matches_app_format(self):
+        payload = gensentence_payload(*openweathermap(284.45, "Rain", 39.26, 20.1, "Rain", 32400), now=NOW)
+        self.assertEqual(payload["date"], "2025-10-09 17:53:20")
+        self.assertEqual(payload["current_temp"], "11.3°C")
+        self.assertEqual(payload["current_weather"], "rain")
+        self.assertEqual(payload["current_wind"], "3.1m/s")
+        self.assertEqual(payload["current_pm10"], "39.26µg/m³")
+        self.assertEqual(payload["current_pm2_5"], "20.1µg/m³")
+        self.assertEqual(len(payload["3hourly_weather"]), 8)
+        self.assertEqual(payload["3hourly_weather"][1], {"time": "03:00", "temp": "11.3°C", "weather": "rain"})
+
+    def test_missing_sections(self):
+        payload = gensentence_payload({"main": {}}, None, None, now=NOW)
+        self.assertIsNone(payload["current_temp"])
+        self.assertIsNone(payload["current_pm10"])
+        self.assertEqual(payload["3hourly_weather"], [])
+
+
+class WeatherFingerprintTest(unittest.TestCase):
+
+    def test_different_locations_get_different_fingerprints(self):
+        seoul = weather_fingerprint(gensentence_payload(*openweathermap(284.45, "Rain", 60, 40, "Rain", 32400), now=NOW))
+        new_york = weather_fingerprint(gensentence_payload(*openweathermap(300.15, "Clear", 10, 5, "Clear", -14400), now=NOW))
+        self.assertEqual(seoul, "rain|mild|bad|evening")
+        self.assertEqual(new_york, "clear|warm|good|night")
+        self.assertNotIn("unknown", seoul + new_york)
+
+    def test_precipitation_later(self):
+        data = gensentence_payload(*openweathermap(284.45, "Clouds", 10, 5, "Rain", 0), now=NOW)
+        self.assertTrue(weather_fingerprint(data).startswith("clouds+precip_later|"))
+
+    def test_bands_ignore_small_differences(self):
+        a = gensentence_payload(*openweathermap(284.45, "Clear", 10, 5, "Clear", 0), now=NOW)
+        b = gensentence_payload(*openweathermap(285.95, "Clear", 12, 7, "Clear", 0), now=NOW + 600)
+        self.assertEqual(weather_fingerprint(a), weather_fingerprint(b))
+
+    def test_unknown_input(self):
+        self.assertEqual(weather_fingerprint("sunny"), "raw:sunny")
+
+
+if __name__ == '__main__':
+    unittest.main()
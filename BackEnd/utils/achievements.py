@@ -0,0 +1,218 @@
+# utils/achievements.py
+
+import json
+import os
+import threading
+from datetime import date
+
+import pymysql
+
+from db_config import get_connection
+from utils.uuid_generator import is_duplicate_key
+
+CHALLENGE_LIST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'challenge_list.jsonl')
+
+# 서버에서 직접 기록하는 이벤트
+EVENT_LOGIN = "login"
+EVENT_CHAT_CREATE = "chat_create"
+EVENT_CHAT_MESSAGE = "chat_message"
+
+# /action/register의 action_id(ActionList.md) → 이벤트 (앱에서만 알 수 있는 행동)
+# 로그인(1), Gemini 채팅(3), 채팅방 생성(6)은 서버가 직접 기록하므로 중복 집계하지 않도록 제외하고,
+# 날씨 조회처럼 여기에 없는 action_id는 도전 과제와 무관하다.
+# (3시간 예보 조회는 예전에 9번으로 기록되었으나 11번으로 옮김 - 기존 행은 db/backfill_achievements.py가 정리)
+ACTION_EVENTS = {
+    2: "todo_add",             # Add Today List
+    4: "calendar_add",         # Add Calender List
+    5: "daily_goal_complete",  # Today List 100%
+    9: "aac_button_add",       # Add AAC Button
+}
+
+# 규칙 종류
+RULE_COUNT = "count"                        # 이벤트 누적 횟수가 target 이상
+RULE_STREAK = "streak"                      # 이벤트가 target일 연속 발생
+RULE_DAYS_SINCE_FIRST = "days_since_first"  # 첫 이벤트 후 target일이 지난 뒤 다시 발생
+
+SELECT_COUNTER_SQL = (
+    "SELECT count, streak, first_day, last_day FROM achievement_counters "
+    "WHERE user_id = %s AND counter_key = %s FOR UPDATE"
+)
+INSERT_COUNTER_SQL = (
+    "INSERT INTO achievement_counters (user_id, counter_key, count, streak, first_day, last_day) "
+    "VALUES (%s, %s, 1, 1, %s, %s)"
+)
+UPDATE_COUNTER_SQL = (
+    "UPDATE achievement_counters SET count = %s, streak = %s, last_day = %s "
+    "WHERE user_id = %s AND counter_key = %s"
+)
+# 도전 과제 등록 (이미 있으면 아무것도 바꾸지 않아 rowcount가 0, /challenge/register도 사용)
+AWARD_SQL = (
+    "INSERT INTO ChallengeList (user_id, challenge_id, created_at) VALUES (%s, %s, NOW()) "
+    "ON DUPLICATE KEY UPDATE id = id"
+)
+
+
+def load_rules(path=CHALLENGE_LIST_PATH):
+    """
+    challenge_list.jsonl에서 "rule"이 있는 도전 과제를 읽어 {이벤트: [규칙, ...]}로 반환합니다.
+    rule 예: {"event": "login", "type": "streak", "target": 7}, 대화방별 카운터는 "per": "chat"
+    """
+    rules = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                challenge = json.loads(line)
+                rule = challenge.get('rule')
+                if rule is None:
+                    continue
+                if rule.get('type') not in (RULE_COUNT, RULE_STREAK, RULE_DAYS_SINCE_FIRST) \
+                        or not isinstance(rule.get('target'), int) or rule.get('per') not in (None, 'chat'):
+                    print(f"Skipping invalid rule for challenge {challenge['id']}: {rule}")
+                    continue
+                rules.setdefault(rule['event'], []).append({
+                    "id": challenge['id'], "name": challenge['name'],
+                    "type": rule['type'], "target": rule['target'], "per": rule.get('per'),
+                })
+    except Exception as e:
+        print(f"Error reading challenge rules: {str(e)}")
+    return rules
+
+
+def to_date(value):
+    """DATE 컬럼 값(date 또는 'YYYY-MM-DD' 문자열)을 date로 변환"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def advance_counter(row, today):
+    """
+    카운터 행 {"count", "streak", "first_day", "last_day"} (없으면 None)에 today의 이벤트 한 건을 반영합니다.
+    반환값: (새 행, 이전 상태, 현재 상태) - 상태: (count, streak, 첫 이벤트 후 경과 일수)
+    """
+    if row is None:
+        return {"count": 1, "streak": 1, "first_day": today, "last_day": today}, (0, 0, 0), (1, 1, 0)
+
+    first_day, last_day = to_date(row['first_day']), to_date(row['last_day'])
+    if last_day == today:
+        streak = row['streak']
+    elif (today - last_day).days == 1:
+        streak = row['streak'] + 1
+    else:
+        streak = 1
+    count = row['count'] + 1
+    before = (row['count'], row['streak'], (last_day - first_day).days)
+    after = (count, streak, (today - first_day).days)
+    return {"count": count, "streak": streak, "first_day": first_day, "last_day": today}, before, after
+
+
+def evaluate_event(rules, bump, event, scope):
+    """
+    이벤트 하나를 반영하고, 이번에 조건을 넘어선 규칙 목록을 반환합니다.
+    bump(counter_key)는 카운터를 갱신하고 (이전 상태, 현재 상태)를 반환하는 함수 (DB 또는 메모리).
+    """
+    rules = rules.get(event)
+    if not rules:
+        return []
+    counters = {None: bump(event)}
+    if scope is not None and any(rule['per'] for rule in rules):
+        counters['chat'] = bump(f"{event}@{scope}")
+
+    index = {RULE_COUNT: 0, RULE_STREAK: 1, RULE_DAYS_SINCE_FIRST: 2}
+    reached = []
+    for rule in rules:
+        if rule['per'] not in counters:
+            continue
+        before, after = counters[rule['per']]
+        i = index[rule['type']]
+        if before[i] < rule['target'] <= after[i]:
+            reached.append(rule)
+    return reached
+
+
+class AchievementEngine:
+    """
+    도전 과제 달성 여부를 서버에서 이벤트마다 점진적으로 판정한다.
+    - 사용자별 (이벤트[@범위]) 카운터 한 행에 누적 횟수, 연속 일수, 첫/마지막 발생일을 저장하므로
+      UserActions를 다시 훑지 않고 이벤트 한 건당 카운터 조회/갱신만 한다.
+    - 이번 이벤트로 목표치를 넘어선 규칙만 ChallengeList에 등록하고, 새로 등록된 도전 과제를 반환한다.
+    - 규칙이 없는 이벤트는 DB에 접근하지 않는다.
+    """
+
+    def __init__(self, rules, connection_factory):
+        self.rules = rules
+        self._connection_factory = connection_factory
+
+        # 여러 요청 스레드에서 동시에 호출되므로 통계는 잠금을 잡고 갱신
+        self._lock = threading.Lock()
+        self.events = 0
+        self.awarded = 0
+        self.failures = 0
+
+    def _bump_counter(self, cursor, user_id, counter_key, today):
+        """카운터를 갱신하고 (이전 상태, 현재 상태)를 반환합니다. 상태: (count, streak, 경과 일수)"""
+        for _ in range(2):
+            cursor.execute(SELECT_COUNTER_SQL, (user_id, counter_key))
+            row = cursor.fetchone()
+            if row is not None:
+                break
+            try:
+                cursor.execute(INSERT_COUNTER_SQL, (user_id, counter_key, today, today))
+                return (0, 0, 0), (1, 1, 0)
+            except pymysql.err.IntegrityError as e:
+                # 같은 사용자의 동시 요청이 먼저 행을 만들었으면 다시 잠그고 갱신
+                if not is_duplicate_key(e, 'PRIMARY'):
+                    raise
+
+        counter, before, after = advance_counter(row, today)
+        cursor.execute(UPDATE_COUNTER_SQL, (counter['count'], counter['streak'], today, user_id, counter_key))
+        return before, after
+
+    def record(self, user_id, events, connection=None):
+        """
+        events: [(이벤트, 범위), ...] (범위는 대화방별 규칙용 chat_id, 없으면 None)
+        새로 달성한 도전 과제 [{"id", "name"}, ...]를 반환합니다.
+        판정에 실패해도 원래 요청은 성공해야 하므로 오류는 기록만 하고 빈 목록을 반환한다.
+        """
+        events = [(event, scope) for event, scope in events if event in self.rules]
+        if not events:
+            return []
+        if connection is None:
+            with self._connection_factory() as own_connection:
+                return self.record(user_id, events, own_connection)
+
+        with self._lock:
+            self.events += len(events)
+        today = date.today()
+        try:
+            earned = []
+            with connection.cursor() as cursor:
+                bump = lambda counter_key: self._bump_counter(cursor, user_id, counter_key, today)
+                for event, scope in events:
+                    for rule in evaluate_event(self.rules, bump, event, scope):
+                        cursor.execute(AWARD_SQL, (user_id, rule['id']))
+                        # 이미 등록된 도전 과제(앱에서 직접 등록한 경우 포함)는 다시 알리지 않음
+                        if cursor.rowcount == 1:
+                            earned.append({"id": rule['id'], "name": rule['name']})
+            connection.commit()
+        except Exception as e:
+            print(f"Error evaluating achievements: {str(e)}")
+            connection.rollback()
+            with self._lock:
+                self.failures += 1
+            return []
+
+        with self._lock:
+            self.awarded += len(earned)
+        return earned
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rules": sum(len(rules) for rules in self.rules.values()),
+                "events": self.events,
+                "awarded": self.awarded,
+                "failures": self.failures,
+            }
+
+
+# 앱 전체에서 공유하는 도전 과제 판정기
+achievement_engine = AchievementEngine(load_rules(), get_connection)
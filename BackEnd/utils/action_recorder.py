@@ -0,0 +1,185 @@
+# utils/action_recorder.py
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from db_config import get_connection
+
+INSERT_ACTION_SQL = "INSERT INTO UserActions (user_id, action_id, doing_action, time) VALUES (%s, %s, %s, %s)"
+
+# 기록 방식
+MODE_SYNC = "sync"    # 요청 처리 중에 바로 INSERT + COMMIT
+MODE_ASYNC = "async"  # 메모리 큐에 쌓았다가 백그라운드에서 여러 행을 한 번에 INSERT
+
+
+class ActionRecorder:
+    """
+    UserActions 기록기 (write-behind).
+    async 모드의 이벤트는 큐에 쌓였다가 batch_size 개가 모이거나 flush_interval 초가 지나면
+    executemany 한 번으로 저장된다. 프로세스 종료 시 남은 이벤트를 모두 저장한다.
+    저장에 실패하면 flush_interval부터 두 배씩 늘어나는 간격(최대 max_backoff 초)을 두고 다시 시도한다.
+    """
+
+    def __init__(self, connection_factory, batch_size=100, flush_interval=1.0, max_queue=10000, max_retries=3,
+                 max_backoff=30.0):
+        self._connection_factory = connection_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+
+        self._queue = deque()  # (row, attempts)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._backoff = 0.0    # 현재 재시도 간격 (마지막 저장이 성공했으면 0)
+        self._retry_at = 0.0   # 이 시각(monotonic) 전에는 백그라운드 저장을 다시 시도하지 않음
+
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+
+    def record(self, user_id, action_id, doing_action, mode=MODE_ASYNC, connection=None):
+        """
+        사용자 행동을 기록합니다.
+        sync 모드는 connection(없으면 새로 빌림)으로 바로 커밋하고, async 모드는 큐에 넣고 바로 반환합니다.
+        """
+        row = (user_id, action_id, doing_action, datetime.now())
+        if mode == MODE_SYNC or self._closed:
+            self._insert_now(row, connection)
+            return
+
+        self._ensure_started()
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                overflow = True
+            else:
+                overflow = False
+                self._queue.append((row, 0))
+                self.recorded += 1
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+        if overflow:
+            # 큐가 가득 차면 요청 스레드에서 직접 저장 (이벤트를 버리지 않음)
+            self._insert_now(row, connection)
+
+    def _insert_now(self, row, connection=None):
+        if connection is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(INSERT_ACTION_SQL, row)
+            connection.commit()
+        else:
+            with self._connection_factory() as own_connection:
+                with own_connection.cursor() as cursor:
+                    cursor.execute(INSERT_ACTION_SQL, row)
+                own_connection.commit()
+        with self._cond:
+            self.recorded += 1
+            self.flushed += 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="action-recorder", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    # 저장 실패 후에는 재시도 간격이 지날 때까지 대기 (큐가 차서 깨어나도 다시 대기)
+                    remaining = self._retry_at - time.monotonic()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+                    # batch_size 개가 모이거나 flush_interval 초가 지날 때까지 대기
+                    if len(self._queue) < self.batch_size:
+                        self._cond.wait(self.flush_interval)
+                    break
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        """큐에 쌓인 이벤트를 batch_size 단위로 모두 저장합니다."""
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._queue:
+                        return
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+                started = time.monotonic()
+                try:
+                    with self._connection_factory() as connection:
+                        with connection.cursor() as cursor:
+                            cursor.executemany(INSERT_ACTION_SQL, [row for row, _ in batch])
+                        connection.commit()
+                except Exception as e:
+                    retry = [(row, attempts + 1) for row, attempts in batch if attempts + 1 < self.max_retries]
+                    with self._cond:
+                        self._queue.extendleft(reversed(retry))
+                        self.failures += 1
+                        self.dropped += len(batch) - len(retry)
+                        self._backoff = min(max(self._backoff * 2, self.flush_interval), self.max_backoff)
+                        self._retry_at = time.monotonic() + self._backoff
+                        backoff = self._backoff
+                    print(f"Error flushing user actions (retry in {backoff:.1f}s): {str(e)}")
+                    return
+
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self.flushed += len(batch)
+                    self.flushes += 1
+                    self._flush_total += elapsed
+                    self._flush_max = max(self._flush_max, elapsed)
+                    self._backoff = 0.0
+                    self._retry_at = 0.0
+
+    def close(self):
+        """백그라운드 스레드를 멈추고 남은 이벤트를 저장합니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "recorded": self.recorded,
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "retry_backoff": self._backoff,
+                "flush_avg_ms": round(self._flush_total / self.flushes * 1000, 3) if self.flushes else 0.0,
+                "flush_max_ms": round(self._flush_max * 1000, 3),
+            }
+
+
+action_recorder = ActionRecorder(
+    get_connection,
+    batch_size=int(os.getenv("ACTION_LOG_BATCH_SIZE", 100)),
+    flush_interval=float(os.getenv("ACTION_LOG_FLUSH_INTERVAL", 1.0)),
+    max_queue=int(os.getenv("ACTION_LOG_MAX_QUEUE", 10000)),
+    max_backoff=float(os.getenv("ACTION_LOG_MAX_BACKOFF", 30.0)),
+)
+
+# 서버 종료 시 남은 이벤트 저장
+atexit.register(action_recorder.close)
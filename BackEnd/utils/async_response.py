@@ -0,0 +1,13 @@
+# utils/async_response.py
+
+from starlette.responses import JSONResponse
+
+# create_response의 ASGI(Starlette) 버전: 응답 본문 형식은 동일
+def create_async_response(status_code, message, data=None, headers=None):
+    response = {
+        "StatusCode": status_code,
+        "message": message
+    }
+    if data is not None:
+        response["data"] = data
+    return JSONResponse(response, status_code=status_code, headers=headers)
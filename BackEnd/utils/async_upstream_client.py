@@ -0,0 +1,97 @@
+# utils/async_upstream_client.py
+
+import asyncio
+import random
+import time
+
+import httpx
+
+from utils.histogram import LatencyHistogram
+from utils.upstream_client import RETRYABLE_STATUS
+
+
+class AsyncUpstreamClient:
+    """
+    UpstreamClient의 비동기 버전 (ASGI 모드).
+    httpx.AsyncClient 하나를 공유해 keep-alive 커넥션을 재사용하며,
+    타임아웃/재시도/지연 시간 히스토그램 동작은 UpstreamClient와 같다.
+    """
+
+    def __init__(self, name, timeouts=None, default_timeout=(3.05, 10), max_retries=2,
+                 backoff_base=0.2, backoff_max=2.0, pool_maxsize=100):
+        self.name = name
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+
+        self._client = None
+        self._histograms = {}
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def _get_client(self):
+        # AsyncClient는 이벤트 루프 안에서 처음 사용할 때 생성
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+            self._client = httpx.AsyncClient(limits=limits)
+        return self._client
+
+    def _histogram(self, endpoint):
+        histogram = self._histograms.get(endpoint)
+        if histogram is None:
+            histogram = self._histograms[endpoint] = LatencyHistogram()
+        return histogram
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get(self, endpoint, url, params=None):
+        """
+        GET 요청. 일시적 오류는 max_retries 번까지 재시도하며,
+        재시도 후에도 연결 오류/타임아웃이면 httpx 예외를 그대로 던진다.
+        """
+        connect_timeout, read_timeout = self.timeouts.get(endpoint, self.default_timeout)
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        histogram = self._histogram(endpoint)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = await self._get_client().get(url, params=params, timeout=timeout)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                histogram.observe(time.monotonic() - started)
+                self.requests += 1
+                self.errors += 1
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                histogram.observe(time.monotonic() - started)
+                self.requests += 1
+                if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    return response
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        summary = {"name": self.name, "requests": self.requests, "retries": self.retries, "errors": self.errors}
+        summary["latency"] = {
+            endpoint: {
+                "count": histogram.snapshot()["count"],
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+            for endpoint, histogram in dict(self._histograms).items()
+        }
+        return summary
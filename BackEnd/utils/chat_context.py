@@ -0,0 +1,65 @@
+# utils/chat_context.py
+
+# Gemini에 보낼 대화 맥락 구성
+# 최근 N턴은 그대로 보내고, 그보다 오래된 메시지는 요약문으로 접어서 보낸다.
+# 대화가 아무리 길어져도 한 번의 요청 크기가 거의 일정하게 유지된다.
+
+SUMMARY_PROMPT = """다음은 사용자와 챗봇의 이전 대화 요약과 그 이후에 이어진 대화입니다.
+기존 요약에 새 대화 내용을 합쳐 하나의 요약문으로 다시 작성하세요.
+- 사용자에 대한 정보, 사용자가 부탁한 것, 약속한 내용은 빠짐없이 남기세요.
+- 한국어로 800자 이내로 작성하세요.
+- 요약문만 출력하세요.
+
+# 기존 요약
+{summary}
+
+# 이어진 대화
+{conversation}
+"""
+
+def estimate_tokens(text):
+    """토큰 수 근사치 (한국어/영어 혼합 기준 약 3글자당 1토큰)"""
+    return len(text) // 3 + 1
+
+def estimate_history_tokens(messages):
+    return sum(estimate_tokens(m['parts']) for m in messages)
+
+def split_for_context(messages, max_turns, max_tokens=None, fold_turns=0):
+    """
+    요약 이후의 메시지(seq 오름차순)를 요약으로 접을 부분과 그대로 보낼 부분으로 나눕니다.
+    - 턴 수가 max_turns + fold_turns 를 넘거나 추정 토큰이 max_tokens 를 넘을 때만 접는다.
+      (fold_turns 만큼 여유를 두어 요약 호출이 매 턴이 아니라 몇 턴에 한 번만 일어나도록 함)
+    - 접을 때는 최근 max_turns 턴만 남기고, 그래도 토큰이 max_tokens 의 절반을 넘으면 더 접는다.
+    반환값: (to_fold, keep)
+    """
+    over_turns = len(messages) > (max_turns + fold_turns) * 2
+    over_tokens = bool(max_tokens) and estimate_history_tokens(messages) > max_tokens
+    if not over_turns and not over_tokens:
+        return [], messages
+
+    keep = messages[-max_turns * 2:] if max_turns > 0 else []
+    if max_tokens:
+        # 마지막 한 턴은 항상 남긴다
+        while len(keep) > 2 and estimate_history_tokens(keep) > max_tokens // 2:
+            keep = keep[1:]
+    # 남긴 구간이 사용자 메시지로 시작하도록 맞춤
+    while keep and keep[0]['role'] != 'user':
+        keep = keep[1:]
+
+    return messages[:len(messages) - len(keep)], keep
+
+def format_conversation(messages):
+    names = {"user": "사용자", "model": "챗봇"}
+    return "\n".join(f"{names.get(m['role'], m['role'])}: {m['parts']}" for m in messages)
+
+def build_summary_prompt(summary, messages):
+    return SUMMARY_PROMPT.format(summary=summary or "(없음)", conversation=format_conversation(messages))
+
+def build_model_history(summary, messages):
+    """요약문(있다면)을 앞에 붙인 Gemini start_chat(history=...) 형식의 히스토리"""
+    history = []
+    if summary:
+        history.append({"role": "user", "parts": f"지금까지 우리가 나눈 대화의 요약이야:\n{summary}"})
+        history.append({"role": "model", "parts": "네, 이전 대화 내용을 기억하고 이어서 이야기할게요."})
+    history.extend({"role": m['role'], "parts": m['parts']} for m in messages)
+    return history
@@ -0,0 +1,97 @@
+# utils/chat_messages.py
+
+import json
+
+# chat_messages 테이블 기반 채팅 메시지 저장소
+# 메시지 한 건 = 한 행 (chat_id, seq) 이므로 대화가 길어져도 한 턴의 쓰기 비용은 일정하다.
+
+# 채팅방 조회 (uq_chats_chat_uuid) / 메시지 seq 범위 조회 (uq_chat_messages_chat_seq), 비동기 버전과 db/migrate.py check도 사용
+CHAT_LOOKUP_SQL = "SELECT chat_id, summary, summary_seq FROM chats WHERE chat_uuid = %s AND user_id = %s"
+CHAT_MESSAGES_RANGE_SQL = "SELECT seq, role, parts FROM chat_messages WHERE chat_id = %s AND seq > %s ORDER BY seq"
+
+def get_chat_id(user_id, chat_uuid, connection):
+    """chat_uuid가 해당 사용자의 채팅방이면 chat_id를, 아니면 None을 반환합니다."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT chat_id FROM chats WHERE chat_uuid = %s AND user_id = %s", (chat_uuid, user_id))
+            result = cursor.fetchone()
+            return result['chat_id'] if result else None
+    except Exception as e:
+        print(f"Error in get_chat_id: {str(e)}")
+        return None
+
+def get_chat(user_id, chat_uuid, connection):
+    """chat_uuid가 해당 사용자의 채팅방이면 chat_id와 요약 상태를, 아니면 None을 반환합니다."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CHAT_LOOKUP_SQL, (chat_uuid, user_id))
+            return cursor.fetchone()
+    except Exception as e:
+        print(f"Error in get_chat: {str(e)}")
+        return None
+
+def save_chat_summary(connection, chat_id, summary, summary_seq):
+    """요약문과 요약에 포함된 마지막 seq를 저장합니다. (커밋은 호출자가 수행)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE chats SET summary = %s, summary_seq = %s WHERE chat_id = %s",
+            (summary, summary_seq, chat_id)
+        )
+
+def has_chat_messages(connection, chat_id):
+    """chat_messages에 이 채팅방의 메시지가 한 건이라도 있는지 (없으면 이관 전 채팅방일 수 있음)"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM chat_messages WHERE chat_id = %s LIMIT 1", (chat_id,))
+        return cursor.fetchone() is not None
+
+def lock_last_seq(connection, chat_id):
+    """
+    채팅방 행을 잠그고(FOR UPDATE) 저장된 마지막 seq를 반환합니다. (커밋은 호출자가 수행)
+    같은 채팅방에 동시에 저장하는 요청은 앞 요청이 커밋할 때까지 기다렸다가 그 다음 seq를 받는다.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT chat_id FROM chats WHERE chat_id = %s FOR UPDATE", (chat_id,))
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) AS last_seq FROM chat_messages WHERE chat_id = %s", (chat_id,))
+        return cursor.fetchone()['last_seq']
+
+def load_chat_messages(connection, chat_id, after_seq=0, limit=None):
+    """
+    seq 범위 조회로 메시지를 불러옵니다.
+    반환값: [{"seq": int, "role": str, "parts": str}, ...] (seq 오름차순)
+    """
+    query = CHAT_MESSAGES_RANGE_SQL
+    params = [chat_id, after_seq]
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return [{"seq": row['seq'], "role": row['role'], "parts": row['parts']} for row in cursor.fetchall()]
+
+def load_legacy_chat_history(connection, chat_id):
+    """아직 이관되지 않은 채팅방을 위해 chats.chat_history JSON 컬럼을 읽습니다."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT chat_history FROM chats WHERE chat_id = %s", (chat_id,))
+        result = cursor.fetchone()
+    if not result or not result['chat_history']:
+        return []
+    history = json.loads(result['chat_history'])
+    return [{"seq": i + 1, "role": m['role'], "parts": m['parts']} for i, m in enumerate(history)]
+
+def append_chat_messages(connection, chat_id, start_seq, messages):
+    """
+    start_seq부터 순서대로 메시지를 INSERT 합니다. (커밋은 호출자가 수행)
+    messages: [{"role": str, "parts": str}, ...]
+    반환값: 마지막으로 저장된 seq
+    """
+    rows = [(chat_id, start_seq + i, m['role'], m['parts']) for i, m in enumerate(messages)]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO chat_messages (chat_id, seq, role, parts) VALUES (%s, %s, %s, %s)",
+            rows
+        )
+    return start_seq + len(rows) - 1
+
+def to_model_history(messages):
+    """저장된 메시지를 Gemini start_chat(history=...) 형식으로 변환합니다."""
+    return [{"role": m['role'], "parts": m['parts']} for m in messages]
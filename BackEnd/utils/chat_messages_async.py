@@ -0,0 +1,64 @@
+# utils/chat_messages_async.py
+
+import json
+
+from utils.chat_messages import CHAT_LOOKUP_SQL, CHAT_MESSAGES_RANGE_SQL
+
+# utils/chat_messages.py 의 비동기 버전 (ASGI 모드, aiomysql 커넥션 사용)
+# 쿼리와 반환 형식은 동기 버전과 같다.
+
+async def get_chat(user_id, chat_uuid, connection):
+    """chat_uuid가 해당 사용자의 채팅방이면 chat_id와 요약 상태를, 아니면 None을 반환합니다."""
+    try:
+        async with connection.cursor() as cursor:
+            await cursor.execute(CHAT_LOOKUP_SQL, (chat_uuid, user_id))
+            return await cursor.fetchone()
+    except Exception as e:
+        print(f"Error in get_chat: {str(e)}")
+        return None
+
+async def save_chat_summary(connection, chat_id, summary, summary_seq):
+    """요약문과 요약에 포함된 마지막 seq를 저장합니다. (커밋은 호출자가 수행)"""
+    async with connection.cursor() as cursor:
+        await cursor.execute(
+            "UPDATE chats SET summary = %s, summary_seq = %s WHERE chat_id = %s",
+            (summary, summary_seq, chat_id)
+        )
+
+async def lock_last_seq(connection, chat_id):
+    """채팅방 행을 잠그고(FOR UPDATE) 저장된 마지막 seq를 반환합니다. (트랜잭션 시작/커밋은 호출자가 수행)"""
+    async with connection.cursor() as cursor:
+        await cursor.execute("SELECT chat_id FROM chats WHERE chat_id = %s FOR UPDATE", (chat_id,))
+        await cursor.execute("SELECT COALESCE(MAX(seq), 0) AS last_seq FROM chat_messages WHERE chat_id = %s", (chat_id,))
+        return (await cursor.fetchone())['last_seq']
+
+async def load_chat_messages(connection, chat_id, after_seq=0, limit=None):
+    """seq 범위 조회로 메시지를 불러옵니다. (seq 오름차순)"""
+    query = CHAT_MESSAGES_RANGE_SQL
+    params = [chat_id, after_seq]
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    async with connection.cursor() as cursor:
+        await cursor.execute(query, params)
+        return [{"seq": row['seq'], "role": row['role'], "parts": row['parts']} for row in await cursor.fetchall()]
+
+async def load_legacy_chat_history(connection, chat_id):
+    """아직 이관되지 않은 채팅방을 위해 chats.chat_history JSON 컬럼을 읽습니다."""
+    async with connection.cursor() as cursor:
+        await cursor.execute("SELECT chat_history FROM chats WHERE chat_id = %s", (chat_id,))
+        result = await cursor.fetchone()
+    if not result or not result['chat_history']:
+        return []
+    history = json.loads(result['chat_history'])
+    return [{"seq": i + 1, "role": m['role'], "parts": m['parts']} for i, m in enumerate(history)]
+
+async def append_chat_messages(connection, chat_id, start_seq, messages):
+    """start_seq부터 순서대로 메시지를 INSERT 합니다. (커밋은 호출자가 수행)"""
+    rows = [(chat_id, start_seq + i, m['role'], m['parts']) for i, m in enumerate(messages)]
+    async with connection.cursor() as cursor:
+        await cursor.executemany(
+            "INSERT INTO chat_messages (chat_id, seq, role, parts) VALUES (%s, %s, %s, %s)",
+            rows
+        )
+    return start_seq + len(rows) - 1
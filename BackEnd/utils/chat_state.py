@@ -0,0 +1,85 @@
+# utils/chat_state.py
+
+import json
+import os
+
+from utils.chat_context import split_for_context, build_model_history
+from utils.chat_messages import to_model_history
+from utils.achievements import EVENT_CHAT_CREATE, EVENT_CHAT_MESSAGE
+
+# 채팅 한 턴(채팅방 열기 → 히스토리 구성 → 저장)의 상태 처리
+# DB/Gemini 호출을 뺀 나머지 로직으로, 동기(routes/chat.py)와 비동기(routes/chat_async.py) 핸들러가 함께 사용한다.
+# 각 핸들러는 여기서 정한 쿼리/값으로 I/O만 수행한다.
+
+# 대화 맥락 설정: 최근 CHAT_HISTORY_MAX_TURNS 턴은 그대로, 그 이전은 요약으로 전달
+CHAT_HISTORY_MAX_TURNS = int(os.getenv("CHAT_HISTORY_MAX_TURNS", 10))
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", 4000))  # 0이면 토큰 한도 미사용
+CHAT_SUMMARY_FOLD_TURNS = int(os.getenv("CHAT_SUMMARY_FOLD_TURNS", 5))  # 요약 갱신 전에 추가로 허용하는 턴 수
+
+# 새로운 채팅방 생성 (chat_history 컬럼은 이관 기간 동안 빈 배열로 유지)
+# chat_uuid 중복은 유니크 인덱스(uq_chats_chat_uuid)가 막으므로 미리 조회하지 않고 바로 INSERT
+NEW_CHAT_SQL = "INSERT INTO chats (user_id, chat_uuid, chat_history, created_at, last_message_at) VALUES (%s, %s, %s, NOW(), NOW())"
+NEW_CHAT_UUID_KEY = 'uq_chats_chat_uuid'
+TOUCH_CHAT_SQL = "UPDATE chats SET last_message_at = NOW() WHERE chat_id = %s"
+
+
+def new_chat_params(user_id):
+    """insert_with_new_uuid에 넘길 파라미터 생성 함수"""
+    return lambda new_uuid: (user_id, new_uuid, json.dumps([]))
+
+
+def existing_chat(record, chat_uuid, messages, legacy):
+    """
+    반환값: 채팅방 상태 dict
+    - messages: 요약 이후의 메시지 (legacy면 JSON 컬럼의 전체 메시지)
+    - legacy: 아직 chat_messages로 이관되지 않은 채팅방 여부
+    - summary, summary_seq: 요약문과 요약에 포함된 마지막 seq
+    """
+    return {"chat_id": record['chat_id'], "chat_uuid": chat_uuid, "messages": messages, "legacy": legacy,
+            "summary": record['summary'], "summary_seq": record['summary_seq'] or 0, "summary_changed": False,
+            "created": False}
+
+
+def new_chat(chat_id, chat_uuid):
+    return {"chat_id": chat_id, "chat_uuid": chat_uuid, "messages": [], "legacy": False,
+            "summary": None, "summary_seq": 0, "summary_changed": False, "created": True}
+
+
+def needs_legacy_history(messages, summary_seq):
+    """chat_messages에 메시지가 없고 요약도 없으면 이관 전 채팅방일 수 있으므로 JSON 컬럼을 확인"""
+    return not messages and summary_seq == 0
+
+
+def split_history(chat):
+    """요약으로 접을 메시지와 그대로 보낼 메시지로 나눔. 반환값: (to_fold, keep)"""
+    return split_for_context(chat['messages'], CHAT_HISTORY_MAX_TURNS, CHAT_HISTORY_MAX_TOKENS, CHAT_SUMMARY_FOLD_TURNS)
+
+
+def apply_summary(chat, summary, folded):
+    chat['summary'] = summary
+    chat['summary_seq'] = folded[-1]['seq']
+    chat['summary_changed'] = True
+
+
+def model_history(chat, keep):
+    return build_model_history(chat['summary'], keep)
+
+
+def turn_messages(chat, text, reply, last_seq):
+    """
+    이번 턴에 저장할 메시지 (아직 이관되지 않은 채팅방이면 기존 메시지도 함께).
+    last_seq: 채팅방 행을 잠근 뒤 조회한 마지막 seq (동시에 저장된 다른 턴 뒤에 이어 붙임)
+    반환값: (시작 seq, 메시지 목록)
+    """
+    new_messages = [{"role": "user", "parts": text}, {"role": "model", "parts": reply}]
+    if chat['legacy'] and last_seq == 0:
+        return 1, to_model_history(chat['messages']) + new_messages
+    return last_seq + 1, new_messages
+
+
+def chat_turn_events(chat):
+    """이번 턴으로 발생한 도전 과제 이벤트 (대화방별 규칙은 chat_id 기준)"""
+    events = [(EVENT_CHAT_MESSAGE, chat['chat_id'])]
+    if chat['created']:
+        events.append((EVENT_CHAT_CREATE, None))
+    return events
@@ -0,0 +1,183 @@
+# utils/circuit_breaker.py
+
+import os
+import threading
+import time
+
+CLOSED = "closed"        # 정상: 모든 호출 허용
+OPEN = "open"            # 차단: 호출하지 않고 바로 실패
+HALF_OPEN = "half_open"  # 시험: 소수의 호출만 보내 회복 여부 확인
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 외부 호출을 하지 않았을 때 발생"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit '{name}' is open, retry after {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    외부 서비스 장애 시 요청 스레드가 실패를 기다리며 묶이지 않도록 하는 회로 차단기.
+    - 연속 failure_threshold 번 실패하면 OPEN
+    - OPEN 후 recovery_timeout 초가 지나면 HALF_OPEN으로 바뀌어 half_open_max_calls 개의 시험 호출만 허용
+    - 시험 호출이 성공하면 CLOSED, 실패하면 다시 OPEN
+    - 시험 호출 결과가 probe_timeout 초 안에 기록되지 않으면 실패로 보고 다시 OPEN
+      (결과를 기록하지 못하고 사라진 시험 호출 때문에 HALF_OPEN에 계속 머물지 않도록)
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30.0, half_open_max_calls=1, probe_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.probe_timeout = recovery_timeout if probe_timeout is None else probe_timeout
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.opened = 0
+
+    def _current_state(self):
+        # 잠금을 잡은 상태에서 호출
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        elif (self._state == HALF_OPEN and self._half_open_calls > 0
+              and time.monotonic() - self._probe_started_at >= self.probe_timeout):
+            print(f"[circuit] {self.name}: half-open probe timed out after {self.probe_timeout:.0f}s, reopening")
+            self._open()
+        return self._state
+
+    def _retry_after(self):
+        if self._state == OPEN:
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        return self.recovery_timeout
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow(self):
+        """호출해도 되는지 확인합니다. 허용되지 않으면 CircuitOpenError 발생."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                if self._half_open_calls == 0:
+                    self._probe_started_at = time.monotonic()
+                self._half_open_calls += 1
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self._retry_after())
+
+    def reject_if_open(self):
+        """
+        회로가 OPEN이면 CircuitOpenError를 발생시킵니다 (HALF_OPEN 시험 호출 수는 소모하지 않음).
+        외부 호출 전에 DB 작업 등을 하는 경우, 미리 빠르게 실패시키는 용도.
+        """
+        with self._lock:
+            if self._current_state() == OPEN:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self._retry_after())
+
+    def release(self):
+        """
+        allow()로 받은 허가를 결과 기록 없이 반납합니다.
+        허가를 받은 뒤 외부 호출을 시작하지 못한 경우(예: 스트림 시작 전 클라이언트 연결 종료)에 사용.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            state = self._current_state()
+            self._failures += 1
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._open()
+
+    def call(self, fn, is_failure=None):
+        """
+        회로 차단기를 거쳐 fn()을 호출합니다.
+        예외가 발생하거나 is_failure(결과)가 참이면 실패로 기록합니다.
+        """
+        self.allow()
+        try:
+            result = fn()
+        except Exception:
+            self.record_failure()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    async def call_async(self, coro_fn, is_failure=None):
+        """call()의 비동기 버전: await coro_fn()"""
+        self.allow()
+        try:
+            result = await coro_fn()
+        except Exception:
+            self.record_failure()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_after": round(self._retry_after(), 1) if state == OPEN else 0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+# 이름별 공용 회로 차단기 (같은 외부 서비스를 쓰는 여러 블루프린트가 상태를 공유)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 30))  # 초
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def get_breaker(name):
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT
+            )
+        return breaker
+
+def circuit_states():
+    """모니터링용 회로 상태 목록"""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,128 @@
+# utils/forecast_compact.py
+
+# /weather/3hourly의 compact 응답 형식
+# OpenWeatherMap 5일/3시간 예보(항목 40개, 항목마다 중첩된 필드 다수)를 열(column) 단위의 배열로 바꾼다.
+#   {"units": {...}, "time": [dt, ...], "temp": [...], "condition": [...], "precipitation": [...], ...}
+# 같은 위치의 i번째 값끼리 한 예보 시점을 이룬다. 단위 변환은 서버에서 한 번만 하고,
+# 변환 결과는 원본 예보와 같은 캐시(weather_cache)에 단위별로 함께 저장한다.
+
+UNITS = ("metric", "imperial", "standard")
+DEFAULT_UNITS = "metric"
+
+# 단위계별 표시 단위
+UNIT_LABELS = {
+    "metric": {"temp": "C", "precipitation": "mm", "wind_speed": "m/s"},
+    "imperial": {"temp": "F", "precipitation": "in", "wind_speed": "mph"},
+    "standard": {"temp": "K", "precipitation": "mm", "wind_speed": "m/s"},
+}
+
+
+class InvalidCompactRequest(ValueError):
+    """잘못된 compact/fields/units 요청 값"""
+
+
+def convert_temp(kelvin, units):
+    if kelvin is None:
+        return None
+    if units == "metric":
+        return round(kelvin - 273.15, 1)
+    if units == "imperial":
+        return round((kelvin - 273.15) * 9 / 5 + 32, 1)
+    return round(kelvin, 2)
+
+
+def convert_precipitation(mm, units):
+    return round(mm / 25.4, 3) if units == "imperial" else round(mm, 2)
+
+
+def convert_wind(speed, units):
+    if speed is None:
+        return None
+    return round(speed * 2.23694, 1) if units == "imperial" else round(speed, 1)
+
+
+def precipitation_mm(entry):
+    """3시간 동안의 비 + 눈 강수량(mm)"""
+    return (entry.get("rain") or {}).get("3h", 0) + (entry.get("snow") or {}).get("3h", 0)
+
+
+# 열 이름 -> (예보 항목, 단위계) => 값
+COLUMNS = {
+    "time": lambda entry, units: entry.get("dt"),
+    "temp": lambda entry, units: convert_temp(entry.get("main", {}).get("temp"), units),
+    "feels_like": lambda entry, units: convert_temp(entry.get("main", {}).get("feels_like"), units),
+    "humidity": lambda entry, units: entry.get("main", {}).get("humidity"),
+    "condition": lambda entry, units: (entry.get("weather") or [{}])[0].get("id"),
+    "icon": lambda entry, units: (entry.get("weather") or [{}])[0].get("icon"),
+    "pop": lambda entry, units: round(entry.get("pop", 0) * 100),  # 강수 확률(%)
+    "precipitation": lambda entry, units: convert_precipitation(precipitation_mm(entry), units),
+    "wind_speed": lambda entry, units: convert_wind(entry.get("wind", {}).get("speed"), units),
+}
+
+
+def parse_compact_options(data):
+    """
+    요청 본문에서 compact 옵션을 읽음.
+    - compact: true면 모든 열, fields: ["time", "temp", ...]면 지정한 열만 (fields만 줘도 compact)
+    - units: metric(기본, 섭씨) / imperial(화씨) / standard(켈빈)
+    반환값: compact 요청이 아니면 None, 맞으면 (units, fields)
+    """
+    fields = data.get('fields')
+    if not data.get('compact') and fields is None:
+        return None
+
+    if fields is None:
+        fields = list(COLUMNS)
+    else:
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        if not isinstance(fields, list) or not fields:
+            raise InvalidCompactRequest("fields must be a non-empty list")
+        unknown = [field for field in fields if field not in COLUMNS]
+        if unknown:
+            raise InvalidCompactRequest(f"Unknown fields: {', '.join(map(str, unknown))} (available: {', '.join(COLUMNS)})")
+
+    units = data.get('units', DEFAULT_UNITS)
+    if units not in UNITS:
+        raise InvalidCompactRequest(f"units must be one of: {', '.join(UNITS)}")
+    return units, fields
+
+
+def compact_forecast(forecast, units=DEFAULT_UNITS):
+    """예보 원본 JSON을 모든 열을 가진 compact 형식으로 변환"""
+    entries = forecast.get("list", [])
+    compact = {name: [column(entry, units) for entry in entries] for name, column in COLUMNS.items()}
+    compact["units"] = UNIT_LABELS[units]
+    compact["timezone"] = forecast.get("city", {}).get("timezone")
+    return compact
+
+
+def project(compact, fields):
+    """요청한 열만 남김 (units, timezone은 항상 포함)"""
+    result = {field: compact[field] for field in fields}
+    result["units"] = compact["units"]
+    result["timezone"] = compact["timezone"]
+    return result
+
+
+def compact_key(raw_key, units):
+    return f"{raw_key}:compact:{units}"
+
+
+def lookup_compact(cache, raw_key, units, ttl):
+    """
+    캐시된 compact 예보 (compact, age_seconds) 또는 None.
+    age는 원본 예보의 나이를 기준으로 하므로, 원본보다 늦게 만들어졌어도 원본과 같은 시점에 만료된다.
+    """
+    entry = cache.get_stale(compact_key(raw_key, units))
+    if entry is None:
+        return None
+    value, age = entry
+    age += value["raw_age"]
+    if age >= ttl:
+        return None
+    return value["forecast"], int(age)
+
+
+def store_compact(cache, raw_key, units, ttl, compact, raw_age):
+    cache.set(compact_key(raw_key, units), {"forecast": compact, "raw_age": raw_age}, max(ttl - raw_age, 1))
@@ -0,0 +1,255 @@
+# utils/gemini_gateway.py
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from utils.histogram import LatencyHistogram
+
+QUEUE_FULL = "queue_full"        # 대기열이 가득 참
+QUEUE_TIMEOUT = "queue_timeout"  # 대기 시간(deadline) 초과
+RATE_LIMITED = "rate_limited"    # 사용자별 호출 한도 초과
+
+
+class GatewayRejectedError(Exception):
+    """게이트웨이가 Gemini 호출을 받아들이지 않았을 때 발생"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Gemini gateway rejected request ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class GatewaySlot:
+    """실행 슬롯. release()는 여러 번 호출해도 한 번만 반납된다."""
+
+    def __init__(self, gateway, wait):
+        self._gateway = gateway
+        self._acquired_at = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+        self.wait = wait  # 대기열에서 기다린 시간 (초)
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._gateway._release(time.monotonic() - self._acquired_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class GeminiGateway:
+    """
+    모든 Gemini 호출 앞에 두는 게이트웨이.
+    - 동시에 실행되는 생성 요청을 max_concurrency 개로 제한
+    - 초과 요청은 최대 max_queue 개까지 queue_timeout 초 동안 대기, 대기열이 가득 차면 바로 거절
+    - 사용자별 토큰 버킷(초당 user_rate 개, 최대 user_burst 개)으로 호출 빈도 제한
+    """
+
+    def __init__(self, max_concurrency=8, max_queue=32, queue_timeout=10.0,
+                 user_rate=0.5, user_burst=5, max_users=10000):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._hold_avg = 1.0  # 슬롯 점유 시간 이동 평균 (Retry-After 추정용)
+        self._buckets = OrderedDict()  # user_key -> (남은 토큰, 갱신 시각)
+        self._async_waiters = deque()  # (이벤트 루프, future) - 슬롯을 기다리는 비동기 요청 (먼저 온 순서)
+
+        self.queue_wait = LatencyHistogram()
+        self.admitted = 0
+        self.peak_in_flight = 0
+        self.rejected = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0, RATE_LIMITED: 0}
+
+    def _estimate_retry_after(self):
+        # 잠금을 잡은 상태에서 호출: 앞선 요청들이 빠지는 데 걸릴 대략적인 시간
+        return max(1.0, self._hold_avg * (self._waiting + 1) / self.max_concurrency)
+
+    def check_rate(self, user_key):
+        """사용자별 토큰을 하나 소모합니다. 한도를 넘으면 GatewayRejectedError(RATE_LIMITED) 발생."""
+        if user_key is None or self.user_rate <= 0:
+            return
+        with self._cond:
+            now = time.monotonic()
+            bucket = self._buckets.pop(user_key, None)
+            if bucket is None:
+                tokens = float(self.user_burst)
+            else:
+                tokens = min(float(self.user_burst), bucket[0] + (now - bucket[1]) * self.user_rate)
+            if tokens < 1:
+                self._buckets[user_key] = (tokens, now)
+                self.rejected[RATE_LIMITED] += 1
+                raise GatewayRejectedError(RATE_LIMITED, (1 - tokens) / self.user_rate)
+            self._buckets[user_key] = (tokens - 1, now)
+            # 오래 사용하지 않은 사용자부터 정리 (버킷이 없으면 가득 찬 것으로 간주되므로 안전)
+            while len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+
+    def acquire(self, timeout=None):
+        """
+        실행 슬롯을 얻을 때까지 기다립니다 (최대 queue_timeout 초, timeout이 더 짧으면 timeout 초).
+        대기열이 가득 찼거나 시간이 초과되면 GatewayRejectedError 발생.
+        """
+        started = time.monotonic()
+        with self._cond:
+            if self._in_flight >= self.max_concurrency:
+                if self._waiting >= self.max_queue:
+                    self.rejected[QUEUE_FULL] += 1
+                    raise GatewayRejectedError(QUEUE_FULL, self._estimate_retry_after())
+                self._waiting += 1
+                deadline = started + (self.queue_timeout if timeout is None else min(timeout, self.queue_timeout))
+                try:
+                    while self._in_flight >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected[QUEUE_TIMEOUT] += 1
+                            raise GatewayRejectedError(QUEUE_TIMEOUT, self._estimate_retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._admit()
+        wait = time.monotonic() - started
+        self.queue_wait.observe(wait)
+        return GatewaySlot(self, wait)
+
+    def _admit(self):
+        # 잠금을 잡은 상태에서 호출
+        self._in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+
+    async def acquire_async(self, timeout=None):
+        """
+        acquire()의 비동기 버전 (ASGI 모드).
+        슬롯이 없으면 대기열에 future를 등록하고, 슬롯이 반납될 때 깨어날 때까지 이벤트 루프를 막지 않고 기다린다.
+        """
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._in_flight < self.max_concurrency:
+                self._admit()
+                self.queue_wait.observe(0.0)
+                return GatewaySlot(self, 0.0)
+            if self._waiting >= self.max_queue:
+                self.rejected[QUEUE_FULL] += 1
+                raise GatewayRejectedError(QUEUE_FULL, self._estimate_retry_after())
+            self._waiting += 1
+        deadline = started + (self.queue_timeout if timeout is None else min(timeout, self.queue_timeout))
+        try:
+            while True:
+                with self._cond:
+                    if self._in_flight < self.max_concurrency:
+                        self._admit()
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected[QUEUE_TIMEOUT] += 1
+                        raise GatewayRejectedError(QUEUE_TIMEOUT, self._estimate_retry_after())
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await asyncio.wait((waiter,), timeout=remaining)
+                except BaseException:
+                    self._abandon_async_waiter(loop, waiter)
+                    raise
+                if not waiter.done():
+                    # 시간 초과: 다시 확인하고, 그래도 슬롯이 없으면 위에서 QUEUE_TIMEOUT으로 거절
+                    self._abandon_async_waiter(loop, waiter)
+        finally:
+            with self._cond:
+                self._waiting -= 1
+        wait = time.monotonic() - started
+        self.queue_wait.observe(wait)
+        return GatewaySlot(self, wait)
+
+    def _abandon_async_waiter(self, loop, waiter):
+        # 시간 초과/취소된 대기자 정리: 아직 대기열에 있으면 빼고,
+        # 이미 깨워진 뒤라면 받은 차례를 다음 대기자에게 넘김 (반납 알림이 사라지지 않도록)
+        with self._cond:
+            try:
+                self._async_waiters.remove((loop, waiter))
+                return
+            except ValueError:
+                pass
+            # 깨우기 예약만 된 상태면 future를 취소해 _deliver_wakeup이 다음 대기자에게 넘기도록 하고,
+            # 이미 깨워졌으면 여기서 넘김
+            if not waiter.cancel():
+                self._wake_async_waiter()
+
+    def _wake_async_waiter(self):
+        # 잠금을 잡은 상태에서 호출: 가장 오래 기다린 비동기 대기자 하나를 해당 이벤트 루프에서 깨움
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(self._deliver_wakeup, waiter)
+                return
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫혔으면 다음 대기자
+                continue
+
+    def _deliver_wakeup(self, waiter):
+        # 대기자의 이벤트 루프에서 실행: 그 사이 대기자가 포기했으면(시간 초과/취소) 다음 대기자에게 넘김
+        if not waiter.done():
+            waiter.set_result(None)
+            return
+        with self._cond:
+            self._wake_async_waiter()
+
+    def _release(self, held):
+        with self._cond:
+            self._in_flight -= 1
+            self._hold_avg = self._hold_avg * 0.8 + held * 0.2
+            self._cond.notify()
+            self._wake_async_waiter()
+
+    def call(self, fn, user_key=None):
+        """사용자 한도 확인 → 슬롯 획득 → fn() 실행 → 슬롯 반납"""
+        self.check_rate(user_key)
+        with self.acquire():
+            return fn()
+
+    def stats(self):
+        with self._cond:
+            summary = {
+                "in_flight": self._in_flight,
+                "queued": self._waiting,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "peak_in_flight": self.peak_in_flight,
+                "rejected": dict(self.rejected),
+                "tracked_users": len(self._buckets),
+            }
+        snapshot = self.queue_wait.snapshot()
+        summary["queue_wait"] = {
+            "count": snapshot["count"],
+            "avg_ms": round(snapshot["sum"] / snapshot["count"] * 1000, 2) if snapshot["count"] else 0.0,
+            "p50": self.queue_wait.quantile(0.5),
+            "p95": self.queue_wait.quantile(0.95),
+            "p99": self.queue_wait.quantile(0.99),
+        }
+        return summary
+
+
+# 앱 전체에서 공유하는 Gemini 게이트웨이 (chat, weather 블루프린트가 함께 사용)
+gemini_gateway = GeminiGateway(
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", 8)),
+    max_queue=int(os.getenv("GEMINI_MAX_QUEUE", 32)),
+    queue_timeout=float(os.getenv("GEMINI_QUEUE_TIMEOUT", 10)),
+    user_rate=float(os.getenv("GEMINI_USER_RATE", 0.5)),  # 사용자당 초당 허용 호출 수 (0이면 제한 없음)
+    user_burst=int(os.getenv("GEMINI_USER_BURST", 5)),
+)
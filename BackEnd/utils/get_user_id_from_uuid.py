@@ -1,11 +1,74 @@
+import os
+
+from utils.ttl_cache import LRUTTLCache
+
+# uuid -> user_id 세션 캐시 (같은 앱 세션의 반복 요청은 DB 조회 없이 처리)
+# 로그아웃 시 invalidate_user_uuid로 즉시 제거되며, 다른 프로세스에서는 TTL이 지나면 반영된다.
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 10000))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 300))  # 초, 0이면 캐시 미사용
+
+session_cache = LRUTTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+# 만료되지 않은 세션만 조회 (expires_at이 NULL이면 만료 없음)
+# seconds_left: 만료까지 남은 시간 - 캐시가 세션 만료 시각을 넘겨 값을 들고 있지 않도록 캐시 TTL을 제한하는 데 사용
+SESSION_LOOKUP_SQL = (
+    "SELECT user_id, TIMESTAMPDIFF(SECOND, NOW(), expires_at) AS seconds_left "
+    "FROM logins WHERE uuid = %s AND (expires_at IS NULL OR expires_at > NOW())"
+)
+
+def cache_session(user_uuid, row):
+    if SESSION_CACHE_TTL <= 0:
+        return
+    seconds_left = row['seconds_left']
+    ttl = SESSION_CACHE_TTL if seconds_left is None else min(SESSION_CACHE_TTL, seconds_left)
+    if ttl > 0:
+        session_cache.set(user_uuid, row['user_id'], ttl)
+
 # 공통 유효성 검사 함수
 def get_user_id_from_uuid(user_uuid, connection):
-    """주어진 user_uuid로 사용자 ID를 조회합니다."""
+    """주어진 user_uuid로 사용자 ID를 조회합니다. (만료된 세션이면 None)"""
     try:
+        user_uuid = user_uuid.strip()
+        if SESSION_CACHE_TTL > 0:
+            user_id = session_cache.get(user_uuid)
+            if user_id is not None:
+                return user_id
+
         with connection.cursor() as cursor:
-            cursor.execute("SELECT user_id FROM logins WHERE uuid = %s", (user_uuid.strip(),))
+            cursor.execute(SESSION_LOOKUP_SQL, (user_uuid,))
             result = cursor.fetchone()
-            return result['user_id'] if result else None
+            if not result:
+                return None
+            cache_session(user_uuid, result)
+            return result['user_id']
     except Exception as e:
         print(f"Error in get_user_id_from_uuid: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+async def get_user_id_from_uuid_async(user_uuid, connection):
+    """get_user_id_from_uuid의 비동기 버전 (ASGI 모드, aiomysql 커넥션 사용)"""
+    try:
+        user_uuid = user_uuid.strip()
+        if SESSION_CACHE_TTL > 0:
+            user_id = session_cache.get(user_uuid)
+            if user_id is not None:
+                return user_id
+
+        async with connection.cursor() as cursor:
+            await cursor.execute(SESSION_LOOKUP_SQL, (user_uuid,))
+            result = await cursor.fetchone()
+            if not result:
+                return None
+            cache_session(user_uuid, result)
+            return result['user_id']
+    except Exception as e:
+        print(f"Error in get_user_id_from_uuid_async: {str(e)}")
+        return None
+
+def invalidate_user_uuid(user_uuid):
+    """로그아웃 등으로 더 이상 유효하지 않은 uuid를 캐시에서 제거합니다."""
+    session_cache.delete(user_uuid.strip())
+
+def session_cache_stats():
+    """세션 캐시 hit/miss 통계"""
+    return session_cache.stats()
@@ -0,0 +1,50 @@
+# utils/histogram.py
+
+import bisect
+import threading
+
+# 기본 지연 시간 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LatencyHistogram:
+    """누적 구간(bucket) 방식의 지연 시간 히스토그램 (스레드 안전)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def snapshot(self):
+        """{"buckets": [(상한, 누적 개수), ...], "sum": 초, "count": 개수}"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, value in zip(self.buckets + (float("inf"),), counts):
+            running += value
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+    def quantile(self, q):
+        """
+        구간 상한 기준 분위수 근사치 (초). 관측값이 없으면 None.
+        가장 큰 구간보다 느린 값은 가장 큰 유한 상한으로 표시한다 (inf는 JSON으로 직렬화할 수 없음, "이 값 이상"으로 해석).
+        """
+        snapshot = self.snapshot()
+        if not snapshot["count"]:
+            return None
+        target = q * snapshot["count"]
+        for bound, cumulative in snapshot["buckets"]:
+            if cumulative >= target:
+                break
+        return min(bound, self.buckets[-1])
@@ -0,0 +1,92 @@
+# utils/model_registry.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+import google.generativeai as genai
+
+# 프롬프트 파일 첫 줄에 <!-- version: 2024-11-21 --> 처럼 버전을 적을 수 있다 (모델에는 전달되지 않음)
+_VERSION_TAG = re.compile(r"^\s*<!--\s*version:\s*(?P<version>[^\s]+)\s*-->\s*\n?")
+
+
+class PromptRegistry:
+    """
+    시스템 프롬프트 파일과 그 프롬프트로 설정된 GenerativeModel 객체를 캐시한다.
+    - 파일은 처음 사용할 때 한 번 읽고, 이후에는 reload_interval 초마다 mtime만 확인해 바뀐 경우에만 다시 읽는다.
+    - 프롬프트 버전은 파일의 version 태그, 없으면 내용 해시 앞 8자리.
+    - 모델 객체는 (프롬프트 이름, 모델 이름)별로 캐시하며 프롬프트가 바뀌면 새로 만든다.
+    """
+
+    def __init__(self, reload_interval=2.0):
+        self.reload_interval = reload_interval
+        self._paths = {}
+        self._prompts = {}  # name -> {"text", "version", "mtime", "checked_at"}
+        self._models = {}   # (name, model_name) -> (version, model)
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def register(self, name, path):
+        with self._lock:
+            self._paths[name] = path
+
+    def _load(self, name):
+        path = self._paths[name]
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        match = _VERSION_TAG.match(text)
+        if match:
+            version = match.group('version')
+            text = text[match.end():]
+        else:
+            version = hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]
+        return {"text": text, "version": version, "mtime": mtime, "checked_at": time.monotonic()}
+
+    def get_prompt(self, name):
+        """(prompt_text, version)"""
+        with self._lock:
+            prompt = self._prompts.get(name)
+            now = time.monotonic()
+            if prompt is None:
+                prompt = self._prompts[name] = self._load(name)
+            elif now - prompt['checked_at'] >= self.reload_interval:
+                prompt['checked_at'] = now
+                if os.stat(self._paths[name]).st_mtime != prompt['mtime']:
+                    prompt = self._prompts[name] = self._load(name)
+                    self.reloads += 1
+                    print(f"Reloaded prompt '{name}' (version {prompt['version']})")
+            return prompt['text'], prompt['version']
+
+    def get_model(self, name, model_name):
+        """
+        프롬프트 name을 system_instruction으로 설정한 모델 객체와 프롬프트 버전을 반환합니다.
+        name이 None이면 시스템 프롬프트 없는 모델을 반환합니다.
+        """
+        if name is None:
+            text, version = None, None
+        else:
+            text, version = self.get_prompt(name)
+        key = (name, model_name)
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1], version
+        if text is None:
+            model = genai.GenerativeModel(model_name=model_name)
+        else:
+            model = genai.GenerativeModel(model_name=model_name, system_instruction=text)
+        with self._lock:
+            self._models[key] = (version, model)
+        return model, version
+
+    def versions(self):
+        """현재 적용 중인 프롬프트 버전 목록"""
+        with self._lock:
+            return {name: prompt['version'] for name, prompt in self._prompts.items()}
+
+
+# 앱 전체에서 공유하는 프롬프트/모델 레지스트리
+prompt_registry = PromptRegistry(reload_interval=float(os.getenv("PROMPT_RELOAD_INTERVAL", 2)))
@@ -0,0 +1,151 @@
+# utils/pagination.py
+
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+
+import pymysql
+
+# 목록 API 한 페이지의 기본/최대 행 수
+# (limit과 cursor를 모두 보내지 않은 기존 클라이언트에는 페이지를 나누지 않고 전체 목록을 반환)
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", 50))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 200))
+# limit 없이 전체를 조회할 때 한 번에 읽어 변환하는 행 수
+PAGE_FETCH_BATCH_SIZE = int(os.getenv("PAGE_FETCH_BATCH_SIZE", 500))
+
+# 목록 종류별 조회 대상: kind → (columns, table, where, sort_column, id_column)
+# where는 사용자 조건 하나이며, (where 컬럼, sort_column) 인덱스로 페이지를 찾는다 (db/migrate.py check에서 확인)
+LIST_QUERIES = {
+    'chats': ("chat_id, chat_uuid, created_at, last_message_at", "chats", "user_id = %s", "last_message_at", "chat_id"),
+    'actions': ("id, action_id, doing_action, time", "UserActions", "user_id = %s", "time", "id"),
+    'challenges': ("id, challenge_id, created_at", "ChallengeList", "user_id = %s", "created_at", "id"),
+}
+
+
+class InvalidPageRequest(ValueError):
+    """limit, cursor, since/until 파라미터가 잘못되었을 때 발생"""
+
+
+def encode_cursor(kind, sort_value, row_id):
+    """마지막으로 반환한 행의 (정렬 값, id)를 클라이언트에 넘길 불투명한 문자열로 변환"""
+    payload = json.dumps([kind, str(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(kind, cursor):
+    """encode_cursor의 역변환. 다른 목록의 커서이거나 형식이 틀리면 InvalidPageRequest"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_kind, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError, AttributeError):
+        raise InvalidPageRequest("Malformed 'cursor'")
+    if cursor_kind != kind or not isinstance(row_id, int):
+        raise InvalidPageRequest("Malformed 'cursor'")
+    return sort_value, row_id
+
+
+def parse_time_filter(data, name):
+    """'2024-11-01' 또는 '2024-11-01 12:00:00' 형식의 시각을 DB 비교용 문자열로 변환"""
+    value = data.get(name)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise InvalidPageRequest(f"Invalid '{name}' (expected YYYY-MM-DD[ HH:MM:SS])")
+    if parsed.tzinfo is not None:
+        # TIMESTAMP 컬럼은 DB 세션 시간대 기준으로 비교되므로 시간대가 붙은 값은 받지 않음
+        raise InvalidPageRequest(f"Invalid '{name}' (timezone offsets are not supported)")
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class PageRequest:
+    """
+    목록 API의 페이지 요청 (최신순 keyset 페이지네이션)
+    - limit: 페이지 크기 (cursor만 보내면 PAGE_DEFAULT_LIMIT, 최대 PAGE_MAX_LIMIT)
+    - cursor: 이전 응답의 next_cursor (없으면 첫 페이지)
+    - since/until: 정렬 컬럼 기준 시간 범위 [since, until)
+    limit과 cursor가 모두 없으면 limit은 None이고, 페이지를 나누지 않고 전체를 조회한다 (기존 API 동작).
+    """
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        cursor = data.get('cursor')
+        if cursor is not None and not isinstance(cursor, str):
+            raise InvalidPageRequest("Malformed 'cursor'")
+        self.after = decode_cursor(kind, cursor) if cursor else None
+        self.since = parse_time_filter(data, 'since')
+        self.until = parse_time_filter(data, 'until')
+
+        if 'limit' not in data and self.after is None:
+            self.limit = None
+            return
+        limit = data.get('limit', PAGE_DEFAULT_LIMIT)
+        if isinstance(limit, bool) or not isinstance(limit, (int, str)) or not str(limit).isdigit():
+            raise InvalidPageRequest("'limit' must be a positive integer")
+        self.limit = int(limit)
+        if not 1 <= self.limit <= PAGE_MAX_LIMIT:
+            raise InvalidPageRequest(f"'limit' must be between 1 and {PAGE_MAX_LIMIT}")
+
+    def query(self, columns, table, where, params, sort_column, id_column):
+        """
+        (sort_column DESC, id_column DESC) 순서로 이 페이지를 조회하는 SQL과 파라미터를 반환합니다.
+        OFFSET 대신 마지막 행의 (정렬 값, id) 뒤부터 읽으므로 뒤쪽 페이지도 (where 컬럼, sort_column) 인덱스로 바로 찾는다.
+        다음 페이지 존재 여부를 알기 위해 limit + 1 행을 요청한다 (limit이 None이면 LIMIT 없이 전체).
+        """
+        conditions, values = [where], list(params)
+        if self.since is not None:
+            conditions.append(f"{sort_column} >= %s")
+            values.append(self.since)
+        if self.until is not None:
+            conditions.append(f"{sort_column} < %s")
+            values.append(self.until)
+        if self.after is not None:
+            sort_value, row_id = self.after
+            conditions.append(f"({sort_column} < %s OR ({sort_column} = %s AND {id_column} < %s))")
+            values.extend([sort_value, sort_value, row_id])
+        sql = (
+            f"SELECT {columns} FROM {table} WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {sort_column} DESC, {id_column} DESC"
+        )
+        if self.limit is not None:
+            sql += " LIMIT %s"
+            values.append(self.limit + 1)
+        return sql, tuple(values)
+
+    def list_query(self, params):
+        """LIST_QUERIES에 정의된 이 목록 종류의 페이지 조회 SQL과 파라미터 (params: where의 값)"""
+        columns, table, where, sort_column, id_column = LIST_QUERIES[self.kind]
+        return self.query(columns, table, where, params, sort_column, id_column)
+
+    def cursor(self, connection):
+        """
+        이 페이지를 읽을 커서.
+        기본 커서는 결과 전체를 클라이언트 메모리에 받아 두므로 LIMIT이 있는 페이지에만 사용하고,
+        limit이 없는 전체 조회는 서버 측 커서(SSDictCursor)로 읽는다.
+        """
+        if self.limit is None:
+            return connection.cursor(pymysql.cursors.SSDictCursor)
+        return connection.cursor()
+
+    def fetch(self, cursor, sort_key, id_key, to_item):
+        """
+        query()로 실행한 커서의 결과를 (items, next_cursor)로 반환합니다.
+        limit + 1번째 행이 있으면 마지막으로 반환한 행 기준의 next_cursor를 만들고, 없으면 None.
+        limit이 없으면 PAGE_FETCH_BATCH_SIZE 행씩 읽어 바로 변환한다 (원본 행 전체를 한꺼번에 들고 있지 않음).
+        """
+        if self.limit is None:
+            items = []
+            while True:
+                rows = cursor.fetchmany(PAGE_FETCH_BATCH_SIZE)
+                if not rows:
+                    return items, None
+                items.extend(to_item(row) for row in rows)
+
+        rows = cursor.fetchall()
+        if len(rows) <= self.limit:
+            return [to_item(row) for row in rows], None
+        last_row = rows[self.limit - 1]
+        return [to_item(row) for row in rows[:self.limit]], encode_cursor(self.kind, last_row[sort_key], last_row[id_key])
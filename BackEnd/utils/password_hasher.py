@@ -0,0 +1,120 @@
+# utils/password_hasher.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+from utils.histogram import LatencyHistogram
+
+
+class HasherBusyError(Exception):
+    """비밀번호 작업 대기열이 가득 찼거나 제한 시간 안에 끝나지 않았을 때 발생"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Password hasher is busy, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    bcrypt 해싱/검증을 전용 워커 스레드 풀에서 실행한다.
+    - bcrypt는 계산 중 GIL을 놓으므로 스레드로도 여러 코어를 사용하며, 워커 수로 CPU 사용량을 제한한다.
+    - 실행 중 + 대기 중 작업이 workers + max_queue 개를 넘으면 바로 거절 (로그인 폭주 시 다른 요청 보호)
+    - rounds(비용)가 바뀌면 로그인 시 needs_rehash()로 이전 비용의 해시를 찾아 다시 해싱할 수 있다.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_queue=32, timeout=10.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.queue_wait = LatencyHistogram()
+        self.duration = LatencyHistogram()
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _estimate_retry_after(self):
+        # 잠금을 잡은 상태에서 호출
+        snapshot = self.duration.snapshot()
+        average = snapshot["sum"] / snapshot["count"] if snapshot["count"] else 0.25
+        return max(1.0, average * self._pending / self.workers)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusyError(self._estimate_retry_after())
+            self._pending += 1
+        submitted = time.monotonic()
+
+        def task():
+            started = time.monotonic()
+            self.queue_wait.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.duration.observe(time.monotonic() - started)
+                with self._lock:
+                    self._pending -= 1
+                    self.completed += 1
+
+        future = self._executor.submit(task)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+                retry_after = self._estimate_retry_after()
+            raise HasherBusyError(retry_after)
+
+    def hash(self, password):
+        """비밀번호를 현재 비용(rounds)의 bcrypt 해시로 변환"""
+        return self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)))
+
+    def verify(self, hashed_password, password):
+        """해시된 비밀번호와 입력된 비밀번호를 검증"""
+        return self._run(lambda: bcrypt.checkpw(password.encode('utf-8'), hashed_password))
+
+    def needs_rehash(self, hashed_password):
+        """저장된 해시의 비용이 현재 설정과 다르면 True ($2b$<rounds>$...)"""
+        try:
+            return int(hashed_password.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self):
+        with self._lock:
+            summary = {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+        for name, histogram in (("queue_wait", self.queue_wait), ("duration", self.duration)):
+            summary[name] = {
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+        return summary
+
+
+# 앱 전체에서 공유하는 비밀번호 해셔
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_ROUNDS", 12)),
+    workers=int(os.getenv("BCRYPT_WORKERS", min(4, os.cpu_count() or 1))),
+    max_queue=int(os.getenv("BCRYPT_MAX_QUEUE", 32)),
+    timeout=float(os.getenv("BCRYPT_TIMEOUT", 10)),  # 초
+)
@@ -0,0 +1,252 @@
+# utils/request_metrics.py
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+
+from utils.histogram import LatencyHistogram
+
+# 이 시간(ms)보다 오래 걸린 요청은 구간별 시간을 로그로 남김 (0이면 기록하지 않음)
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 0))
+
+# 구간 이름
+PHASE_DB_CHECKOUT = "db_checkout"    # 커넥션 풀에서 커넥션을 받을 때까지 대기
+PHASE_SQL = "sql"                    # SQL 문 실행 (문장마다 한 번씩 집계)
+PHASE_UPSTREAM_HTTP = "upstream_http"  # 외부 HTTP API 호출 (재시도 포함 시도마다)
+PHASE_GEMINI_QUEUE = "gemini_queue"  # Gemini 게이트웨이 슬롯 대기
+PHASE_GEMINI = "gemini"              # Gemini 응답 생성 (스트리밍은 마지막 토큰까지)
+PHASE_CHAT_HISTORY = "chat_history"  # 채팅 히스토리 구성 (요약 생성 포함)
+PHASE_SERIALIZE = "serialize"        # 응답 JSON 직렬화
+
+# 요청별 구간 시간은 WSGI environ에 둠 (stream_with_context 생성기는 새 앱 컨텍스트(g)에서 실행되지만 environ은 같음)
+PHASES_KEY = "kano.request_phases"
+STARTED_KEY = "kano.request_started"
+STATUS_KEY = "kano.response_status"
+
+# 요청을 대신 처리하는 워커 스레드(요청 컨텍스트 없음)의 구간 시간 (worker_phases 참고)
+_worker = threading.local()
+
+
+class RequestMetrics:
+    """
+    라우트별 요청 수/전체 시간과, 요청 안의 구간(phase)별 시간을 히스토그램으로 모은다.
+    구간 시간은 요청마다 합산한 뒤 요청이 끝날 때 한 번 기록한다 (예: SQL 7번이면 7번의 합계 1건).
+    구간은 겹칠 수 있다 (chat_history 안의 gemini 요약 호출 등).
+    """
+
+    def __init__(self, slow_threshold_ms=0):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._requests = {}   # (method, route, status) -> count
+        self._durations = {}  # (method, route) -> LatencyHistogram
+        self._phases = {}     # (route, phase) -> [LatencyHistogram, 호출 수]
+        self._lock = threading.Lock()
+        self.slow_requests = 0
+
+    def _histogram(self, table, key):
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = LatencyHistogram()
+            return histogram
+
+    def observe_request(self, method, route, status, seconds, phases):
+        """phases: {구간 이름: [합계 초, 호출 수]}"""
+        with self._lock:
+            self._requests[(method, route, status)] = self._requests.get((method, route, status), 0) + 1
+        self._histogram(self._durations, (method, route)).observe(seconds)
+        for name, (total, calls) in phases.items():
+            with self._lock:
+                entry = self._phases.get((route, name))
+                if entry is None:
+                    entry = self._phases[(route, name)] = [LatencyHistogram(), 0]
+                entry[1] += calls
+            entry[0].observe(total)
+
+        if self.slow_threshold_ms and seconds * 1000 >= self.slow_threshold_ms:
+            with self._lock:
+                self.slow_requests += 1
+            breakdown = " ".join(
+                f"{name}={total * 1000:.1f}ms({calls})"
+                for name, (total, calls) in sorted(phases.items(), key=lambda item: -item[1][0])
+            )
+            print(f"[slow-request] {method} {route} {status} {seconds * 1000:.1f}ms {breakdown or '-'}")
+
+    def render(self, gauges=None):
+        """Prometheus 텍스트 형식 (gauges: {소스 이름: stats() 결과 dict}는 숫자 값만 gauge로 출력)"""
+        with self._lock:
+            requests_total = dict(self._requests)
+            durations = dict(self._durations)
+            phases = {key: (entry[0], entry[1]) for key, entry in self._phases.items()}
+            slow_requests = self.slow_requests
+
+        lines = [
+            "# HELP http_requests_total HTTP requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(requests_total.items()):
+            lines.append(f'http_requests_total{labels(method=method, route=route, status=status)} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Wall time per request.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(durations.items()):
+            lines += histogram_lines("http_request_duration_seconds", histogram, method=method, route=route)
+
+        lines += [
+            "# HELP http_request_phase_seconds Time spent in each phase, summed per request.",
+            "# TYPE http_request_phase_seconds histogram",
+        ]
+        for (route, phase), (histogram, _) in sorted(phases.items()):
+            lines += histogram_lines("http_request_phase_seconds", histogram, route=route, phase=phase)
+
+        lines += [
+            "# HELP http_request_phase_calls_total Number of timed operations in each phase.",
+            "# TYPE http_request_phase_calls_total counter",
+        ]
+        for (route, phase), (_, calls) in sorted(phases.items()):
+            lines.append(f'http_request_phase_calls_total{labels(route=route, phase=phase)} {calls}')
+
+        lines += [
+            "# HELP http_slow_requests_total Requests slower than SLOW_REQUEST_THRESHOLD_MS.",
+            "# TYPE http_slow_requests_total counter",
+            f"http_slow_requests_total {slow_requests}",
+        ]
+
+        for source, stats in (gauges or {}).items():
+            for name, value in flatten(stats, f"app_{source}"):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in values.items()) + "}"
+
+
+def histogram_lines(name, histogram, **label_values):
+    snapshot = histogram.snapshot()
+    lines = []
+    for bound, cumulative in snapshot["buckets"]:
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{labels(**label_values, le=le)} {cumulative}")
+    lines.append(f"{name}_sum{labels(**label_values)} {snapshot['sum']:.6f}")
+    lines.append(f"{name}_count{labels(**label_values)} {snapshot['count']}")
+    return lines
+
+
+def flatten(value, prefix):
+    """stats() dict의 숫자 값을 (메트릭 이름, 값) 목록으로 펼침 (문자열, None 등은 제외)"""
+    if isinstance(value, bool):
+        return [(prefix, int(value))]
+    if isinstance(value, (int, float)):
+        return [(prefix, value)]
+    if isinstance(value, dict):
+        items = []
+        for key, child in value.items():
+            items += flatten(child, f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', str(key))}")
+        return items
+    return []
+
+
+# 앱 전체에서 공유하는 요청 지표
+request_metrics = RequestMetrics(slow_threshold_ms=SLOW_REQUEST_THRESHOLD_MS)
+
+
+def observe_phase(name, seconds):
+    """현재 요청의 구간 시간에 더함 (요청 밖의 백그라운드 스레드에서는 worker_phases 안에서만 기록)"""
+    if has_request_context():
+        phases = request.environ.get(PHASES_KEY)
+    else:
+        phases = getattr(_worker, 'phases', None)
+    if phases is None:
+        return
+    entry = phases.get(name)
+    if entry is None:
+        phases[name] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def phase(name):
+    """with 블록의 실행 시간을 현재 요청의 name 구간에 더함"""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe_phase(name, time.monotonic() - started)
+
+
+@contextmanager
+def worker_phases(phases):
+    """
+    워커 스레드에서 with 블록 안의 구간 시간을 phases dict에 모음.
+    작업이 끝난 뒤 요청 스레드에서 merge_phases(phases)로 요청의 구간 시간에 합친다
+    (요청이 먼저 끝나 버려진 작업의 시간은 합치지 않음).
+    """
+    previous = getattr(_worker, 'phases', None)
+    _worker.phases = phases
+    try:
+        yield
+    finally:
+        _worker.phases = previous
+
+
+def merge_phases(phases):
+    """worker_phases로 모은 구간 시간을 현재 요청에 더함"""
+    if not has_request_context():
+        return
+    target = request.environ.get(PHASES_KEY)
+    if target is None:
+        return
+    for name, (total, calls) in phases.items():
+        entry = target.setdefault(name, [0.0, 0])
+        entry[0] += total
+        entry[1] += calls
+
+
+def init_request_metrics(app, pool=None):
+    """
+    요청 시작/끝 훅을 등록합니다.
+    스트리밍 응답은 teardown이 스트림보다 먼저 호출되므로, 응답이 닫힐 때(call_on_close) 기록한다.
+    pool: 커넥션 풀(ConnectionPool)이 주어지면 대여 대기 시간과 SQL 실행 시간을 구간으로 기록
+    """
+    if pool is not None and hasattr(pool, 'add_observer'):
+        pool.add_observer(lambda event, seconds: observe_phase(PHASE_DB_CHECKOUT if event == "checkout" else PHASE_SQL, seconds))
+
+    def recorder(status):
+        # 요청 컨텍스트가 끝난 뒤에도 호출할 수 있도록 필요한 값을 미리 꺼내 둠
+        started, phases = request.environ.pop(STARTED_KEY), request.environ[PHASES_KEY]
+        method = request.method
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        return lambda: request_metrics.observe_request(method, route, str(status), time.monotonic() - started, phases)
+
+    @app.before_request
+    def start_request_timer():
+        request.environ[STARTED_KEY] = time.monotonic()
+        request.environ[PHASES_KEY] = {}
+
+    @app.after_request
+    def record_streamed_request(response):
+        # 스트림 중의 구간 시간도 같은 phases dict에 더해지므로 닫힐 때 함께 기록됨
+        if response.is_streamed and STARTED_KEY in request.environ:
+            response.call_on_close(recorder(response.status_code))
+        else:
+            request.environ[STATUS_KEY] = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(error=None):
+        if STARTED_KEY not in request.environ:
+            return
+        recorder(500 if error is not None else request.environ.get(STATUS_KEY, 500))()
@@ -0,0 +1,267 @@
+# utils/request_profiler.py
+
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+
+# 요청 프로파일링 설정
+# - PROFILE_SAMPLE_RATE: 무작위로 프로파일링할 요청 비율 (0이면 표본 추출 안 함)
+# - PROFILE_ADMIN_TOKEN: X-Profile-Token 헤더가 이 값과 같으면 해당 요청을 프로파일링 (비어 있으면 헤더 요청과 조회 API 비활성화)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))  # 스택 표본 추출 간격
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 200))  # 보관할 요청별 프로파일 파일 수
+
+TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# 요청 정보는 WSGI environ에 둠 (스트리밍 응답은 응답이 닫힐 때 프로파일링을 끝냄)
+PROFILE_KEY = "kano.request_profile"
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def frame_stack(frame):
+    """프레임을 호출 순서(바깥 → 안쪽)의 collapsed 스택 문자열로 변환 ("파일:함수;파일:함수")"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(" ", "_").replace(";", "_"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def collapsed_text(stacks):
+    """flamegraph.pl, speedscope 등에서 읽을 수 있는 collapsed 형식 ("스택 표본수" 한 줄씩)"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """
+    등록된 스레드의 스택을 interval 초마다 읽어 표본을 모은다 (sys._current_frames 사용).
+    요청 스레드에 추적 함수(setprofile)를 걸지 않으므로 프로파일링 중인 요청의 오버헤드가 작고,
+    프로파일링 중인 요청이 없으면 표본 추출 스레드도 종료된다.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}  # 스레드 ID -> Counter (스택 -> 표본 수)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return stacks
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                targets = dict(self._active)
+            frames = sys._current_frames()
+            for thread_id, stacks in targets.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stacks[frame_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class RequestProfiler:
+    """
+    선택된 요청을 프로파일링해 요청 ID별 파일(PROFILE_DIR/<id>.collapsed)로 저장하고,
+    라우트별로 표본을 합산해 둔다.
+    """
+
+    def __init__(self, sample_rate=0.0, admin_token="", interval=0.005, directory=PROFILE_DIR, max_files=200):
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.directory = directory
+        self.max_files = max_files
+        self.sampler = StackSampler(interval)
+        self._routes = {}        # 라우트 -> Counter
+        self._recent = deque()   # 저장된 프로파일 정보 (오래된 순)
+        self._lock = threading.Lock()
+
+    def is_admin(self, token):
+        return bool(self.admin_token) and bool(token) and hmac.compare_digest(token, self.admin_token)
+
+    def should_profile(self, token):
+        if self.is_admin(token):
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def start(self, reason):
+        return {
+            "id": uuid.uuid4().hex,
+            "reason": reason,
+            "thread_id": threading.get_ident(),
+            "started": time.monotonic(),
+            "stacks": self.sampler.start(threading.get_ident()),
+        }
+
+    def current(self):
+        """현재 요청이 프로파일링 중이면 프로파일, 아니면 None"""
+        return request.environ.get(PROFILE_KEY) if has_request_context() else None
+
+    @contextmanager
+    def worker(self, samples):
+        """
+        요청을 대신 처리하는 워커 스레드의 스택도 표본 추출해 samples(Counter)에 모음.
+        작업이 끝난 뒤 요청 스레드에서 add_samples로 요청의 프로파일에 합친다.
+        """
+        thread_id = threading.get_ident()
+        self.sampler.start(thread_id)
+        try:
+            yield
+        finally:
+            samples.update(self.sampler.stop(thread_id))
+
+    def add_samples(self, profile, samples):
+        # 표본 추출 스레드가 쓰는 profile["stacks"]에 직접 더하지 않고, 끝날 때(finish) 합침
+        profile.setdefault("worker_stacks", []).append(samples)
+
+    def finish(self, profile, method, route, status):
+        self.sampler.stop(profile["thread_id"])
+        stacks = profile["stacks"]
+        for samples in profile.get("worker_stacks", ()):
+            stacks.update(samples)
+        info = {
+            "id": profile["id"],
+            "method": method,
+            "route": route,
+            "status": status,
+            "reason": profile["reason"],
+            "duration_ms": round((time.monotonic() - profile["started"]) * 1000, 1),
+            "samples": sum(stacks.values()),
+            "recorded_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(profile["id"]), "w", encoding="utf-8") as f:
+                f.write(collapsed_text(stacks))
+        except OSError as e:
+            print(f"[profiler] failed to save profile {profile['id']}: {e}")
+            return
+
+        expired = []
+        with self._lock:
+            self._routes.setdefault(route, Counter()).update(stacks)
+            self._recent.append(info)
+            while len(self._recent) > self.max_files:
+                expired.append(self._recent.popleft()["id"])
+        for profile_id in expired:
+            try:
+                os.remove(self._path(profile_id))
+            except OSError:
+                pass
+
+        print(f"[profiler] {method} {route} {status} id={info['id']} reason={info['reason']} "
+              f"duration_ms={info['duration_ms']} samples={info['samples']}")
+
+    def _path(self, profile_id):
+        return os.path.join(self.directory, f"{profile_id}.collapsed")
+
+    def load(self, profile_id):
+        """요청 ID의 collapsed 스택 (잘못된 ID거나 파일이 없으면 None)"""
+        if not PROFILE_ID_PATTERN.match(profile_id or ""):
+            return None
+        try:
+            with open(self._path(profile_id), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def route_stacks(self, route):
+        """라우트별로 합산한 collapsed 스택 (프로파일링된 요청이 없으면 None)"""
+        with self._lock:
+            stacks = self._routes.get(route)
+            return collapsed_text(stacks) if stacks is not None else None
+
+    def recent(self):
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "admin_enabled": bool(self.admin_token),
+                "stored": len(self._recent),
+                "routes": {route: sum(stacks.values()) for route, stacks in self._routes.items()},
+            }
+
+
+# 앱 전체에서 공유하는 요청 프로파일러
+request_profiler = RequestProfiler(
+    sample_rate=PROFILE_SAMPLE_RATE,
+    admin_token=PROFILE_ADMIN_TOKEN,
+    interval=PROFILE_INTERVAL_MS / 1000,
+    max_files=PROFILE_MAX_FILES,
+)
+
+
+def init_request_profiler(app, profiler=request_profiler):
+    """
+    요청 시작/끝 훅을 등록합니다.
+    프로파일링한 요청은 응답의 X-Profile-Id 헤더로 ID를 돌려준다.
+    """
+
+    @app.before_request
+    def start_profile():
+        # 프로파일 조회 API 자체는 프로파일링하지 않음
+        if request.path.startswith('/profiles'):
+            return
+        reason = profiler.should_profile(request.headers.get(TOKEN_HEADER))
+        if reason is not None:
+            request.environ[PROFILE_KEY] = profiler.start(reason)
+
+    def finisher(status):
+        profile = request.environ.pop(PROFILE_KEY)
+        method = request.method
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        return lambda: profiler.finish(profile, method, route, status)
+
+    @app.after_request
+    def attach_profile_id(response):
+        profile = request.environ.get(PROFILE_KEY)
+        if profile is None:
+            return response
+        response.headers[PROFILE_ID_HEADER] = profile["id"]
+        # 스트리밍 응답은 스트림이 끝날 때까지 프로파일링
+        if response.is_streamed:
+            response.call_on_close(finisher(response.status_code))
+        else:
+            request.environ[PROFILE_KEY]["status"] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(error=None):
+        profile = request.environ.get(PROFILE_KEY)
+        if profile is None:
+            return
+        finisher(500 if error is not None else profile.get("status", 500))()
@@ -2,11 +2,17 @@
 
 from flask import jsonify
 
-def create_response(status_code, message, data=None):
+from utils.request_metrics import phase, PHASE_SERIALIZE
+
+def create_response(status_code, message, data=None, headers=None):
     response = {
         "StatusCode": status_code,
         "message": message
     }
     if data is not None:
         response["data"] = data
-    return jsonify(response), status_code
+    with phase(PHASE_SERIALIZE):
+        body = jsonify(response)
+    if headers:
+        return body, status_code, headers
+    return body, status_code
@@ -0,0 +1,105 @@
+# utils/session_sweeper.py
+
+import atexit
+import os
+import threading
+import time
+
+from db_config import get_connection
+
+# 만료된 세션을 오래된 순서로 batch_size 행씩 삭제 (expires_at 인덱스 사용)
+DELETE_EXPIRED_SQL = "DELETE FROM logins WHERE expires_at < NOW() ORDER BY expires_at LIMIT %s"
+
+
+class SessionSweeper:
+    """
+    만료된 logins 행을 백그라운드에서 정리한다.
+    한 번에 batch_size 행만 지우고 바로 커밋하므로 잠금이 짧게 유지되며,
+    배치 사이에 pause 초씩 쉬어 로그인/조회 쿼리와 경쟁하지 않도록 한다.
+    """
+
+    def __init__(self, connection_factory, interval=300.0, batch_size=500, pause=0.05):
+        self._connection_factory = connection_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.runs = 0
+        self.removed = 0
+        self.failures = 0
+        self.last_removed = 0
+        self.last_run_ms = 0.0
+
+    def sweep(self):
+        """만료된 세션을 모두 지울 때까지 배치 단위로 삭제하고, 삭제한 행 수를 반환합니다."""
+        started = time.monotonic()
+        removed = 0
+        try:
+            with self._connection_factory() as connection:
+                while not self._stop.is_set():
+                    with connection.cursor() as cursor:
+                        cursor.execute(DELETE_EXPIRED_SQL, (self.batch_size,))
+                        deleted = cursor.rowcount
+                    connection.commit()
+                    removed += deleted
+                    if deleted < self.batch_size:
+                        break
+                    time.sleep(self.pause)
+        except Exception as e:
+            print(f"Error sweeping expired sessions: {str(e)}")
+            with self._lock:
+                self.failures += 1
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self.runs += 1
+            self.removed += removed
+            self.last_removed = removed
+            self.last_run_ms = round(elapsed_ms, 1)
+        if removed:
+            print(f"[session-sweeper] removed {removed} expired sessions in {elapsed_ms:.1f}ms")
+        return removed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sweep()
+
+    def start(self):
+        """백그라운드 정리 스레드 시작 (interval이 0 이하면 시작하지 않음)"""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "batch_size": self.batch_size,
+                "runs": self.runs,
+                "removed": self.removed,
+                "last_removed": self.last_removed,
+                "last_run_ms": self.last_run_ms,
+                "failures": self.failures,
+            }
+
+
+session_sweeper = SessionSweeper(
+    get_connection,
+    interval=float(os.getenv("SESSION_SWEEP_INTERVAL", 300)),  # 초, 0이면 백그라운드 정리 안 함
+    batch_size=int(os.getenv("SESSION_SWEEP_BATCH_SIZE", 500)),
+)
+
+# 프로세스 종료 시 정리 스레드 중지
+atexit.register(session_sweeper.stop)
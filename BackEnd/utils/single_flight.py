@@ -0,0 +1,114 @@
+# utils/single_flight.py
+
+import asyncio
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나로 합친다.
+    먼저 들어온 호출만 실제로 fn()을 실행하고, 실행 중에 들어온 호출들은 그 결과(또는 예외)를 함께 받는다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight의 비동기 버전 (ASGI 모드, 하나의 이벤트 루프 안에서 사용).
+    먼저 들어온 코루틴만 await fn()을 실행하고, 나머지는 같은 Future를 기다린다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # 한 요청이 취소되어도 공유 Future가 취소되지 않도록 shield
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executions += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
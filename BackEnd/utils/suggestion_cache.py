@@ -0,0 +1,191 @@
+# utils/suggestion_cache.py
+
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# /weather/gensentence 결과 캐시
+# 추천 문구는 대략적인 날씨 상황에만 좌우되므로, 입력을 거친 구간(band)으로 줄인 지문(fingerprint)을 키로 쓴다.
+# 키마다 몇 개의 문구를 모아 두고 그중 하나를 골라 돌려주어 사용자가 매번 같은 문장만 보지 않도록 한다.
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+PRECIPITATION = {"rain", "drizzle", "thunderstorm", "snow"}
+
+def _number(value):
+    """'11.3°C', '39.26µg/m³' 같은 문자열에서 숫자만 추출합니다."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group()) if match else None
+
+def _condition(value):
+    return str(value or "unknown").strip().lower().replace(" ", "_")
+
+def _hour_condition(hour):
+    weather = hour.get('weather')
+    if isinstance(weather, list):  # OpenWeatherMap 원본 형식
+        weather = weather[0].get('main') if weather else None
+    return _condition(weather)
+
+def temperature_band(celsius):
+    if celsius is None:
+        return "unknown"
+    if celsius < 0:
+        return "freezing"
+    if celsius < 10:
+        return "cold"
+    if celsius < 20:
+        return "mild"
+    if celsius < 28:
+        return "warm"
+    return "hot"
+
+def aqi_band(pm10, pm2_5):
+    """환경부 미세먼지 예보 등급 기준 (PM10/PM2.5 중 나쁜 쪽)"""
+    levels = ["good", "moderate", "bad", "very_bad"]
+    grades = []
+    if pm10 is not None:
+        grades.append(0 if pm10 <= 30 else 1 if pm10 <= 80 else 2 if pm10 <= 150 else 3)
+    if pm2_5 is not None:
+        grades.append(0 if pm2_5 <= 15 else 1 if pm2_5 <= 35 else 2 if pm2_5 <= 75 else 3)
+    return levels[max(grades)] if grades else "unknown"
+
+def time_of_day_band(date_text):
+    try:
+        hour = datetime.strptime(str(date_text)[:19], "%Y-%m-%d %H:%M:%S").hour
+    except ValueError:
+        hour = datetime.now().hour
+    if 5 <= hour < 11:
+        return "morning"
+    if 11 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 21:
+        return "evening"
+    return "night"
+
+def _celsius_text(kelvin):
+    return f"{kelvin - 273.15:.1f}°C" if isinstance(kelvin, (int, float)) else None
+
+def _main_condition(entry):
+    weather = entry.get('weather') or [{}]
+    main = weather[0].get('main')
+    return main.lower().replace(" ", "_") if main else None
+
+def gensentence_payload(weather, air, forecast, now=None):
+    """
+    OpenWeatherMap 원본 응답(현재 날씨, 대기질, 5일/3시간 예보)을
+    앱이 /weather/gensentence로 보내는 data와 같은 형식으로 변환합니다 (FrontEnd/pages/weather_page.js, weather_prompt.md).
+    date는 해당 위치의 현지 시각 (현재 날씨의 timezone 초 단위 오프셋 기준).
+    """
+    now = now if now is not None else time.time()
+    components = ((air or {}).get('list') or [{}])[0].get('components') or {}
+    pm10, pm2_5 = components.get('pm10'), components.get('pm2_5')
+    return {
+        "date": datetime.fromtimestamp(now + (weather.get('timezone') or 0), timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "current_temp": _celsius_text((weather.get('main') or {}).get('temp')),
+        "current_weather": _main_condition(weather),
+        "current_wind": f"{(weather.get('wind') or {}).get('speed')}m/s",
+        "current_pm10": f"{pm10}µg/m³" if pm10 is not None else None,
+        "current_pm2_5": f"{pm2_5}µg/m³" if pm2_5 is not None else None,
+        "3hourly_weather": [
+            {
+                "time": str(hour.get('dt_txt', ''))[11:16],
+                "temp": _celsius_text((hour.get('main') or {}).get('temp')),
+                "weather": _main_condition(hour),
+            }
+            for hour in ((forecast or {}).get('list') or [])[:8]
+        ],
+    }
+
+def weather_fingerprint(weather_data):
+    """
+    gensentence 입력을 정규화된 지문 문자열로 변환합니다.
+    (현재 날씨 상태 + 이후 강수 여부, 기온 구간, 미세먼지 구간, 시간대 구간)
+    """
+    if not isinstance(weather_data, dict):
+        # 형식을 알 수 없는 입력은 원문 그대로를 키로 사용
+        return f"raw:{weather_data}"
+
+    condition = _condition(weather_data.get('current_weather'))
+    upcoming = {_hour_condition(hour) for hour in weather_data.get('3hourly_weather') or [] if isinstance(hour, dict)}
+    if condition not in PRECIPITATION and upcoming & PRECIPITATION:
+        condition += "+precip_later"
+
+    return "|".join([
+        condition,
+        temperature_band(_number(weather_data.get('current_temp'))),
+        aqi_band(_number(weather_data.get('current_pm10')), _number(weather_data.get('current_pm2_5'))),
+        time_of_day_band(weather_data.get('date')),
+    ])
+
+
+class SuggestionCache:
+    """지문별로 최대 variants 개의 문구를 ttl 동안 보관하는 LRU 캐시"""
+
+    def __init__(self, maxsize=1024, ttl=10800, variants=3):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.variants = variants
+        self._data = OrderedDict()  # key -> (suggestions, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            entry = None
+        return entry
+
+    def get(self, key):
+        """보관 중인 문구 목록의 복사본 (없으면 빈 목록)"""
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return []
+            self._data.move_to_end(key)
+            return list(entry[0])
+
+    def lookup(self, key, allow_partial=False):
+        """
+        문구가 variants 개 모두 모였으면 그중 하나를 무작위로 반환합니다.
+        allow_partial이면 하나라도 있을 때 반환합니다. 반환할 문구가 없으면 None.
+        """
+        suggestions = self.get(key)
+        served = len(suggestions) >= self.variants or (allow_partial and suggestions)
+        with self._lock:
+            if served:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return dict(random.choice(suggestions)) if served else None
+
+    def add(self, key, suggestion):
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                # 처음 저장한 시점부터 ttl 동안 유지
+                entry = ([], time.monotonic() + self.ttl)
+                self._data[key] = entry
+            if len(entry[0]) < self.variants and suggestion not in entry[0]:
+                entry[0].append(suggestion)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "variants": self.variants,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,87 @@
+# utils/ttl_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class LRUTTLCache:
+    """
+    스레드 안전한 LRU + TTL 메모리 캐시.
+    - maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    - ttl(초)이 지난 항목은 조회 시 만료 처리
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, stored_at, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_with_age(self, key):
+        """(value, 저장 후 경과 초)를 반환합니다. 없거나 만료되었으면 None."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            now = time.monotonic()
+            if entry is _MISSING or entry[2] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0], now - entry[1]
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, now, now + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
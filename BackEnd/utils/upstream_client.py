@@ -0,0 +1,108 @@
+# utils/upstream_client.py
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.histogram import LatencyHistogram
+from utils.request_metrics import observe_phase, PHASE_UPSTREAM_HTTP
+
+# 재시도할 가치가 있는 응답 코드 (일시적인 오류)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UpstreamClient:
+    """
+    외부 HTTP API 공용 클라이언트.
+    - requests.Session 하나를 공유하여 keep-alive 커넥션(및 TLS 세션)을 재사용
+    - 엔드포인트별 (connect, read) 타임아웃
+    - 연결 오류/타임아웃/일시적 오류 코드에 대해 지수 백오프 + 지터로 제한된 횟수만큼 재시도
+    - 엔드포인트별 지연 시간 히스토그램
+    Session의 커넥션 풀(urllib3)은 스레드 안전하므로 여러 요청 스레드에서 함께 사용한다.
+    """
+
+    def __init__(self, name, timeouts=None, default_timeout=(3.05, 10), max_retries=2,
+                 backoff_base=0.2, backoff_max=2.0, pool_maxsize=20):
+        self.name = name
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def _histogram(self, endpoint):
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            return histogram
+
+    def _backoff(self, attempt):
+        # full jitter: 0 ~ min(max, base * 2^attempt) 사이에서 무작위 대기
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, endpoint, url, params=None):
+        """
+        GET 요청. 일시적 오류는 max_retries 번까지 재시도하며,
+        재시도 후에도 연결 오류/타임아웃이면 requests 예외를 그대로 던진다.
+        """
+        timeout = self.timeouts.get(endpoint, self.default_timeout)
+        histogram = self._histogram(endpoint)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                histogram.observe(time.monotonic() - started)
+                observe_phase(PHASE_UPSTREAM_HTTP, time.monotonic() - started)
+                with self._lock:
+                    self.requests += 1
+                    self.errors += 1
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                histogram.observe(time.monotonic() - started)
+                observe_phase(PHASE_UPSTREAM_HTTP, time.monotonic() - started)
+                with self._lock:
+                    self.requests += 1
+                if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    return response
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt))
+
+    def stats(self):
+        with self._lock:
+            histograms = dict(self._histograms)
+            summary = {"name": self.name, "requests": self.requests, "retries": self.retries, "errors": self.errors}
+        summary["latency"] = {
+            endpoint: {
+                "count": histogram.snapshot()["count"],
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+            for endpoint, histogram in histograms.items()
+        }
+        return summary
+
+    def histograms(self):
+        with self._lock:
+            return dict(self._histograms)
@@ -0,0 +1,65 @@
+# utils/uuid_generator.py
+
+import os
+import secrets
+import time
+import uuid
+
+import pymysql
+
+# 새 세션/채팅방 ID 형식: 4(무작위, 기본값) 또는 7(시간순)
+# UUIDv7은 앞부분이 생성 시각이라 새 행이 인덱스의 끝에 추가되므로, 유니크 인덱스 삽입 시 페이지 분할이 적다.
+UUID_VERSION = os.getenv("UUID_VERSION", "4")
+
+# MySQL 중복 키 오류 코드 (ER_DUP_ENTRY)
+DUPLICATE_KEY_ERROR = 1062
+
+# 유니크 인덱스 충돌 시 새 ID로 다시 시도할 최대 횟수
+INSERT_ATTEMPTS = 3
+
+def uuid7():
+    """RFC 9562 UUIDv7: 48비트 밀리초 타임스탬프 + 74비트 무작위 값"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                              # version
+    value |= secrets.randbits(12) << 64             # rand_a
+    value |= 0b10 << 62                             # variant
+    value |= secrets.randbits(62)                   # rand_b
+    return uuid.UUID(int=value)
+
+def new_uuid():
+    return str(uuid7() if UUID_VERSION == "7" else uuid.uuid4())
+
+def is_duplicate_key(error, key):
+    """error가 key 인덱스의 중복 키 오류인지 확인"""
+    return (
+        isinstance(error, pymysql.err.IntegrityError)
+        and error.args[0] == DUPLICATE_KEY_ERROR
+        and key in str(error.args[1])
+    )
+
+def insert_with_new_uuid(cursor, query, make_params, key):
+    """
+    새 UUID로 INSERT를 실행하고 그 UUID를 반환합니다.
+    미리 중복을 조회하지 않고, 유니크 인덱스 key에서 충돌이 나면 새 UUID로 다시 시도한다.
+    make_params: uuid를 받아 query 파라미터를 반환하는 함수
+    """
+    for attempt in range(INSERT_ATTEMPTS):
+        generated = new_uuid()
+        try:
+            cursor.execute(query, make_params(generated))
+            return generated
+        except pymysql.err.IntegrityError as e:
+            if not is_duplicate_key(e, key) or attempt == INSERT_ATTEMPTS - 1:
+                raise
+
+async def insert_with_new_uuid_async(cursor, query, make_params, key):
+    """insert_with_new_uuid의 비동기 버전 (aiomysql 커서, 오류 형식은 pymysql과 같음)"""
+    for attempt in range(INSERT_ATTEMPTS):
+        generated = new_uuid()
+        try:
+            await cursor.execute(query, make_params(generated))
+            return generated
+        except pymysql.err.IntegrityError as e:
+            if not is_duplicate_key(e, key) or attempt == INSERT_ATTEMPTS - 1:
+                raise
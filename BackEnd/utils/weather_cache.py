@@ -0,0 +1,151 @@
+# utils/weather_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.ttl_cache import LRUTTLCache
+
+# OpenWeatherMap 응답 캐시
+# 위도/경도를 격자 단위로 반올림한 칸(cell)마다 한 번만 외부 API를 호출하도록 한다.
+# 같은 도시의 사용자들은 같은 칸에 들어가므로, 외부 호출 수가 사용자 수가 아니라 지역 수에 비례한다.
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU 메모리 캐시 (기본값)"""
+
+    blocking = False  # 조회/저장이 I/O 없이 바로 끝남
+
+    def __init__(self, maxsize=2048):
+        self._cache = LRUTTLCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get_with_age(key)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SQLiteCacheBackend:
+    """
+    로컬 SQLite 파일 캐시.
+    같은 서버의 여러 워커 프로세스가 캐시를 공유할 때 사용한다.
+    """
+
+    blocking = True  # 파일 I/O (잠금 대기 포함)가 있으므로 비동기 핸들러는 스레드에서 호출해야 함
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()  # 여러 요청 스레드가 hits/misses를 함께 갱신
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS weather_cache ("
+                "cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT value, stored_at FROM weather_cache WHERE cache_key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return None
+        return json.loads(row[0]), now - row[1]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO weather_cache (cache_key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now + ttl)
+            )
+            # 만료된 항목 정리
+            db.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now,))
+
+    def stats(self):
+        size = self._connect().execute("SELECT COUNT(*) FROM weather_cache").fetchone()[0]
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class WeatherCache:
+    """
+    엔드포인트 + 위경도 격자 칸을 키로 하는 캐시.
+    항목은 ttl이 지난 뒤에도 stale_ttl 초 동안 더 보관되어,
+    외부 API 장애 시 '오래된(stale)' 값으로 응답하는 데 사용된다.
+    """
+
+    def __init__(self, backend, grid=0.02, stale_ttl=86400):
+        self.backend = backend
+        self.grid = grid
+        self.stale_ttl = stale_ttl
+
+    def cell(self, lat, lon):
+        """위경도를 격자 칸의 대표 좌표로 반올림합니다."""
+        def snap(value):
+            return round(round(float(value) / self.grid) * self.grid, 4)
+        return snap(lat), snap(lon)
+
+    @property
+    def blocking(self):
+        """조회/저장이 블로킹 I/O를 하는 백엔드인지 여부 (비동기 핸들러에서 참고)"""
+        return self.backend.blocking
+
+    def key(self, endpoint, lat, lon):
+        return f"{endpoint}:{lat:.4f}:{lon:.4f}"
+
+    def get(self, key, ttl):
+        """ttl 안의 신선한 값이면 (value, age_seconds), 아니면 None"""
+        entry = self.backend.get(key)
+        if entry is None or entry[1] >= ttl:
+            return None
+        return entry
+
+    def get_stale(self, key):
+        """신선도와 상관없이 보관 중인 값 (value, age_seconds) 또는 None"""
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl):
+        self.backend.set(key, value, ttl + self.stale_ttl)
+
+    def stats(self):
+        return self.backend.stats()
+
+
+def create_weather_cache():
+    """환경 변수 설정에 따라 캐시 백엔드를 선택합니다."""
+    backend_name = os.getenv("WEATHER_CACHE_BACKEND", "memory")
+    grid = float(os.getenv("WEATHER_CACHE_GRID", 0.02))  # 도 단위, 약 2km
+    stale_ttl = int(os.getenv("WEATHER_CACHE_STALE_TTL", 86400))  # 장애 시 사용할 오래된 값 보관 시간
+    if backend_name == "sqlite":
+        backend = SQLiteCacheBackend(os.getenv("WEATHER_CACHE_PATH", "weather_cache.sqlite3"))
+    else:
+        backend = MemoryCacheBackend(int(os.getenv("WEATHER_CACHE_SIZE", 2048)))
+    return WeatherCache(backend, grid, stale_ttl)